@@ -28,6 +28,8 @@ hiddenimports = [
     'apscheduler.schedulers.background',
     'dateutil.relativedelta',
     'dotenv',
+    'waitress',
+    'openpyxl',  # importación de listas de precios .xlsx (import diferido)
 ]
 
 block_cipher = None
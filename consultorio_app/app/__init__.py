@@ -1,15 +1,49 @@
 import os
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask, request, redirect, url_for
 from flask_cors import CORS
 from flask_login import LoginManager
-from flasgger import Flasgger
 from flask_login import current_user
+from app.api_docs import init_api_docs
 from app.config import PathManager, SettingsLoader
 from app.database import db
 from app.database.config import configure_database
 from app.database.session import DatabaseSession
+from app.instrumentation import init_instrumentation
 from app.logging_config import configure_logging
 
+_IMPORT_DURATION = time.perf_counter() - _IMPORT_STARTED
+
+
+class StartupTimer:
+    """
+    Mide la duración de cada fase de create_app.
+
+    Se activa con FLASK_STARTUP_TIMING=1; el reporte se escribe en el log
+    al terminar create_app y queda en app.config['STARTUP_TIMINGS'].
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get('FLASK_STARTUP_TIMING', '').lower() in ('1', 'true', 'yes')
+        self.phases = [('imports', _IMPORT_DURATION)]
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self, app):
+        if not self.enabled:
+            return
+        app.config['STARTUP_TIMINGS'] = {phase: round(seconds * 1000, 1) for phase, seconds in self.phases}
+        total_ms = sum(seconds for _, seconds in self.phases) * 1000
+        detalle = ', '.join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in self.phases)
+        app.logger.info(f"Arranque en {total_ms:.1f}ms ({detalle})")
+
 
 def get_version():
     """
@@ -28,6 +62,7 @@ def get_version():
 
 
 def create_app():
+    timer = StartupTimer()
     app = Flask(__name__)
     
     # Configurar logging ANTES que nada
@@ -54,6 +89,8 @@ def create_app():
         'app', 'runner_notice', fallback=PathManager.is_frozen()
     )
     
+    timer.mark('config')
+    
     # Configurar la base de datos
     configure_database(app)
     
@@ -61,6 +98,10 @@ def create_app():
     db.init_app(app)
     # Registrar singleton para sesiones
     DatabaseSession.get_instance(app)
+    # Métricas de requests y log de consultas lentas ([metrics] en settings.ini)
+    with app.app_context():
+        init_instrumentation(app, db.engine)
+    timer.mark('db')
     
     # Configurar Flask-Login (permite deshabilitarlo para tests con FLASK_LOGIN_DISABLED=1)
     if os.environ.get('FLASK_LOGIN_DISABLED') == '1':
@@ -87,40 +128,10 @@ def create_app():
             if not current_user.is_authenticated:
                 return redirect(url_for('main.login', next=request.url))
     
-    # Configurar Flasgger para documentación Swagger/OpenAPI
-    swagger_config = {
-        "headers": [],
-        "specs": [
-            {
-                "endpoint": 'apispec',
-                "route": '/apispec.json',
-                "rule_filter": lambda rule: rule.rule.startswith('/api/'),
-                "model_filter": lambda tag: True,
-            }
-        ],
-        "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
-        "specs_route": "/api/docs"
-    }
-    
-    flasgger = Flasgger(
-        app=app,
-        config=swagger_config,
-        template={
-            "swagger": "2.0",
-            "info": {
-                "title": "API - Sistema de Gestión Odontológico",
-                "description": "Documentación interactiva de endpoints disponibles. Los endpoints /api/* retornan JSON para integración con herramientas externas.",
-                "version": "1.0.0",
-                "contact": {
-                    "name": "Soporte"
-                }
-            },
-            "host": "localhost:5000",
-            "basePath": "/",
-            "schemes": ["http"],
-        }
-    )
+    # Documentación Swagger/OpenAPI: Flasgger se importa y el spec se arma
+    # recién en el primer request a /api/docs o /apispec.json
+    init_api_docs(app)
+    timer.mark('extensiones')
     
     # Registrar custom Jinja2 filters
     @app.template_filter('empty_fallback')
@@ -175,6 +186,8 @@ def create_app():
             return "0,00"
     
     # Inyectar variables globales en todos los templates
+    from app.media_cache import media_url
+
     @app.context_processor
     def inject_globals():
         return {
@@ -182,6 +195,7 @@ def create_app():
             'favicon': app.config['FAVICON'],
             'show_runner_notice': app.config['SHOW_RUNNER_NOTICE'],
             'is_frozen': PathManager.is_frozen(),
+            'media_url': media_url,
         }
     
     # Registrar blueprints (rutas)
@@ -193,6 +207,7 @@ def create_app():
     app.register_blueprint(webhooks_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(finanzas_bp)
+    timer.mark('blueprints')
     
     # Registrar tareas periódicas (scheduler)
     # Registrar tareas periódicas (scheduler) salvo en modo testing
@@ -201,5 +216,7 @@ def create_app():
         register_background_tasks(app)
     else:
         app.logger.info("Scheduler deshabilitado en modo testing")
+    timer.mark('scheduler')
+    timer.report(app)
     
     return app
\ No newline at end of file
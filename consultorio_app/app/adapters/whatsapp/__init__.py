@@ -6,6 +6,7 @@ from .webhook_handler import (
     WhatsAppWebhookHandler,
     WhatsAppWebhookValidator,
     WhatsAppPayloadParser,
+    WhatsAppWebhookPayload,
     WhatsAppMessageFormatter,
 )
 
@@ -13,5 +14,6 @@ __all__ = [
     "WhatsAppWebhookHandler",
     "WhatsAppWebhookValidator",
     "WhatsAppPayloadParser",
+    "WhatsAppWebhookPayload",
     "WhatsAppMessageFormatter",
 ]
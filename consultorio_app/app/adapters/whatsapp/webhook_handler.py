@@ -13,7 +13,7 @@ import hmac
 import hashlib
 import json
 import os
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Union
 
 
 class WhatsAppWebhookValidator:
@@ -21,7 +21,7 @@ class WhatsAppWebhookValidator:
 
     @staticmethod
     def validate_signature(
-        body: str,
+        body: Union[bytes, str],
         signature_header: str,
         verify_token: str,  # mantenido por compatibilidad, no se usa para la firma
     ) -> bool:
@@ -29,7 +29,8 @@ class WhatsAppWebhookValidator:
         Valida que la firma sea legítima usando HMAC-SHA256.
 
         Args:
-            body: Raw body del request (string)
+            body: Raw body del request. Se espera bytes (tal cual llegó por la red);
+                si es str se codifica a UTF-8 por compatibilidad.
             signature_header: Header X-Hub-Signature-256 (ej: "sha256=...")
             verify_token: Token secreto configurado (de variable de entorno)
 
@@ -51,9 +52,12 @@ class WhatsAppWebhookValidator:
         except (ValueError, IndexError):
             return False
 
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
         expected_hash = hmac.new(
             app_secret.encode('utf-8'),
-            body.encode('utf-8'),
+            body,
             hashlib.sha256
         ).hexdigest()
 
@@ -111,6 +115,44 @@ class WhatsAppPayloadParser:
         except (KeyError, IndexError, TypeError):
             return False
 
+    @staticmethod
+    def parse(body: Union[bytes, str]) -> "WhatsAppWebhookPayload":
+        """
+        Decodifica el body UNA sola vez y retorna el payload tipado.
+
+        json.loads acepta bytes directamente (detecta UTF-8), así que no hace
+        falta decodificar a str antes.
+
+        Raises:
+            json.JSONDecodeError: si el body no es JSON válido
+        """
+        return WhatsAppWebhookPayload(json.loads(body))
+
+
+class WhatsAppWebhookPayload:
+    """
+    Payload del webhook ya parseado.
+
+    Se construye una vez por request y se pasa a handler, rate limiter y
+    sender, evitando volver a decodificar el JSON en cada etapa.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.is_status_update = WhatsAppPayloadParser.is_status_update(data)
+
+        message_info = None
+        if not self.is_status_update:
+            message_info = WhatsAppPayloadParser.extract_message_info(data)
+
+        self.channel_user_id: Optional[str] = message_info[0] if message_info else None
+        self.text: Optional[str] = message_info[1] if message_info else None
+
+    @property
+    def has_message(self) -> bool:
+        """True si el payload trae un mensaje de texto procesable."""
+        return self.channel_user_id is not None
+
 
 class WhatsAppMessageFormatter:
     """Formatea respuestas del ConversationService para WhatsApp."""
@@ -130,6 +172,11 @@ class WhatsAppMessageFormatter:
         """Retorna ACK para respuesta HTTP al webhook."""
         return {"status": "received"}
 
+    @staticmethod
+    def format_rate_limited_ack() -> Dict[str, Any]:
+        """ACK para mensajes descartados por rate limit (no se procesan)."""
+        return {"status": "rate_limited"}
+
 
 class WhatsAppWebhookHandler:
     """Handler principal del webhook. Orquesta validación, parsing y delegación."""
@@ -137,17 +184,31 @@ class WhatsAppWebhookHandler:
     def __init__(self, verify_token: str):
         self.verify_token = verify_token
         self.last_reply_message: Optional[str] = None
+        self.last_payload: Optional[WhatsAppWebhookPayload] = None
+        self.rate_limited = False
 
     def handle_webhook(
         self,
-        body: str,
+        body: Union[bytes, str],
         signature_header: str,
         conversation_service,
+        rate_limiter=None,
     ) -> Tuple[Dict[str, Any], int]:
         """
         Procesa un webhook entrante y retorna (response_dict, status_code).
+
+        La firma se verifica sobre los bytes crudos y el JSON se parsea una
+        sola vez; el resultado queda en self.last_payload para que la ruta
+        lo reutilice (envío de respuesta).
+
+        Si se pasa rate_limiter, se consulta ANTES de delegar al
+        conversation_service: un usuario que excede el límite no genera
+        trabajo de base de datos ni respuesta. Se responde 200 igual para
+        que Meta no reintente el envío.
         """
         self.last_reply_message = None
+        self.last_payload = None
+        self.rate_limited = False
 
         if not WhatsAppWebhookValidator.validate_signature(
             body,
@@ -157,21 +218,23 @@ class WhatsAppWebhookHandler:
             return ({"error": "Invalid signature"}, 401)
 
         try:
-            payload = json.loads(body)
-        except json.JSONDecodeError:
+            payload = WhatsAppPayloadParser.parse(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return ({"error": "Invalid JSON"}, 400)
 
-        if WhatsAppPayloadParser.is_status_update(payload):
-            return (WhatsAppMessageFormatter.format_webhook_ack(), 200)
+        self.last_payload = payload
 
-        message_info = WhatsAppPayloadParser.extract_message_info(payload)
-        if not message_info:
+        if payload.is_status_update or not payload.has_message:
             return (WhatsAppMessageFormatter.format_webhook_ack(), 200)
 
-        channel_user_id, text = message_info
+        if rate_limiter is not None:
+            allowed, _ = rate_limiter.check_rate_limit(payload.channel_user_id)
+            if not allowed:
+                self.rate_limited = True
+                return (WhatsAppMessageFormatter.format_rate_limited_ack(), 200)
 
         try:
-            reply = conversation_service.handle_message(channel_user_id, text)
+            reply = conversation_service.handle_message(payload.channel_user_id, payload.text)
             self.last_reply_message = getattr(reply, "message", None)
         except Exception:
             return ({"error": "Service error"}, 500)
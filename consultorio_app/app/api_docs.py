@@ -0,0 +1,109 @@
+"""
+Documentación Swagger/OpenAPI con inicialización diferida.
+
+Flasgger importa jsonschema, yaml y mistune (~100 ms) y recorre el url_map
+para armar el spec. Nada de eso hace falta para usar la app, así que
+create_app solo registra un blueprint liviano con las mismas rutas que
+registraría Flasgger (/api/docs, /apispec.json, /flasgger_static) y el
+objeto Swagger se construye recién en el primer request a la documentación.
+"""
+
+import importlib.util
+import os
+import threading
+
+from flask import Blueprint, current_app, jsonify
+
+SWAGGER_CONFIG = {
+    "headers": [],
+    "specs": [
+        {
+            "endpoint": 'apispec',
+            "route": '/apispec.json',
+            "rule_filter": lambda rule: rule.rule.startswith('/api/'),
+            "model_filter": lambda tag: True,
+        }
+    ],
+    "static_url_path": "/flasgger_static",
+    "swagger_ui": True,
+    "specs_route": "/api/docs"
+}
+
+SWAGGER_TEMPLATE = {
+    "swagger": "2.0",
+    "info": {
+        "title": "API - Sistema de Gestión Odontológico",
+        "description": "Documentación interactiva de endpoints disponibles. Los endpoints /api/* retornan JSON para integración con herramientas externas.",
+        "version": "1.0.0",
+        "contact": {
+            "name": "Soporte"
+        }
+    },
+    "host": "localhost:5000",
+    "basePath": "/",
+    "schemes": ["http"],
+}
+
+_swagger_lock = threading.Lock()
+
+
+def _flasgger_dir() -> str:
+    """Ubicación del paquete flasgger (templates y estáticos) sin importarlo."""
+    spec = importlib.util.find_spec('flasgger')
+    return list(spec.submodule_search_locations)[0]
+
+
+def get_swagger(app):
+    """Retorna el objeto Swagger de la app, creándolo la primera vez."""
+    swagger = app.extensions.get('swagger')
+    if swagger is None:
+        with _swagger_lock:
+            swagger = app.extensions.get('swagger')
+            if swagger is None:
+                from flasgger import Swagger
+
+                # Sin app: no registra vistas propias (ya están en el blueprint lazy)
+                swagger = Swagger(config=dict(SWAGGER_CONFIG), template=SWAGGER_TEMPLATE)
+                swagger.app = app
+                swagger.load_config(app)
+                app.extensions['swagger'] = swagger
+                app.swag = swagger
+    return swagger
+
+
+def _apidocs():
+    from flasgger.base import APIDocsView
+
+    view = APIDocsView(view_args=dict(config=get_swagger(current_app._get_current_object()).config))
+    return view.get()
+
+
+def _apispec():
+    swagger = get_swagger(current_app._get_current_object())
+    return jsonify(swagger.get_apispecs(endpoint='apispec'))
+
+
+def _oauth_redirect():
+    from flasgger.base import OAuthRedirect
+
+    return OAuthRedirect().get()
+
+
+def init_api_docs(app):
+    """Registra las rutas de la documentación sin importar Flasgger."""
+    base = _flasgger_dir()
+    blueprint = Blueprint(
+        'flasgger',
+        __name__,
+        template_folder=os.path.join(base, 'ui3', 'templates'),
+        static_folder=os.path.join(base, 'ui3', 'static'),
+        static_url_path=SWAGGER_CONFIG['static_url_path'],
+    )
+    blueprint.add_url_rule(SWAGGER_CONFIG['specs_route'], 'apidocs', view_func=_apidocs)
+    blueprint.add_url_rule('/oauth2-redirect.html', 'oauth_redirect', view_func=_oauth_redirect)
+    for spec in SWAGGER_CONFIG['specs']:
+        blueprint.add_url_rule(spec['route'], spec['endpoint'], view_func=_apispec)
+    app.register_blueprint(blueprint)
+
+
+__all__ = ["init_api_docs", "get_swagger", "SWAGGER_CONFIG", "SWAGGER_TEMPLATE"]
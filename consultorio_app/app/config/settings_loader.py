@@ -66,25 +66,73 @@ class SettingsLoader:
             'runner_notice': 'true'
         }
         
+        # Servidor HTTP: production (waitress multi-hilo) | development (Werkzeug)
+        config['server'] = {
+            'mode': 'production',
+            'threads': '8',
+            'connection_limit': '100',
+            'channel_timeout': '120'
+        }
+        
         config['database'] = {
             'db_name': 'consultorio.db',
-            'backup_retention': '10'
+            'backup_retention': '10',
+            # Backup online automático: none | gzip | zstd (requiere zstandard)
+            'backup_compression': 'gzip',
+            'backup_interval_hours': '24',
+            # full | differential (solo páginas cambiadas desde el último completo)
+            'backup_mode': 'full'
         }
         
         config['logging'] = {
             'level': 'INFO',
             'max_file_size_mb': '10',
-            'backup_count': '10'
+            'backup_count': '10',
+            # text | json (una línea JSON por evento)
+            'format': 'text',
+            # Escritura en un hilo aparte (QueueHandler/QueueListener)
+            'async': 'true'
+        }
+        
+        config['metrics'] = {
+            # Tiempos por endpoint y consultas por request (panel de admin)
+            'enabled': 'false',
+            # Con enabled: loggear consultas SQL más lentas que esto (0 = no loggear)
+            'slow_query_ms': '200',
+            # Detector de N+1 para desarrollo: off | warn | raise
+            'nplus1': 'off',
+            'nplus1_threshold': '5'
+        }
+        
+        config['odontograma'] = {
+            # delta: cada versión guarda solo las caras cambiadas | full: copia completa
+            'storage': 'delta',
+            # Cada cuántas versiones se guarda un snapshot completo
+            'snapshot_interval': '10'
+        }
+        
+        config['practicas'] = {
+            # Catálogo de prácticas en memoria; usar false si hay varios procesos
+            'cache_catalogo': 'true'
         }
         
         config['scheduler'] = {
             'update_interval_minutes': '5'
         }
         
+        # Rate limit de mensajes entrantes (memory | sqlite).
+        # 'sqlite' comparte los contadores entre varios procesos/workers.
+        config['rate_limit'] = {
+            'backend': 'memory',
+            'requests_per_minute': '5'
+        }
+        
         config['whatsapp'] = {
             'phone_number_id': '',
             'access_token': '',
-            'verify_token': ''
+            'verify_token': '',
+            # Estado de conversaciones en memoria; usar 0 si hay varios workers
+            'conversation_cache_size': '1000'
         }
         
         # Crear directorio si no existe
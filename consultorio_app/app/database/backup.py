@@ -0,0 +1,476 @@
+"""
+Backups online de la base SQLite.
+
+Usa la API de backup de SQLite (sqlite3.Connection.backup), que copia la
+base página por página y produce una imagen consistente aunque haya
+escrituras en curso o la base esté en modo WAL (a diferencia de copiar el
+archivo). La copia avanza de a PAGES_PER_STEP páginas, liberando el lock
+entre pasos para que la app siga respondiendo.
+
+Configuración en settings.ini, sección [database]:
+- backup_retention: cantidad de backups a conservar (los más viejos se borran)
+- backup_compression: none | gzip | zstd (zstd requiere `pip install zstandard`)
+- backup_interval_hours: frecuencia del backup automático (0 = deshabilitado)
+- backup_mode: full | differential
+
+Backups diferenciales: junto a cada backup completo se guarda un manifiesto
+(`<backup>.pages`) con el hash de cada página de la base. Un diferencial
+(`consultorio_<fecha>.diff.gz`) guarda solo las páginas que cambiaron
+respecto del último completo; para restaurarlo se parte del completo y se
+aplican esas páginas. Si cambió más de DIFF_MAX_RATIO de la base, o ya hay
+MAX_DIFFS_PER_FULL diferenciales sobre el mismo completo, se hace un completo.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.config import PathManager, SettingsLoader
+
+logger = logging.getLogger(__name__)
+
+BACKUP_PREFIX = 'consultorio_'
+PAGES_PER_STEP = 256
+STEP_SLEEP_SECONDS = 0.005
+COPY_CHUNK_SIZE = 1024 * 1024
+
+COMPRESSION_SUFFIXES = {
+    'none': '.db',
+    'gzip': '.db.gz',
+    'zstd': '.db.zst',
+}
+DIFF_SUFFIX = '.diff.gz'
+MANIFEST_SUFFIX = '.pages'
+
+DIFF_MAX_RATIO = 0.5
+MAX_DIFFS_PER_FULL = 14
+PAGE_HASH_SIZE = 16
+_DIFF_MAGIC = b'FLORENS-DIFF-1\n'
+
+# Un solo backup a la vez (manual, programado o al cerrar)
+_backup_lock = threading.Lock()
+
+
+class BackupResult:
+    """Resultado de un backup."""
+
+    def __init__(
+        self,
+        path: Path,
+        bytes_written: int,
+        pages: int,
+        duration_ms: float,
+        compression: str,
+        kind: str = 'full',
+        changed_pages: Optional[int] = None,
+        base: Optional[str] = None,
+    ):
+        self.path = path
+        self.filename = path.name
+        self.bytes_written = bytes_written
+        self.pages = pages
+        self.duration_ms = duration_ms
+        self.compression = compression
+        self.kind = kind
+        self.changed_pages = pages if changed_pages is None else changed_pages
+        self.base = base
+
+    def to_dict(self) -> dict:
+        return {
+            'filename': self.filename,
+            'kind': self.kind,
+            'base': self.base,
+            'bytes_written': self.bytes_written,
+            'pages': self.pages,
+            'changed_pages': self.changed_pages,
+            'duration_ms': self.duration_ms,
+            'compression': self.compression,
+        }
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def get_compression() -> str:
+    """Compresión configurada; zstd sin el paquete instalado cae a gzip."""
+    compression = (SettingsLoader.get('database', 'backup_compression', 'gzip') or 'gzip').strip().lower()
+    if compression not in COMPRESSION_SUFFIXES:
+        logger.warning(f"backup_compression desconocida '{compression}'. Usando 'gzip'.")
+        return 'gzip'
+    if compression == 'zstd' and _zstd() is None:
+        logger.warning("zstandard no instalado (pip install zstandard). Usando 'gzip'.")
+        return 'gzip'
+    return compression
+
+
+def get_retention() -> int:
+    return max(1, SettingsLoader.get_int('database', 'backup_retention', 10))
+
+
+def get_backup_mode() -> str:
+    mode = (SettingsLoader.get('database', 'backup_mode', 'full') or 'full').strip().lower()
+    if mode not in ('full', 'differential'):
+        logger.warning(f"backup_mode desconocido '{mode}'. Usando 'full'.")
+        return 'full'
+    return mode
+
+
+def _compression_of(path: Path) -> str:
+    if path.name.endswith('.db.gz'):
+        return 'gzip'
+    if path.name.endswith('.db.zst'):
+        return 'zstd'
+    return 'none'
+
+
+def _open_compressed_writer(path: Path, compression: str):
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    # zstd: stream_writer sobre el archivo (cierra el archivo al cerrarse)
+    return _zstd().ZstdCompressor(level=3).stream_writer(open(path, 'wb'), closefd=True)
+
+
+def _open_compressed_reader(path: Path, compression: str):
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("Backup .zst: instalar zstandard para restaurarlo")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def _sqlite_backup(source: Path, target: Path, read_only_source: bool = True) -> int:
+    """Copia `source` en `target` con la API de backup, de a PAGES_PER_STEP páginas."""
+    if read_only_source:
+        src = sqlite3.connect(f"{source.resolve().as_uri()}?mode=ro", uri=True)
+    else:
+        src = sqlite3.connect(str(source))
+    dst = sqlite3.connect(str(target))
+    try:
+        src.backup(dst, pages=PAGES_PER_STEP, sleep=STEP_SLEEP_SECONDS)
+        return src.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+
+def _timestamp_of(path: Path) -> str:
+    """'consultorio_20260101_120000_1.db.gz' -> '20260101_120000_1'."""
+    return path.name[len(BACKUP_PREFIX):].split('.', 1)[0]
+
+
+def _is_diff(path: Path) -> bool:
+    return path.name.endswith(DIFF_SUFFIX)
+
+
+def _manifest_path(full_backup: Path) -> Path:
+    return full_backup.with_name(full_backup.name + MANIFEST_SUFFIX)
+
+
+def backup_files(backup_dir: Optional[Path] = None) -> List[Path]:
+    """Backups existentes (completos y diferenciales), más recientes primero."""
+    backup_dir = backup_dir or PathManager.get_backups_dir()
+    if not backup_dir.exists():
+        return []
+    suffixes = tuple(COMPRESSION_SUFFIXES.values()) + (DIFF_SUFFIX,)
+    files = [
+        f for f in backup_dir.iterdir()
+        if f.is_file() and f.name.startswith(BACKUP_PREFIX) and f.name.endswith(suffixes)
+    ]
+    # El timestamp está en el nombre: ordenar por él es ordenar por fecha
+    files.sort(key=lambda f: (_timestamp_of(f), f.name), reverse=True)
+    return files
+
+
+def prune_backups(retention: Optional[int] = None, backup_dir: Optional[Path] = None) -> int:
+    """
+    Deja los `retention` backups completos más nuevos (con sus manifiestos) y
+    los diferenciales que dependen de ellos. Retorna cuántos archivos se borraron.
+    """
+    retention = retention or get_retention()
+    files = backup_files(backup_dir)
+    fulls = [f for f in files if not _is_diff(f)]
+    if len(fulls) <= retention:
+        return 0
+
+    # Un diferencial siempre se basa en el último completo previo, así que los
+    # anteriores al completo más viejo que se conserva quedan huérfanos.
+    oldest_kept = _timestamp_of(fulls[retention - 1])
+    to_remove = fulls[retention:] + [f for f in files if _is_diff(f) and _timestamp_of(f) < oldest_kept]
+    to_remove += [_manifest_path(f) for f in fulls[retention:] if _manifest_path(f).exists()]
+
+    removed = 0
+    for old in to_remove:
+        try:
+            old.unlink()
+            removed += 1
+        except OSError as e:
+            logger.warning(f"No se pudo borrar backup viejo {old.name}: {e}")
+    return removed
+
+
+def _page_size(db_file: Path) -> int:
+    """Tamaño de página leído del header del archivo SQLite (offset 16, big-endian)."""
+    with open(db_file, 'rb') as f:
+        f.seek(16)
+        value = int.from_bytes(f.read(2), 'big')
+    return 65536 if value == 1 else value
+
+
+def _page_hashes(db_file: Path, page_size: int) -> List[bytes]:
+    hashes = []
+    with open(db_file, 'rb') as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            hashes.append(hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).digest())
+    return hashes
+
+
+def _write_manifest(path: Path, page_size: int, hashes: List[bytes]):
+    with gzip.open(path, 'wb') as f:
+        f.write(json.dumps({'page_size': page_size, 'page_count': len(hashes)}).encode('utf-8') + b'\n')
+        f.write(b''.join(hashes))
+
+
+def _read_manifest(path: Path) -> Tuple[int, List[bytes]]:
+    with gzip.open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        data = f.read()
+    hashes = [data[i:i + PAGE_HASH_SIZE] for i in range(0, len(data), PAGE_HASH_SIZE)]
+    return header['page_size'], hashes
+
+
+def _read_diff_header(diff_path: Path) -> dict:
+    with gzip.open(diff_path, 'rb') as f:
+        if f.readline() != _DIFF_MAGIC:
+            raise ValueError(f"{diff_path.name} no es un backup diferencial válido")
+        return json.loads(f.readline())
+
+
+def _diff_base(files: List[Path]) -> Optional[Tuple[Path, int]]:
+    """Último backup completo con manifiesto y cuántos diferenciales tiene encima."""
+    diffs_since = 0
+    for f in files:
+        if _is_diff(f):
+            diffs_since += 1
+            continue
+        if _manifest_path(f).exists():
+            return f, diffs_since
+        return None
+    return None
+
+
+def _new_backup_path(backup_dir: Path, suffix: str) -> Path:
+    """Nombre por timestamp; si ya hay un backup (de cualquier tipo) en ese segundo, agrega _n."""
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    taken = {_timestamp_of(f) for f in backup_dir.glob(f"{BACKUP_PREFIX}{stamp}*")}
+    candidate, n = stamp, 1
+    while candidate in taken:
+        candidate = f"{stamp}_{n}"
+        n += 1
+    return backup_dir / f"{BACKUP_PREFIX}{candidate}{suffix}"
+
+
+def _write_full(snapshot_path: Path, final_path: Path, compression: str):
+    partial_path = final_path.with_name(final_path.name + '.partial')
+    try:
+        if compression == 'none':
+            shutil.copyfile(snapshot_path, partial_path)
+        else:
+            with open(snapshot_path, 'rb') as src, _open_compressed_writer(partial_path, compression) as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        os.replace(partial_path, final_path)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+
+
+def _write_diff(snapshot_path: Path, final_path: Path, base: Path, page_size: int, changed: List[int], page_count: int):
+    partial_path = final_path.with_name(final_path.name + '.partial')
+    header = {'base': base.name, 'page_size': page_size, 'page_count': page_count, 'changed': len(changed)}
+    try:
+        with open(snapshot_path, 'rb') as src, gzip.open(partial_path, 'wb', compresslevel=6) as dst:
+            dst.write(_DIFF_MAGIC)
+            dst.write(json.dumps(header).encode('utf-8') + b'\n')
+            for index in changed:
+                src.seek(index * page_size)
+                dst.write(index.to_bytes(4, 'big'))
+                dst.write(src.read(page_size))
+        os.replace(partial_path, final_path)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+
+
+def create_backup(
+    db_path: Optional[Path] = None,
+    backup_dir: Optional[Path] = None,
+    compression: Optional[str] = None,
+    retention: Optional[int] = None,
+    mode: Optional[str] = None,
+) -> Optional[BackupResult]:
+    """
+    Crea un backup online de la base y aplica la retención.
+
+    Args:
+        mode: 'full' o 'differential' (default: [database] backup_mode)
+
+    Returns:
+        BackupResult, o None si no existe la base
+    """
+    db_path = Path(db_path or PathManager.get_db_path())
+    backup_dir = Path(backup_dir or PathManager.get_backups_dir())
+    compression = compression or get_compression()
+    mode = mode or get_backup_mode()
+
+    if not db_path.exists():
+        logger.warning("No se encontró la base de datos para respaldar")
+        return None
+
+    with _backup_lock:
+        inicio = time.perf_counter()
+        snapshot_path = backup_dir / f"{BACKUP_PREFIX}snapshot.tmp"
+        try:
+            # Imagen consistente de la base; después se hashea y se comprime/compara
+            pages = _sqlite_backup(db_path, snapshot_path)
+            page_size = _page_size(snapshot_path)
+            hashes = _page_hashes(snapshot_path, page_size)
+
+            result = None
+            base_info = _diff_base(backup_files(backup_dir)) if mode == 'differential' else None
+            if base_info is not None and base_info[1] < MAX_DIFFS_PER_FULL:
+                base, _ = base_info
+                base_page_size, base_hashes = _read_manifest(_manifest_path(base))
+                if base_page_size == page_size:
+                    changed = [
+                        i for i, h in enumerate(hashes)
+                        if i >= len(base_hashes) or base_hashes[i] != h
+                    ]
+                    if len(changed) <= DIFF_MAX_RATIO * len(hashes):
+                        final_path = _new_backup_path(backup_dir, DIFF_SUFFIX)
+                        _write_diff(snapshot_path, final_path, base, page_size, changed, len(hashes))
+                        result = BackupResult(
+                            path=final_path,
+                            bytes_written=final_path.stat().st_size,
+                            pages=pages,
+                            duration_ms=0,
+                            compression='gzip',
+                            kind='diff',
+                            changed_pages=len(changed),
+                            base=base.name,
+                        )
+
+            if result is None:
+                final_path = _new_backup_path(backup_dir, COMPRESSION_SUFFIXES[compression])
+                _write_full(snapshot_path, final_path, compression)
+                manifest = _manifest_path(final_path)
+                _write_manifest(manifest, page_size, hashes)
+                result = BackupResult(
+                    path=final_path,
+                    bytes_written=final_path.stat().st_size + manifest.stat().st_size,
+                    pages=pages,
+                    duration_ms=0,
+                    compression=compression,
+                )
+        finally:
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+
+        result.duration_ms = round((time.perf_counter() - inicio) * 1000, 1)
+
+    removed = prune_backups(retention, backup_dir)
+    logger.info(
+        f"Backup {result.kind} creado: {result.filename} ({result.bytes_written} bytes, "
+        f"{result.changed_pages}/{pages} páginas, {result.duration_ms} ms); "
+        f"backups viejos eliminados: {removed}"
+    )
+    return result
+
+
+def reconstruct_backup(backup_path: Path, output_path: Path) -> List[str]:
+    """
+    Reconstruye en `output_path` la base tal como estaba al momento de `backup_path`.
+
+    Para un diferencial aplica la cadena completo + diferencial (el completo
+    se busca en el mismo directorio). Retorna los archivos usados, en orden.
+    """
+    backup_path = Path(backup_path)
+    chain = [backup_path]
+    if _is_diff(backup_path):
+        header = _read_diff_header(backup_path)
+        base = backup_path.with_name(header['base'])
+        if not base.exists():
+            raise FileNotFoundError(f"Falta el backup completo {header['base']} requerido por {backup_path.name}")
+        chain.insert(0, base)
+
+    with _open_compressed_reader(chain[0], _compression_of(chain[0])) as src, open(output_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+    if len(chain) == 2:
+        with gzip.open(backup_path, 'rb') as src, open(output_path, 'r+b') as dst:
+            src.readline()  # magic
+            header = json.loads(src.readline())
+            page_size = header['page_size']
+            for _ in range(header['changed']):
+                index = int.from_bytes(src.read(4), 'big')
+                dst.seek(index * page_size)
+                dst.write(src.read(page_size))
+            dst.truncate(header['page_count'] * page_size)
+
+    return [f.name for f in chain]
+
+
+def restore_backup(backup_path: Path, db_path: Optional[Path] = None) -> List[str]:
+    """
+    Restaura `backup_path` (completo, comprimido o diferencial) sobre la base.
+
+    Se escribe con la API de backup sobre la base viva, así las conexiones
+    abiertas de la app ven el contenido restaurado sin reiniciar.
+    """
+    db_path = Path(db_path or PathManager.get_db_path())
+    backup_path = Path(backup_path)
+
+    with _backup_lock:
+        if _compression_of(backup_path) == 'none' and not _is_diff(backup_path):
+            _sqlite_backup(backup_path, db_path)
+            return [backup_path.name]
+
+        snapshot_path = backup_path.with_name(backup_path.name + '.restore')
+        try:
+            chain = reconstruct_backup(backup_path, snapshot_path)
+            _sqlite_backup(snapshot_path, db_path)
+        finally:
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+        return chain
+
+
+__all__ = [
+    "BackupResult",
+    "backup_files",
+    "create_backup",
+    "get_backup_mode",
+    "get_compression",
+    "get_retention",
+    "prune_backups",
+    "reconstruct_backup",
+    "restore_backup",
+]
@@ -0,0 +1,660 @@
+"""
+Migraciones versionadas del esquema SQLite.
+
+Cada migración tiene un número y se aplica UNA sola vez, dentro de su propia
+transacción (BEGIN ... COMMIT) junto con el registro en `schema_version`.
+Si falla, se hace ROLLBACK y no se aplican las siguientes.
+
+En un arranque normal el costo es una sola consulta:
+
+    SELECT MAX(version) FROM schema_version
+
+Las migraciones se escriben idempotentes (verifican columnas/tablas antes de
+tocarlas) porque las bases previas a este esquema pueden tener aplicados
+algunos pasos y otros no. Las reconstrucciones de tablas copian con
+INSERT ... SELECT en lotes por rowid, así que la memoria usada no depende
+del tamaño de la base y se informa el progreso.
+
+Para agregar una migración: definir una función que recibe la conexión
+sqlite3 y decorarla con @migracion(<siguiente número>, "<descripción>").
+"""
+
+import re
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+REBUILD_BATCH_SIZE = 5000
+
+_MIGRACIONES: Dict[int, "Migracion"] = {}
+
+
+class Migracion:
+    """Paso de migración numerado."""
+
+    def __init__(self, version: int, descripcion: str, funcion: Callable):
+        self.version = version
+        self.descripcion = descripcion
+        self.funcion = funcion
+
+    def __repr__(self):
+        return f"<Migracion {self.version}: {self.descripcion}>"
+
+
+def migracion(version: int, descripcion: str):
+    """Registra una función como migración número `version`."""
+    def decorator(funcion):
+        if version in _MIGRACIONES:
+            raise ValueError(f"Migración {version} duplicada")
+        _MIGRACIONES[version] = Migracion(version, descripcion, funcion)
+        return funcion
+    return decorator
+
+
+class MigrationRunner:
+    """Aplica las migraciones pendientes y registra cada una en schema_version."""
+
+    TABLE = "schema_version"
+
+    @staticmethod
+    def migraciones() -> List[Migracion]:
+        return [_MIGRACIONES[v] for v in sorted(_MIGRACIONES)]
+
+    @staticmethod
+    def latest_version() -> int:
+        return max(_MIGRACIONES) if _MIGRACIONES else 0
+
+    @classmethod
+    def current_version(cls, conn: sqlite3.Connection) -> int:
+        """Versión aplicada (0 si la tabla schema_version todavía no existe)."""
+        try:
+            row = conn.execute(f"SELECT MAX(version) FROM {cls.TABLE}").fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return row[0] or 0
+
+    @classmethod
+    def _ensure_table(cls, conn: sqlite3.Connection):
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {cls.TABLE} (
+                version INTEGER PRIMARY KEY,
+                descripcion VARCHAR(255) NOT NULL,
+                aplicada_en DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                duracion_ms INTEGER
+            )
+            """
+        )
+
+    @classmethod
+    def run(cls, engine, progreso: Callable[[str], None] = print) -> int:
+        """
+        Aplica las migraciones pendientes sobre `engine`.
+
+        Returns:
+            int: Cantidad de migraciones aplicadas en esta ejecución
+        """
+        raw = engine.raw_connection()
+        try:
+            conn: sqlite3.Connection = raw.driver_connection
+            actual = cls.current_version(conn)
+            pendientes = [m for m in cls.migraciones() if m.version > actual]
+            if not pendientes:
+                return 0
+
+            # Cerrar cualquier transacción implícita del driver y pasar a modo
+            # manual: sqlite3 no envuelve DDL en transacciones por su cuenta.
+            raw.commit()
+            isolation_anterior = conn.isolation_level
+            conn.isolation_level = None
+            try:
+                progreso(f"[DB] Esquema en versión {actual}; {len(pendientes)} migraciones pendientes")
+                for paso in pendientes:
+                    cls._aplicar(conn, paso, progreso)
+            finally:
+                conn.isolation_level = isolation_anterior
+            return len(pendientes)
+        finally:
+            raw.close()
+
+    @classmethod
+    def _aplicar(cls, conn: sqlite3.Connection, paso: Migracion, progreso: Callable[[str], None]):
+        progreso(f"[TOOLS] Migración {paso.version}: {paso.descripcion}...")
+        inicio = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cls._ensure_table(conn)
+            paso.funcion(conn, progreso)
+            duracion_ms = int((time.perf_counter() - inicio) * 1000)
+            conn.execute(
+                f"INSERT INTO {cls.TABLE} (version, descripcion, duracion_ms) VALUES (?, ?, ?)",
+                (paso.version, paso.descripcion, duracion_ms),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            progreso(f"[ERROR] Migración {paso.version} revertida")
+            raise
+        progreso(f"[OK] Migración {paso.version} aplicada ({duracion_ms} ms)")
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _tablas(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def _columnas(conn: sqlite3.Connection, tabla: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info('{tabla}')")]
+
+
+def _agregar_columnas(conn: sqlite3.Connection, tabla: str, columnas: Dict[str, str], progreso):
+    """ALTER TABLE ADD COLUMN para las columnas que falten."""
+    if tabla not in _tablas(conn):
+        return
+    existentes = set(_columnas(conn, tabla))
+    for nombre, tipo in columnas.items():
+        if nombre not in existentes:
+            conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {nombre} {tipo}")
+            progreso(f"[OK] Columna {tabla}.{nombre} agregada")
+
+
+def _copiar_en_lotes(
+    conn: sqlite3.Connection,
+    origen: str,
+    destino: str,
+    columnas_destino: Iterable[str],
+    columnas_origen: Iterable[str],
+    progreso,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    INSERT ... SELECT de `origen` a `destino` en lotes por rowid.
+
+    Cada lote se delimita buscando el rowid N-ésimo (usa el índice de rowid),
+    así funciona aunque los ids tengan huecos grandes.
+    """
+    batch_size = batch_size or REBUILD_BATCH_SIZE
+    total = conn.execute(f"SELECT COUNT(*) FROM {origen}").fetchone()[0]
+    insert_sql = (
+        f"INSERT INTO {destino} ({', '.join(columnas_destino)}) "
+        f"SELECT {', '.join(columnas_origen)} FROM {origen} "
+    )
+    copiadas = 0
+    desde = None
+    while copiadas < total:
+        filtro_desde = "rowid > ?" if desde is not None else "1 = 1"
+        params = (desde,) if desde is not None else ()
+        hasta = conn.execute(
+            f"SELECT rowid FROM {origen} WHERE {filtro_desde} ORDER BY rowid LIMIT 1 OFFSET ?",
+            params + (batch_size - 1,),
+        ).fetchone()
+        if hasta is None:
+            conn.execute(insert_sql + f"WHERE {filtro_desde}", params)
+            copiadas = total
+        else:
+            conn.execute(insert_sql + f"WHERE {filtro_desde} AND rowid <= ?", params + (hasta[0],))
+            copiadas = min(total, copiadas + batch_size)
+            desde = hasta[0]
+        progreso(f"[TOOLS]   {origen}: {copiadas}/{total} filas copiadas")
+    return total
+
+
+def _reconstruir_tabla(
+    conn: sqlite3.Connection,
+    tabla: str,
+    create_sql: str,
+    columnas_destino: List[str],
+    columnas_origen: List[str],
+    progreso,
+):
+    """
+    Reconstruye `tabla` con `create_sql` (debe crear `<tabla>_tmp`).
+
+    Procedimiento recomendado por SQLite: crear la nueva, copiar, borrar la
+    vieja y renombrar. Los índices explícitos se recrean si sus columnas
+    siguen existiendo.
+    """
+    indices = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+        (tabla,),
+    ).fetchall()
+    indices = [
+        (nombre, sql) for nombre, sql in indices
+        if all(col in columnas_destino for col in
+               (row[2] for row in conn.execute(f"PRAGMA index_info('{nombre}')")))
+    ]
+
+    tmp = f"{tabla}_tmp"
+    conn.execute(f"DROP TABLE IF EXISTS {tmp}")
+    conn.execute(create_sql)
+    _copiar_en_lotes(conn, tabla, tmp, columnas_destino, columnas_origen, progreso)
+    conn.execute(f"DROP TABLE {tabla}")
+    conn.execute(f"ALTER TABLE {tmp} RENAME TO {tabla}")
+    for _, sql in indices:
+        conn.execute(sql)
+
+
+def _ddl_desde_pragma(conn: sqlite3.Connection, tabla: str, excluir: Iterable[str] = ()) -> str:
+    """CREATE TABLE <tabla>_tmp con las columnas y FKs actuales, sin las excluidas."""
+    excluir = set(excluir)
+    definiciones = []
+    pk = []
+    for _, nombre, tipo, notnull, default, es_pk in conn.execute(f"PRAGMA table_info('{tabla}')"):
+        if nombre in excluir:
+            continue
+        definicion = f"{nombre} {tipo}".strip()
+        if notnull:
+            definicion += " NOT NULL"
+        if default is not None:
+            definicion += f" DEFAULT {default}"
+        definiciones.append(definicion)
+        if es_pk:
+            pk.append(nombre)
+    if pk:
+        definiciones.append(f"PRIMARY KEY ({', '.join(pk)})")
+    for fk in conn.execute(f"PRAGMA foreign_key_list('{tabla}')"):
+        _, _, tabla_ref, columna, columna_ref = fk[:5]
+        if columna not in excluir:
+            definiciones.append(f"FOREIGN KEY({columna}) REFERENCES {tabla_ref}({columna_ref})")
+    return f"CREATE TABLE {tabla}_tmp ({', '.join(definiciones)})"
+
+
+def _ddl_con_autoincrement(create_sql: str, tabla: str) -> Optional[str]:
+    """
+    Reescribe el CREATE TABLE original para que `id` sea AUTOINCREMENT,
+    conservando el resto (CHECKs, FKs, defaults). None si no se reconoce.
+    """
+    nuevo, n = re.subn(
+        r"\bid\s+INTEGER\s+(NOT\s+NULL\s*)?(PRIMARY\s+KEY)?",
+        "id INTEGER PRIMARY KEY AUTOINCREMENT ",
+        create_sql,
+        count=1,
+        flags=re.IGNORECASE,
+    )
+    if n == 0:
+        return None
+    nuevo = re.sub(r",\s*PRIMARY\s+KEY\s*\(\s*id\s*\)", "", nuevo, flags=re.IGNORECASE)
+    nuevo = re.sub(
+        rf"^\s*CREATE\s+TABLE\s+[\"']?{tabla}[\"']?",
+        f"CREATE TABLE {tabla}_tmp",
+        nuevo,
+        count=1,
+        flags=re.IGNORECASE,
+    )
+    return nuevo
+
+
+# ---------------------------------------------------------------------------
+# Migraciones (en orden; NO renumerar las ya publicadas)
+# ---------------------------------------------------------------------------
+
+@migracion(1, "Renombrar operaciones -> prestaciones")
+def _m001_operaciones_a_prestaciones(conn, progreso):
+    tablas = _tablas(conn)
+    if 'operaciones' in tablas and 'prestaciones' not in tablas:
+        conn.execute("ALTER TABLE operaciones RENAME TO prestaciones")
+
+
+@migracion(2, "Crear tabla conversations")
+def _m002_conversations(conn, progreso):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel_user_id STRING NOT NULL UNIQUE,
+            paso_actual STRING NOT NULL,
+            paciente_id INTEGER,
+            dni_propuesto STRING,
+            nombre_tmp STRING,
+            apellido_tmp STRING,
+            telefono_tmp STRING,
+            fecha_candidate DATE,
+            hora_candidate TIME,
+            duracion_candidate INTEGER,
+            detalle STRING,
+            expira_en DATETIME,
+            ultima_interaccion_ts DATETIME,
+            intentos_actuales INTEGER DEFAULT 0,
+            confirmed BOOLEAN DEFAULT 0,
+            created_at DATETIME,
+            updated_at DATETIME,
+            FOREIGN KEY(paciente_id) REFERENCES pacientes(id)
+        )
+        """
+    )
+
+
+@migracion(3, "Renombrar turnos.operacion_id -> prestacion_id")
+def _m003_turnos_prestacion_id(conn, progreso):
+    columnas = _columnas(conn, 'turnos')
+    if 'operacion_id' in columnas and 'prestacion_id' not in columnas:
+        conn.execute("ALTER TABLE turnos RENAME COLUMN operacion_id TO prestacion_id")
+
+
+@migracion(4, "Renombrar pacientes.carnet -> nro_afiliado")
+def _m004_pacientes_nro_afiliado(conn, progreso):
+    columnas = _columnas(conn, 'pacientes')
+    if 'carnet' in columnas and 'nro_afiliado' not in columnas:
+        conn.execute("ALTER TABLE pacientes RENAME COLUMN carnet TO nro_afiliado")
+
+
+@migracion(5, "Agregar practicas.monto_unitario y es_plus")
+def _m005_practicas_montos(conn, progreso):
+    _agregar_columnas(conn, 'practicas', {
+        'monto_unitario': "REAL NOT NULL DEFAULT 0.0",
+        'es_plus': "BOOLEAN NOT NULL DEFAULT 0",
+    }, progreso)
+
+
+@migracion(6, "Eliminar prestaciones.codigo_id")
+def _m006_prestaciones_sin_codigo(conn, progreso):
+    if 'prestaciones' not in _tablas(conn):
+        return
+    columnas = _columnas(conn, 'prestaciones')
+    if 'codigo_id' not in columnas:
+        return
+    restantes = [c for c in columnas if c != 'codigo_id']
+    _reconstruir_tabla(
+        conn, 'prestaciones',
+        _ddl_desde_pragma(conn, 'prestaciones', excluir=('codigo_id',)),
+        restantes, restantes, progreso,
+    )
+
+
+@migracion(7, "AUTOINCREMENT en prestaciones.id")
+def _m007_prestaciones_autoincrement(conn, progreso):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='prestaciones'").fetchone()
+    if not row or 'AUTOINCREMENT' in (row[0] or '').upper():
+        return
+    create_sql = _ddl_con_autoincrement(row[0], 'prestaciones')
+    if create_sql is None:
+        progreso("[WARN] No se reconoce la definición de prestaciones.id; se omite AUTOINCREMENT")
+        return
+    columnas = _columnas(conn, 'prestaciones')
+    _reconstruir_tabla(conn, 'prestaciones', create_sql, columnas, columnas, progreso)
+
+
+@migracion(8, "Agregar turnos.duracion")
+def _m008_turnos_duracion(conn, progreso):
+    _agregar_columnas(conn, 'turnos', {'duracion': "INTEGER DEFAULT 30"}, progreso)
+
+
+@migracion(9, "Campos IPSS en prestaciones")
+def _m009_prestaciones_ipss(conn, progreso):
+    _agregar_columnas(conn, 'prestaciones', {
+        'estado': "VARCHAR(20) NOT NULL DEFAULT 'borrador'",
+        'fecha_solicitud': "DATE",
+        'fecha_autorizacion': "DATE",
+        'fecha_realizacion': "DATE",
+        'importe_afiliado_autorizado': "FLOAT",
+        'importe_coseguro_autorizado': "FLOAT",
+        'importe_profesional_autorizado': "FLOAT",
+        'autorizacion_adjunta_path': "VARCHAR(255)",
+        'observaciones_autorizacion': "TEXT",
+    }, progreso)
+
+
+@migracion(10, "Campos IPSS en prestacion_practica")
+def _m010_prestacion_practica_ipss(conn, progreso):
+    _agregar_columnas(conn, 'prestacion_practica', {
+        'tipo_concepto': "VARCHAR(20) NOT NULL DEFAULT 'acto'",
+        'estado_item': "VARCHAR(20) NOT NULL DEFAULT 'pendiente'",
+        'monto_autorizado': "FLOAT",
+        'fecha_realizacion_item': "DATE",
+        'fecha_anulacion': "DATE",
+        'razon_anulacion': "VARCHAR(255)",
+    }, progreso)
+
+
+@migracion(11, "Baja lógica en practicas")
+def _m011_practicas_baja_logica(conn, progreso):
+    _agregar_columnas(conn, 'practicas', {
+        'activa': "BOOLEAN NOT NULL DEFAULT 1",
+        'fecha_baja': "DATE",
+        'razon_baja': "VARCHAR(255)",
+    }, progreso)
+
+
+@migracion(12, "Crear tabla prestacion_cobro")
+def _m012_prestacion_cobro(conn, progreso):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS prestacion_cobro (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prestacion_id INTEGER NOT NULL,
+            fecha_cobro DATE NOT NULL,
+            tipo_cobro VARCHAR(30) NOT NULL,
+            monto FLOAT NOT NULL DEFAULT 0.0,
+            razon VARCHAR(255),
+            usuario_id INTEGER,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(prestacion_id) REFERENCES prestaciones(id),
+            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
+        )
+        """
+    )
+
+
+@migracion(13, "Crear tabla prestacion_audit")
+def _m013_prestacion_audit(conn, progreso):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS prestacion_audit (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prestacion_id INTEGER NOT NULL,
+            campo VARCHAR(50) NOT NULL,
+            valor_anterior TEXT,
+            valor_nuevo TEXT,
+            fecha_cambio DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            razon VARCHAR(255),
+            usuario_id INTEGER,
+            FOREIGN KEY(prestacion_id) REFERENCES prestaciones(id),
+            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
+        )
+        """
+    )
+
+
+@migracion(14, "Crear tabla odontogramas")
+def _m014_odontogramas(conn, progreso):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS odontogramas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            version_seq INTEGER NOT NULL DEFAULT 1,
+            es_actual BOOLEAN NOT NULL DEFAULT 1,
+            nota_general TEXT,
+            ultima_prestacion_registrada_en DATETIME,
+            creado_en DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+            actualizado_en DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+            UNIQUE(paciente_id, version_seq),
+            FOREIGN KEY(paciente_id) REFERENCES pacientes(id)
+        )
+        """
+    )
+
+
+@migracion(15, "Crear tabla odontograma_caras")
+def _m015_odontograma_caras(conn, progreso):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS odontograma_caras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            odontograma_id INTEGER NOT NULL,
+            diente TEXT NOT NULL,
+            cara TEXT NOT NULL,
+            marca_codigo TEXT,
+            marca_texto TEXT,
+            comentario TEXT,
+            UNIQUE(odontograma_id, diente, cara),
+            FOREIGN KEY(odontograma_id) REFERENCES odontogramas(id)
+        )
+        """
+    )
+
+
+@migracion(16, "turnos.estado_id + backfill desde estados.nombre")
+def _m016_turnos_estado_id(conn, progreso):
+    if 'turnos' not in _tablas(conn):
+        return
+    _agregar_columnas(conn, 'turnos', {'estado_id': "INTEGER"}, progreso)
+    if 'estado' in _columnas(conn, 'turnos'):
+        conn.execute(
+            "UPDATE turnos SET estado_id = (SELECT id FROM estados e WHERE e.nombre = turnos.estado) "
+            "WHERE estado IS NOT NULL AND (estado_id IS NULL OR estado_id = 0)"
+        )
+
+
+@migracion(17, "cambios_estado.estado_*_id + backfill")
+def _m017_cambios_estado_ids(conn, progreso):
+    if 'cambios_estado' not in _tablas(conn):
+        return
+    _agregar_columnas(conn, 'cambios_estado', {
+        'estado_anterior_id': "INTEGER",
+        'estado_nuevo_id': "INTEGER",
+    }, progreso)
+    columnas = _columnas(conn, 'cambios_estado')
+    if 'estado_nuevo' in columnas:
+        conn.execute(
+            "UPDATE cambios_estado SET estado_nuevo_id = (SELECT id FROM estados e WHERE e.nombre = cambios_estado.estado_nuevo) "
+            "WHERE estado_nuevo IS NOT NULL AND (estado_nuevo_id IS NULL OR estado_nuevo_id = 0)"
+        )
+    if 'estado_anterior' in columnas:
+        conn.execute(
+            "UPDATE cambios_estado SET estado_anterior_id = (SELECT id FROM estados e WHERE e.nombre = cambios_estado.estado_anterior) "
+            "WHERE estado_anterior IS NOT NULL AND (estado_anterior_id IS NULL OR estado_anterior_id = 0)"
+        )
+
+
+@migracion(18, "Índice ix_conversations_expira_en")
+def _m018_conversations_expira_en(conn, progreso):
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_conversations_expira_en ON conversations (expira_en)")
+
+
+@migracion(19, "Odontogramas delta: base_id/profundidad_delta y conversión de versiones")
+def _m019_odontogramas_delta(conn, progreso, snapshot_interval=10):
+    """
+    Convierte las versiones existentes (snapshots completos) a deltas: cada
+    versión se compara con la anterior del mismo paciente y se borran las
+    caras que no cambiaron. Cada `snapshot_interval` versiones, o si una
+    versión perdió caras respecto de la anterior (no representable como
+    delta), queda como snapshot.
+    """
+    if 'odontogramas' not in _tablas(conn):
+        return
+    _agregar_columnas(conn, 'odontogramas', {
+        'base_id': "INTEGER REFERENCES odontogramas(id)",
+        'profundidad_delta': "INTEGER NOT NULL DEFAULT 0",
+    }, progreso)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_odontogramas_base_id ON odontogramas (base_id)")
+    if 'odontograma_caras' not in _tablas(conn):
+        return
+
+    pacientes = [row[0] for row in conn.execute(
+        "SELECT DISTINCT paciente_id FROM odontogramas ORDER BY paciente_id"
+    )]
+    caras_eliminadas = 0
+    for n, paciente_id in enumerate(pacientes, 1):
+        versiones = conn.execute(
+            "SELECT id, base_id FROM odontogramas WHERE paciente_id = ? ORDER BY version_seq",
+            (paciente_id,),
+        ).fetchall()
+        if any(base_id is not None for _, base_id in versiones):
+            continue  # ya convertido
+
+        caras: Dict[int, Dict[tuple, tuple]] = {version_id: {} for version_id, _ in versiones}
+        for version_id, cara_id, diente, cara, codigo, texto, comentario in conn.execute(
+            "SELECT c.odontograma_id, c.id, c.diente, c.cara, c.marca_codigo, c.marca_texto, c.comentario "
+            "FROM odontograma_caras c JOIN odontogramas o ON o.id = c.odontograma_id "
+            "WHERE o.paciente_id = ?",
+            (paciente_id,),
+        ):
+            caras[version_id][(diente, cara)] = (cara_id, (codigo, texto, comentario))
+
+        anterior_id, profundidad = None, 0
+        for version_id, _ in versiones:
+            actual = caras[version_id]
+            anterior = caras.get(anterior_id, {})
+            perdio_caras = any(clave not in actual for clave in anterior)
+            if anterior_id is None or perdio_caras or profundidad + 1 >= snapshot_interval:
+                profundidad = 0
+            else:
+                profundidad += 1
+                sin_cambios = [
+                    cara_id for clave, (cara_id, valores) in actual.items()
+                    if clave in anterior and anterior[clave][1] == valores
+                ]
+                conn.executemany("DELETE FROM odontograma_caras WHERE id = ?", [(i,) for i in sin_cambios])
+                caras_eliminadas += len(sin_cambios)
+                conn.execute(
+                    "UPDATE odontogramas SET base_id = ?, profundidad_delta = ? WHERE id = ?",
+                    (anterior_id, profundidad, version_id),
+                )
+            anterior_id = version_id
+
+        if n % 100 == 0 or n == len(pacientes):
+            progreso(f"  odontogramas: {n}/{len(pacientes)} pacientes convertidos")
+    if caras_eliminadas:
+        progreso(f"  odontogramas: {caras_eliminadas} caras repetidas eliminadas")
+
+
+@migracion(20, "pacientes.ultima_prestacion_en + backfill")
+def _m020_pacientes_ultima_prestacion(conn, progreso):
+    if 'pacientes' not in _tablas(conn):
+        return
+    _agregar_columnas(conn, 'pacientes', {'ultima_prestacion_en': "DATETIME"}, progreso)
+    if 'prestaciones' in _tablas(conn):
+        conn.execute(
+            "UPDATE pacientes SET ultima_prestacion_en = "
+            "(SELECT MAX(p.fecha) FROM prestaciones p WHERE p.paciente_id = pacientes.id)"
+        )
+
+
+@migracion(21, "prestaciones.total_cobrado/saldo_pendiente + backfill")
+def _m021_prestaciones_saldos(conn, progreso):
+    if 'prestaciones' not in _tablas(conn):
+        return
+    _agregar_columnas(conn, 'prestaciones', {
+        'total_cobrado': "FLOAT NOT NULL DEFAULT 0",
+        'saldo_pendiente': "FLOAT NOT NULL DEFAULT 0",
+    }, progreso)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_prestaciones_saldo_pendiente ON prestaciones (saldo_pendiente)"
+    )
+    if not {'prestacion_cobro', 'prestacion_practica', 'practicas'} <= _tablas(conn):
+        return
+    # Mismo cálculo que SaldoPrestacionService
+    conn.execute(
+        "UPDATE prestaciones SET total_cobrado = COALESCE("
+        "(SELECT SUM(c.monto) FROM prestacion_cobro c WHERE c.prestacion_id = prestaciones.id), 0)"
+    )
+    conn.execute(
+        "UPDATE prestaciones SET saldo_pendiente = "
+        "COALESCE(importe_afiliado_autorizado, 0) + COALESCE(importe_coseguro_autorizado, 0) "
+        "+ COALESCE((SELECT SUM(COALESCE(pp.monto_unitario, 0) * pp.cantidad) "
+        "FROM prestacion_practica pp JOIN practicas pr ON pr.id = pp.practica_id "
+        "WHERE pp.prestacion_id = prestaciones.id AND pr.es_plus = 1 AND pp.fecha_anulacion IS NULL), 0) "
+        "- total_cobrado"
+    )
+    progreso("[OK] Saldos de prestaciones calculados")
+
+
+@migracion(22, "Tabla rate_limit_counters (backend sqlite del rate limiter)")
+def _m022_rate_limit_counters(conn, progreso):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit_counters (
+            channel_user_id TEXT NOT NULL,
+            window_start INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (channel_user_id, window_start)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+__all__ = ["MigrationRunner", "Migracion", "migracion", "REBUILD_BATCH_SIZE"]
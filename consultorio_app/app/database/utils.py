@@ -1,8 +1,6 @@
-import os
-import shutil
-from datetime import datetime
 from app.config import PathManager
 from app.database import db
+from app.database.backup import backup_files, create_backup, restore_backup
 from app.database.session import DatabaseSession
 from flask import current_app
 
@@ -38,34 +36,27 @@ def get_session():
 
 def backup_database():
     """
-    Crea una copia de respaldo de la base de datos en data/backups/
+    Crea un backup online de la base de datos en data/backups/
     
-    Usa PathManager para determinar ubicación dinámica de backups.
+    Usa la API de backup de SQLite (consistente aunque haya escrituras en
+    curso), comprime según settings.ini y aplica la retención configurada.
+    Ver app/database/backup.py.
     
     Returns:
         str: Nombre del archivo de backup creado, o None si falla
     """
-    backup_dir = PathManager.get_backups_dir()
-    
-    # Nombre del archivo de backup con timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"consultorio_{timestamp}.db"
-    
-    # Rutas de origen y destino
-    source_db = PathManager.get_db_path()
-    backup_db = backup_dir / backup_filename
-    
-    # Crear el backup
-    if source_db.exists():
-        shutil.copy2(source_db, backup_db)
-        print(f"💾 Backup creado: {backup_filename}")
-        return backup_filename
-    else:
+    result = create_backup()
+    if result is None:
         print("⚠️ No se encontró la base de datos para respaldar")
         return None
+    print(f"💾 Backup creado: {result.filename} ({result.bytes_written} bytes)")
+    return result.filename
 
 def restore_database(backup_filename):
-    """.
+    """
+    Restaura la base de datos desde un backup (comprimido o no).
+    
+    Si es un backup diferencial se aplica la cadena completo + diferencial.
     
     Args:
         backup_filename: Nombre del archivo de backup (sin path completo)
@@ -75,11 +66,10 @@ def restore_database(backup_filename):
     """
     backup_dir = PathManager.get_backups_dir()
     backup_path = backup_dir / backup_filename
-    target_db = PathManager.get_db_path()
     
     if backup_path.exists():
-        shutil.copy2(backup_path, target_db)
-        print(f"🔄 Base de datos restaurada desde: {backup_filename}")
+        chain = restore_backup(backup_path)
+        print(f"🔄 Base de datos restaurada desde: {' + '.join(chain)}")
         return True
     else:
         print(f"⚠️ No se encontró el archivo de backup: {backup_filename}")
@@ -93,12 +83,4 @@ def list_backups():
     Returns:
         list: Lista de nombres de archivos de backup, ordenados por más reciente primero
     """
-    backup_dir = PathManager.get_backups_dir()
-    
-    if backup_dir.exists():
-        backups = [f.name for f in backup_dir.iterdir() if f.suffix == '.db']
-        backups = [f for f in os.listdir(backup_path) if f.endswith('.db')]
-        backups.sort(reverse=True)  # Más recientes primero
-        return backups
-    else:
-        return []
+    return [f.name for f in backup_files()]
@@ -0,0 +1,304 @@
+"""
+Métricas de requests: tiempo por endpoint y consultas SQL por request.
+
+Opt-in desde settings.ini:
+
+    [metrics]
+    enabled = true
+    slow_query_ms = 200
+
+Con enabled = true se registran hooks before/after_request que miden el
+tiempo de pared de cada request, y listeners before/after_cursor_execute
+del engine que cuentan consultas y tiempo en la base. Todo se agrega en
+histogramas en memoria por endpoint (buckets logarítmicos de tamaño fijo,
+así la memoria no crece con la cantidad de requests) de los que se sacan
+p50/p95/p99 para el panel de admin y la descarga en JSON.
+
+Con las métricas habilitadas, las consultas que superan slow_query_ms se
+loggean en 'app.database.slow_queries' (solo el SQL con placeholders, nunca
+los parámetros: pueden tener datos de pacientes; 0 = no loggear). Con
+enabled = false no se registra ningún listener en el engine.
+
+Detector de N+1 (desarrollo y tests):
+
+    [metrics]
+    nplus1 = off | warn | raise
+    nplus1_threshold = 5
+
+Cuenta, por request, las cargas lazy de cada relación (ej. Turno.paciente
+recorrido en un template) con el evento do_orm_execute de la sesión. Si la
+misma relación se carga lazy más de nplus1_threshold veces en un request,
+loggea un warning o lanza NPlusOneError. Se puede cambiar en caliente con
+app.config['NPLUS1_MODE'] / app.config['NPLUS1_THRESHOLD'].
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import SettingsLoader
+
+slow_query_logger = logging.getLogger('app.database.slow_queries')
+nplus1_logger = logging.getLogger('app.database.nplus1')
+
+NPLUS1_MODES = ('off', 'warn', 'raise')
+
+# Límites superiores de los buckets en ms: 0.1 ms a ~5 min, +15% por bucket
+_BUCKET_BOUNDS = [0.1 * 1.15 ** i for i in range(107)]
+
+
+class LatencyHistogram:
+    """Histograma de duraciones (ms) con buckets logarítmicos fijos."""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Cota superior del bucket que contiene el percentil `p` (0-100)."""
+        if not self.total:
+            return 0.0
+        rank = p / 100 * self.total
+        acumulado = 0
+        for index, count in enumerate(self.counts):
+            acumulado += count
+            if acumulado >= rank:
+                bound = _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max
+                return round(min(bound, self.max), 2)
+        return round(self.max, 2)
+
+    @property
+    def mean(self) -> float:
+        return round(self.sum / self.total, 2) if self.total else 0.0
+
+
+class EndpointStats:
+    """Histogramas de un endpoint: tiempo total, tiempo en base y consultas."""
+
+    def __init__(self):
+        self.wall_ms = LatencyHistogram()
+        self.db_ms = LatencyHistogram()
+        self.queries = LatencyHistogram()
+        self.errores = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'requests': self.wall_ms.total,
+            'errores': self.errores,
+            'p50_ms': self.wall_ms.percentile(50),
+            'p95_ms': self.wall_ms.percentile(95),
+            'p99_ms': self.wall_ms.percentile(99),
+            'max_ms': round(self.wall_ms.max, 2),
+            'db_p95_ms': self.db_ms.percentile(95),
+            'queries_promedio': self.queries.mean,
+            'queries_max': int(self.queries.max),
+        }
+
+
+class RequestMetrics:
+    """Registro thread-safe de EndpointStats por endpoint."""
+
+    def __init__(self):
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+        self.desde = datetime.now()
+
+    def record(self, endpoint: str, wall_ms: float, queries: int, db_ms: float, error: bool = False):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            stats.wall_ms.add(wall_ms)
+            stats.db_ms.add(db_ms)
+            stats.queries.add(queries)
+            if error:
+                stats.errores += 1
+
+    def snapshot(self) -> List[dict]:
+        """Estadísticas por endpoint, los más lentos (p95) primero."""
+        with self._lock:
+            rows = [dict(endpoint=endpoint, **stats.to_dict()) for endpoint, stats in self._stats.items()]
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.desde = datetime.now()
+
+
+def get_request_metrics(app) -> Optional[RequestMetrics]:
+    """RequestMetrics de la app, o None si las métricas están deshabilitadas."""
+    return app.extensions.get('request_metrics')
+
+
+def _register_query_listeners(engine, slow_query_ms: float):
+    # El inicio se guarda en el contexto de ejecución (uno por sentencia): si
+    # la sentencia falla no queda nada pendiente en la conexión del pool.
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, 'metrics_query_start', None)
+        if start is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if has_request_context() and 'metrics_start' in g:
+            g.metrics_queries += 1
+            g.metrics_db_ms += elapsed_ms
+        if slow_query_ms and elapsed_ms >= slow_query_ms:
+            origen = request.endpoint if has_request_context() else 'sin request'
+            slow_query_logger.warning(
+                f"Consulta lenta ({elapsed_ms:.1f} ms, {origen}): {' '.join(statement.split())[:500]}"
+            )
+
+
+class NPlusOneError(RuntimeError):
+    """Una relación se cargó lazy más veces que el umbral en un mismo request."""
+
+
+class LazyLoadTracker:
+    """Cuenta cargas lazy por relación dentro de un request (o de un bloque en tests)."""
+
+    def __init__(self, mode: str, threshold: int, origen: str = ''):
+        self.mode = mode
+        self.threshold = threshold
+        self.origen = origen
+        self.counts: Counter = Counter()
+
+    def record(self, relationship: str):
+        self.counts[relationship] += 1
+        if self.counts[relationship] != self.threshold + 1:
+            return  # avisar una sola vez por relación
+        mensaje = (
+            f"Posible N+1 en {self.origen or 'bloque'}: {relationship} cargada lazy más de "
+            f"{self.threshold} veces (usar selectinload/joinedload)"
+        )
+        if self.mode == 'raise':
+            raise NPlusOneError(mensaje)
+        nplus1_logger.warning(mensaje)
+
+
+_lazy_load_tracker: ContextVar[Optional[LazyLoadTracker]] = ContextVar('lazy_load_tracker', default=None)
+
+
+def track_lazy_loads(mode: str = 'raise', threshold: int = 5, origen: str = ''):
+    """
+    Activa un LazyLoadTracker en el contexto actual.
+
+    Returns:
+        token para stop_tracking_lazy_loads()
+    """
+    return _lazy_load_tracker.set(LazyLoadTracker(mode, threshold, origen))
+
+
+def stop_tracking_lazy_loads(token) -> Optional[LazyLoadTracker]:
+    tracker = _lazy_load_tracker.get()
+    _lazy_load_tracker.reset(token)
+    return tracker
+
+
+def _on_orm_execute(orm_execute_state):
+    # lazy_loaded_from solo está en cargas lazy (no en selectinload/joinedload)
+    if not orm_execute_state.is_relationship_load or orm_execute_state.lazy_loaded_from is None:
+        return
+    tracker = _lazy_load_tracker.get()
+    if tracker is None:
+        return
+    path = orm_execute_state.loader_strategy_path
+    prop = path.path[-1] if path is not None and path.path else None
+    relationship = f"{prop.parent.class_.__name__}.{prop.key}" if prop is not None else 'desconocida'
+    tracker.record(relationship)
+
+
+def _init_nplus1_detector(app):
+    mode = (SettingsLoader.get('metrics', 'nplus1', 'off') or 'off').strip().lower()
+    app.config.setdefault('NPLUS1_MODE', mode if mode in NPLUS1_MODES else 'off')
+    app.config.setdefault('NPLUS1_THRESHOLD', SettingsLoader.get_int('metrics', 'nplus1_threshold', 5))
+
+    # Listener global de Session: se registra una sola vez por proceso
+    if not event.contains(Session, 'do_orm_execute', _on_orm_execute):
+        event.listen(Session, 'do_orm_execute', _on_orm_execute)
+
+    @app.before_request
+    def _nplus1_before_request():
+        mode = current_app.config.get('NPLUS1_MODE', 'off')
+        if mode in ('warn', 'raise'):
+            g.nplus1_token = track_lazy_loads(mode, current_app.config['NPLUS1_THRESHOLD'], request.endpoint or request.path)
+
+    @app.teardown_request
+    def _nplus1_teardown_request(exc):
+        token = g.pop('nplus1_token', None)
+        if token is not None:
+            stop_tracking_lazy_loads(token)
+
+
+def init_instrumentation(app, engine):
+    """Registra hooks de métricas según [metrics] en settings.ini."""
+    enabled = SettingsLoader.get_bool('metrics', 'enabled', False)
+    slow_query_ms = SettingsLoader.get_int('metrics', 'slow_query_ms', 200)
+
+    _init_nplus1_detector(app)
+
+    if not enabled:
+        return
+    _register_query_listeners(engine, slow_query_ms)
+
+    metrics = RequestMetrics()
+    app.extensions['request_metrics'] = metrics
+
+    @app.before_request
+    def _metrics_before_request():
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_ms = 0.0
+
+    @app.teardown_request
+    def _metrics_teardown_request(exc):
+        # teardown (y no after_request) para contar también los requests que fallan
+        start = g.pop('metrics_start', None)
+        if start is None or request.endpoint is None:
+            return
+        metrics.record(
+            request.endpoint,
+            wall_ms=(time.perf_counter() - start) * 1000,
+            queries=g.get('metrics_queries', 0),
+            db_ms=g.get('metrics_db_ms', 0.0),
+            error=exc is not None,
+        )
+
+    app.logger.info(f"Métricas de requests habilitadas (consultas lentas >= {slow_query_ms} ms)")
+
+
+__all__ = [
+    "NPlusOneError",
+    "LazyLoadTracker",
+    "track_lazy_loads",
+    "stop_tracking_lazy_loads",
+    "LatencyHistogram",
+    "EndpointStats",
+    "RequestMetrics",
+    "get_request_metrics",
+    "init_instrumentation",
+]
@@ -0,0 +1,166 @@
+"""
+Lectura de logs desde el final del archivo.
+
+El visor de logs del panel de admin solo muestra las últimas N líneas, así
+que no tiene sentido leer el archivo entero (hasta max_file_size_mb por
+archivo más sus rotaciones). Acá se recorre el archivo hacia atrás por
+bloques sobre un mmap, saltando con rfind a la ocurrencia anterior del
+nivel o texto buscado, y se corta apenas se juntan N coincidencias.
+
+Paginación: cada página devuelve un cursor "<archivo>:<offset>" (índice de
+rotación y offset en bytes del inicio de la línea más vieja devuelta); la
+página siguiente sigue leyendo hacia atrás desde ahí.
+"""
+
+import mmap
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+
+
+class LogPage:
+    """Página de líneas de log (más recientes primero)."""
+
+    def __init__(self, lines: List[str], next_cursor: Optional[str]):
+        self.lines = lines
+        self.next_cursor = next_cursor
+
+
+def iter_log_files(log_file: Path, include_rotated: bool = False) -> Iterator[Path]:
+    """Archivo actual y, si se pide, sus rotaciones (app.log.1, app.log.2, ...) del más nuevo al más viejo."""
+    log_file = Path(log_file)
+    if log_file.exists():
+        yield log_file
+    if not include_rotated:
+        return
+    n = 1
+    while True:
+        rotated = log_file.with_name(f"{log_file.name}.{n}")
+        if not rotated.exists():
+            return
+        yield rotated
+        n += 1
+
+
+def iter_lines_reverse(
+    path: Path,
+    before: Optional[int] = None,
+    level: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Recorre `path` desde el final (o desde el offset `before`) hacia el inicio.
+
+    Yields:
+        (offset del inicio de la línea, línea sin salto) para las líneas que
+        contienen `level` y `search` (este último sin distinguir mayúsculas)
+    """
+    level_bytes = level.encode('utf-8') if level else None
+    search_text = search.lower() if search else None
+    # lower() sobre bytes solo pliega ASCII: con acentos se compara decodificado
+    search_bytes = search_text.encode('utf-8') if search_text and search_text.isascii() else None
+
+    def line_matches(line: bytes) -> bool:
+        if level_bytes and level_bytes not in line:
+            return False
+        if search_bytes is not None:
+            return search_bytes in line.lower()
+        if search_text:
+            return search_text in line.decode('utf-8', errors='replace').lower()
+        return True
+
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            block_end = size if before is None else min(before, size)
+            while block_end > 0:
+                # El bloque arranca en un inicio de línea (puede exceder BLOCK_SIZE)
+                block_start = mm.rfind(b'\n', 0, block_end - BLOCK_SIZE) + 1 if block_end > BLOCK_SIZE else 0
+                block = mm[block_start:block_end]
+
+                # Con un filtro se salta directo a la ocurrencia anterior (rfind en C)
+                # en lugar de revisar línea por línea; sin filtros se recorre todo.
+                if level_bytes:
+                    needle, haystack = level_bytes, block
+                elif search_bytes:
+                    needle, haystack = search_bytes, block.lower()
+                else:
+                    needle, haystack = None, block
+
+                pos = len(block)
+                while pos > 0:
+                    if needle is not None:
+                        hit = haystack.rfind(needle, 0, pos)
+                        if hit == -1:
+                            break
+                        line_start = block.rfind(b'\n', 0, hit) + 1
+                        line_end = block.find(b'\n', hit)
+                        if line_end == -1 or line_end > pos:
+                            line_end = pos
+                    else:
+                        line_end = pos - 1 if block[pos - 1] == 0x0A else pos
+                        line_start = block.rfind(b'\n', 0, line_end) + 1
+                    line = block[line_start:line_end]
+                    if line and line_matches(line):
+                        yield block_start + line_start, line
+                    pos = line_start
+
+                block_end = block_start
+
+
+def _parse_cursor(cursor: Optional[str]) -> Tuple[int, Optional[int]]:
+    if not cursor:
+        return 0, None
+    try:
+        file_index, offset = cursor.split(':', 1)
+        # "<archivo>:" = desde el final de ese archivo
+        return max(0, int(file_index)), (max(0, int(offset)) if offset else None)
+    except ValueError:
+        return 0, None
+
+
+def read_log_tail(
+    log_file: Path,
+    limit: int = 200,
+    level: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_rotated: bool = False,
+) -> LogPage:
+    """
+    Últimas `limit` líneas que coinciden con los filtros, más recientes primero.
+
+    Args:
+        cursor: `next_cursor` de la página anterior (None = desde el final)
+        include_rotated: seguir buscando en app.log.1, app.log.2, ... al
+            agotar el archivo actual
+    """
+    start_index, start_offset = _parse_cursor(cursor)
+
+    def _matches():
+        files = iter_log_files(log_file, include_rotated)
+        for index, path in enumerate(files):
+            if index < start_index:
+                continue
+            before = start_offset if index == start_index else None
+            for offset, line in iter_lines_reverse(path, before, level, search):
+                yield index, offset, line
+
+    found = list(islice(_matches(), limit))
+    lines = [line.decode('utf-8', errors='replace') for _, _, line in found]
+
+    next_cursor = None
+    if len(found) == limit:
+        index, offset, _ = found[-1]
+        if offset > 0:
+            next_cursor = f"{index}:{offset}"
+        elif include_rotated:
+            next_cursor = f"{index + 1}:"
+    return LogPage(lines, next_cursor)
+
+
+__all__ = ["LogPage", "iter_log_files", "iter_lines_reverse", "read_log_tail"]
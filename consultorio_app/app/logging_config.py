@@ -8,9 +8,15 @@ REGLA DE SEGURIDAD: Nunca loggear datos clínicos (nombres, DNI, diagnósticos,
 Solo loggear IDs numéricos y eventos técnicos.
 """
 
+import atexit
+import copy
+import json
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import re
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 from app.config import PathManager, SettingsLoader
 
@@ -19,24 +25,136 @@ class SanitizingFormatter(logging.Formatter):
     """
     Formatter que sanitiza logs para evitar filtración de datos sensibles.
     
-    Palabras/patrones bloqueados:
-    - Nombres propios (se reemplazan por [REDACTED])
-    - DNI completos (se muestran solo últimos 3 dígitos)
-    - Direcciones de email completas
+    Patrones enmascarados en el mensaje (y en el traceback, si hay):
+    - Emails: se conserva solo el dominio (***@dominio.com)
+    - Teléfonos (10+ dígitos, con o sin +54 / 9): solo últimos 4 dígitos
+    - DNI (7-8 dígitos, con o sin puntos): solo últimos 3 dígitos
+    
+    Es una red de seguridad: el código igual NO debe loggear datos personales.
     """
     
     SENSITIVE_FIELDS = ['nombre', 'apellido', 'dni', 'email', 'direccion', 'telefono', 'password']
     
+    EMAIL_RE = re.compile(r'[\w.+-]+@([\w-]+(?:\.[\w-]+)+)')
+    # Característica (2-4) + número (6-8), opcionalmente con +54 y 9 de celular
+    PHONE_RE = re.compile(r'(?<![\w.-])(?:\+?54[\s-]?)?(?:9[\s-]?)?\d{2,4}[\s-]?\d{2,4}[\s-]?\d{4}(?![\w.-])')
+    DNI_RE = re.compile(r'(?<![\w.-])\d{1,2}\.?\d{3}\.?\d{3}(?![\w.-])')
+    
+    @classmethod
+    def sanitize(cls, text: str) -> str:
+        if not text or not any(ch.isdigit() or ch == '@' for ch in text):
+            return text
+        text = cls.EMAIL_RE.sub(lambda m: f"***@{m.group(1)}", text)
+        text = cls.PHONE_RE.sub(cls._mask_phone, text)
+        text = cls.DNI_RE.sub(lambda m: f"***{m.group(0).replace('.', '')[-3:]}", text)
+        return text
+    
+    @staticmethod
+    def _mask_phone(match) -> str:
+        digits = re.sub(r'\D', '', match.group(0))
+        if len(digits) < 10:
+            return match.group(0)  # no es un teléfono completo (lo evalúa DNI_RE)
+        return f"***{digits[-4:]}"
+    
+    def sanitized_record(self, record):
+        """Copia del record con el mensaje ya interpolado y sanitizado."""
+        clean = logging.makeLogRecord(record.__dict__)
+        clean.msg = self.sanitize(record.getMessage())
+        clean.args = None
+        if record.exc_info and not record.exc_text:
+            clean.exc_text = self.formatException(record.exc_info)
+        if clean.exc_text:
+            clean.exc_text = self.sanitize(clean.exc_text)
+        clean.exc_info = None
+        return clean
+    
     def format(self, record):
-        # Sanitizar el mensaje antes de formatearlo
-        original_msg = record.msg
-        
-        if isinstance(original_msg, str):
-            # Aquí se pueden agregar reglas de sanitización más sofisticadas
-            # Por ahora, confiamos en que el código no loggee datos sensibles directamente
-            pass
-        
-        return super().format(record)
+        return super().format(self.sanitized_record(record))
+
+
+class JsonLinesFormatter(SanitizingFormatter):
+    """Una línea JSON por evento (para procesar los logs con herramientas)."""
+    
+    def format(self, record):
+        clean = self.sanitized_record(record)
+        entry = {
+            'ts': self.formatTime(clean, self.datefmt),
+            'level': clean.levelname,
+            'logger': clean.name,
+            'msg': clean.msg,
+            'thread': clean.threadName,
+        }
+        if clean.exc_text:
+            entry['exc'] = clean.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TracebackQueueHandler(QueueHandler):
+    """
+    QueueHandler que encola el traceback aparte del mensaje.
+    
+    QueueHandler.prepare() formatea el record antes de encolarlo: pega el
+    traceback en `msg` y borra exc_info/exc_text, con lo que JsonLinesFormatter
+    nunca ve la excepción. Acá solo se interpola el mensaje y el traceback
+    queda como texto en exc_text (sin el objeto traceback, que retiene los
+    frames hasta que el listener escribe).
+    """
+    
+    _exc_formatter = logging.Formatter()
+    
+    def prepare(self, record):
+        prepared = copy.copy(record)
+        prepared.msg = prepared.message = record.getMessage()
+        prepared.args = None
+        if record.exc_info and not record.exc_text:
+            prepared.exc_text = self._exc_formatter.formatException(record.exc_info)
+        prepared.exc_info = None
+        return prepared
+
+
+# Listeners activos de los QueueHandler (uno por logger con archivos propios)
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def stop_logging():
+    """Detiene los QueueListener vaciando la cola (se llama al salir)."""
+    with _listeners_lock:
+        while _listeners:
+            listener = _listeners.pop()
+            try:
+                listener.stop()
+            except Exception:
+                pass
+            for handler in listener.handlers:
+                handler.close()
+
+
+atexit.register(stop_logging)
+
+
+def _attach(logger, handlers, async_logging: bool):
+    """
+    Conecta los handlers al logger. En modo asíncrono el logger solo encola
+    el record (QueueHandler) y un hilo QueueListener hace el I/O y la
+    rotación, así los requests no esperan al disco ni al lock del handler.
+    
+    Returns:
+        QueueListener iniciado, o None en modo sincrónico
+    """
+    if not handlers:
+        return None
+    if not async_logging:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return None
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(TracebackQueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    with _listeners_lock:
+        _listeners.append(listener)
+    return listener
 
 
 def configure_logging(app):
@@ -56,7 +174,9 @@ def configure_logging(app):
     - Logs en consola (stdout)
     - Logs en archivo con rotación automática
     - Niveles configurables (default: INFO)
-    - Formatos estructurados con timestamps
+    - Formatos estructurados con timestamps (texto o JSON lines, ver [logging] format)
+    - Escritura asíncrona vía QueueHandler/QueueListener ([logging] async = true)
+    - Sanitización de DNI, teléfonos y emails en los mensajes
     
     Args:
         app: Instancia de Flask app
@@ -75,20 +195,28 @@ def configure_logging(app):
     root_logger.setLevel(log_level)
     
     # Limpiar handlers existentes (evitar duplicados en reloads)
+    stop_logging()
     root_logger.handlers.clear()
     
+    async_logging = SettingsLoader.get_bool('logging', 'async', True)
+    
     # Formato de logs con timestamp y nivel
     log_format = SanitizingFormatter(
         '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    if (SettingsLoader.get('logging', 'format', 'text') or 'text').strip().lower() == 'json':
+        file_format = JsonLinesFormatter(datefmt='%Y-%m-%dT%H:%M:%S')
+    else:
+        file_format = log_format
+    root_handlers = []
     
     # Handler para consola (solo en desarrollo)
     if app.debug or os.environ.get('FLASK_ENV') == 'development':
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(log_format)
-        root_logger.addHandler(console_handler)
+        root_handlers.append(console_handler)
     
     # Obtener configuración de tamaño de archivos
     max_bytes = SettingsLoader.get_int('logging', 'max_file_size_mb', 10) * 1024 * 1024
@@ -103,8 +231,8 @@ def configure_logging(app):
             encoding='utf-8'
         )
         app_handler.setLevel(log_level)
-        app_handler.setFormatter(log_format)
-        root_logger.addHandler(app_handler)
+        app_handler.setFormatter(file_format)
+        root_handlers.append(app_handler)
     except Exception as e:
         print(f"ERROR: No se pudo configurar app.log: {e}", file=sys.stderr)
     
@@ -117,15 +245,18 @@ def configure_logging(app):
             encoding='utf-8'
         )
         error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(log_format)
-        root_logger.addHandler(error_handler)
+        error_handler.setFormatter(file_format)
+        root_handlers.append(error_handler)
     except Exception as e:
         print(f"ERROR: No se pudo configurar errors.log: {e}", file=sys.stderr)
     
+    _attach(root_logger, root_handlers, async_logging)
+    
     # === Logger específico de WhatsApp ===
     whatsapp_logger = logging.getLogger('whatsapp')
     whatsapp_logger.setLevel(log_level)
     whatsapp_logger.propagate = False  # No propagar al root
+    whatsapp_logger.handlers.clear()
     
     try:
         whatsapp_handler = RotatingFileHandler(
@@ -135,8 +266,8 @@ def configure_logging(app):
             encoding='utf-8'
         )
         whatsapp_handler.setLevel(log_level)
-        whatsapp_handler.setFormatter(log_format)
-        whatsapp_logger.addHandler(whatsapp_handler)
+        whatsapp_handler.setFormatter(file_format)
+        _attach(whatsapp_logger, [whatsapp_handler], async_logging)
     except Exception as e:
         print(f"ERROR: No se pudo configurar whatsapp.log: {e}", file=sys.stderr)
     
@@ -144,6 +275,7 @@ def configure_logging(app):
     security_logger = logging.getLogger('security')
     security_logger.setLevel(logging.INFO)
     security_logger.propagate = False
+    security_logger.handlers.clear()
     
     try:
         security_handler = RotatingFileHandler(
@@ -153,8 +285,8 @@ def configure_logging(app):
             encoding='utf-8'
         )
         security_handler.setLevel(logging.INFO)
-        security_handler.setFormatter(log_format)
-        security_logger.addHandler(security_handler)
+        security_handler.setFormatter(file_format)
+        _attach(security_logger, [security_handler], async_logging)
     except Exception as e:
         print(f"ERROR: No se pudo configurar security.log: {e}", file=sys.stderr)
     
@@ -176,7 +308,8 @@ def configure_logging(app):
     root_logger.info(f"Florens iniciando - LOG_LEVEL={log_level_name}")
     root_logger.info(f"Directorio de logs: {log_dir}")
     root_logger.info(f"Modo: {'PyInstaller' if PathManager.is_frozen() else 'Desarrollo'}")
+    root_logger.info(f"Escritura de logs: {'asíncrona' if async_logging else 'sincrónica'}")
     root_logger.info("=" * 60)
 
 
-__all__ = ["configure_logging"]
+__all__ = ["configure_logging", "stop_logging", "SanitizingFormatter", "JsonLinesFormatter"]
@@ -0,0 +1,132 @@
+"""
+Caché en proceso de los archivos de app/media con hash de contenido.
+
+Cada archivo se lee y hashea una sola vez (se vuelve a leer solo si cambia
+su mtime o tamaño). El hash se usa como:
+
+- ETag fuerte en las respuestas de media_file (If-None-Match -> 304).
+- Parámetro ?v=<hash> en las URLs (media_url): una URL con el hash vigente
+  nunca cambia de contenido, así que se sirve con Cache-Control inmutable
+  de un año y el navegador no vuelve a pedirla. Al cambiar el archivo
+  cambia el hash y por lo tanto la URL.
+
+Los archivos chicos (la calibración odontograma_slots.json, íconos) se
+guardan en memoria y se sirven sin tocar el disco.
+
+La calibración se escribe de forma atómica (archivo temporal en el mismo
+directorio + os.replace) e invalida la entrada de la caché.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from flask import current_app, url_for
+
+SLOTS_FILENAME = 'odontograma_slots.json'
+MAX_CACHED_BYTES = 1024 * 1024  # más grande que esto se sirve desde disco
+CACHE_MAX_AGE = 365 * 24 * 3600
+
+
+class MediaEntry:
+    """Archivo de media con su hash y, si es chico, su contenido."""
+
+    def __init__(self, path: str, mtime_ns: int, size: int, etag: str, data: Optional[bytes]):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.etag = etag
+        self.data = data
+
+
+_entries: Dict[str, MediaEntry] = {}
+_lock = threading.Lock()
+
+
+def media_dir() -> str:
+    return os.path.join(current_app.root_path, 'media')
+
+
+def _hash_file(path: str):
+    """Retorna (hash, contenido si entra en la caché)."""
+    digest = hashlib.blake2b(digest_size=8)
+    chunks = []
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+            size += len(chunk)
+            if size <= MAX_CACHED_BYTES:
+                chunks.append(chunk)
+    return digest.hexdigest(), (b''.join(chunks) if size <= MAX_CACHED_BYTES else None)
+
+
+def get_entry(filename: str) -> Optional[MediaEntry]:
+    """Entrada cacheada de app/media/<filename>, o None si no existe."""
+    path = os.path.join(media_dir(), filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    entry = _entries.get(path)
+    if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+        return entry
+
+    etag, data = _hash_file(path)
+    entry = MediaEntry(path, stat.st_mtime_ns, stat.st_size, etag, data)
+    with _lock:
+        _entries[path] = entry
+    return entry
+
+
+def invalidate(filename: Optional[str] = None):
+    """Descarta una entrada (o toda la caché si filename es None)."""
+    with _lock:
+        if filename is None:
+            _entries.clear()
+        else:
+            _entries.pop(os.path.join(media_dir(), filename), None)
+
+
+def media_url(filename: str) -> str:
+    """URL de media_file con ?v=<hash> para cache-busting."""
+    entry = get_entry(filename)
+    if entry is None:
+        return url_for('main.media_file', filename=filename)
+    return url_for('main.media_file', filename=filename, v=entry.etag)
+
+
+def guardar_slots(data: dict) -> MediaEntry:
+    """Escribe la calibración del odontograma de forma atómica e invalida la caché."""
+    directory = media_dir()
+    fd, tmp_path = tempfile.mkstemp(prefix='.slots-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)  # mkstemp crea con 0600
+        os.replace(tmp_path, os.path.join(directory, SLOTS_FILENAME))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    invalidate(SLOTS_FILENAME)
+    return get_entry(SLOTS_FILENAME)
+
+
+__all__ = [
+    'SLOTS_FILENAME',
+    'CACHE_MAX_AGE',
+    'MediaEntry',
+    'get_entry',
+    'invalidate',
+    'media_url',
+    'guardar_slots',
+]
@@ -15,6 +15,7 @@ from .odontograma import Odontograma, OdontogramaCara
 from .conversation import Conversation
 from .usuario import Usuario
 from .gasto import Gasto
+from .app_metadata import AppMetadata
 
 # Lista de todos los modelos para facilitar la importación
 __all__ = [
@@ -34,5 +35,6 @@ __all__ = [
     'OdontogramaCara',
     'Conversation',
     'Usuario',
-    'Gasto'
+    'Gasto',
+    'AppMetadata'
 ]
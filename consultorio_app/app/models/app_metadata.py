@@ -0,0 +1,38 @@
+"""
+Metadatos de la instalación guardados en la propia base (clave/valor).
+
+Se usa para recordar qué versión de los datos por defecto ya se cargó,
+así el arranque puede saltear pasos que no cambiaron.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, String
+from app.database import db
+
+
+class AppMetadata(db.Model):
+    __tablename__ = 'app_metadata'
+
+    clave = Column(String(50), primary_key=True)
+    valor = Column(String(255), nullable=False)
+    actualizado_en = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<AppMetadata {self.clave}={self.valor}>'
+
+    @classmethod
+    def obtener(cls, clave: str) -> Optional[str]:
+        """Retorna el valor guardado para `clave` (None si no existe)."""
+        registro = db.session.get(cls, clave)
+        return registro.valor if registro else None
+
+    @classmethod
+    def guardar(cls, clave: str, valor: str):
+        """Crea o actualiza `clave` (no hace commit)."""
+        registro = db.session.get(cls, clave)
+        if registro is None:
+            db.session.add(cls(clave=clave, valor=valor))
+        else:
+            registro.valor = valor
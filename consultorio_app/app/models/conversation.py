@@ -24,7 +24,7 @@ class Conversation(db.Model):
     duracion_candidate = Column(Integer, nullable=True)
     detalle = Column(String, nullable=True)
 
-    expira_en = Column(DateTime, nullable=True)
+    expira_en = Column(DateTime, nullable=True, index=True)  # índice para el cleanup periódico
     ultima_interaccion_ts = Column(DateTime, default=datetime.utcnow, nullable=False)
     intentos_actuales = Column(Integer, default=0, nullable=False)
     confirmed = Column(Boolean, default=False, nullable=False)
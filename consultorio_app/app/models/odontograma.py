@@ -13,6 +13,11 @@ class Odontograma(db.Model):
     es_actual = Column(Boolean, default=True, nullable=False)
     nota_general = Column(String, nullable=True)
     ultima_prestacion_registrada_en = Column(DateTime, nullable=True)
+    # Almacenamiento delta: si base_id está seteado, la versión solo guarda las
+    # caras que cambiaron respecto de base_id (ver ReconstruirOdontogramaService).
+    # base_id NULL = snapshot completo. profundidad_delta = versiones desde el snapshot.
+    base_id = Column(Integer, ForeignKey("odontogramas.id"), nullable=True, index=True)
+    profundidad_delta = Column(Integer, default=0, nullable=False)
     creado_en = Column(DateTime, default=datetime.now, nullable=False)
     actualizado_en = Column(DateTime, default=datetime.now, nullable=False)
 
@@ -23,6 +28,10 @@ class Odontograma(db.Model):
         UniqueConstraint('paciente_id', 'version_seq', name='uq_odontograma_paciente_version'),
     )
 
+    @property
+    def es_snapshot(self) -> bool:
+        return self.base_id is None
+
 
 class OdontogramaCara(db.Model):
     __tablename__ = "odontograma_caras"
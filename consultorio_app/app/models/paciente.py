@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 from app.database import db
 
@@ -22,6 +22,9 @@ class Paciente(db.Model):
     lugar_trabajo = Column(String, nullable=True)
     barrio = Column(String, nullable=True)
     es_preliminar = Column(Boolean, nullable=False, default=False)
+    # max(prestaciones.fecha) desnormalizado: lo mantienen los services de prestación
+    # (ver UltimaPrestacionService). Se usa para saber si el odontograma está desactualizado.
+    ultima_prestacion_en = Column(DateTime, nullable=True)
     turnos = relationship("Turno", back_populates="paciente", cascade="all, delete-orphan")
     prestaciones = relationship("Prestacion", back_populates="paciente")
     odontogramas = relationship("Odontograma", back_populates="paciente", cascade="all, delete-orphan")
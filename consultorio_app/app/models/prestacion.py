@@ -24,6 +24,12 @@ class Prestacion(db.Model):
     importe_profesional_autorizado = Column(Float, nullable=True)
     autorizacion_adjunta_path = Column(String(255), nullable=True)
     observaciones_autorizacion = Column(String, nullable=True)
+
+    # Saldos desnormalizados (los mantiene SaldoPrestacionService):
+    # total_cobrado = SUM(cobros.monto); saldo_pendiente = importes autorizados
+    # (afiliado + coseguro) + plus - total_cobrado. Indexado para "quién debe".
+    total_cobrado = Column(Float, nullable=False, default=0.0)
+    saldo_pendiente = Column(Float, nullable=False, default=0.0, index=True)
     
     # Relaciones
     turnos = relationship("Turno", back_populates="prestacion")
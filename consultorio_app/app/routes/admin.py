@@ -11,7 +11,10 @@ from datetime import datetime
 from app.config import PathManager
 from app.models import Usuario, Paciente, Turno, Prestacion
 from app.database import db
-from app.database.utils import backup_database
+from app.database.backup import backup_files, create_backup
+from app.instrumentation import get_request_metrics
+from app.log_reader import read_log_tail
+from app.scheduler import get_cleanup_metrics
 from sqlalchemy import text
 from app.services.testing.run_tests_service import RunTestsService
 
@@ -63,14 +66,16 @@ def dashboard():
             db_path.stat().st_mtime
         ).strftime('%Y-%m-%d %H:%M:%S')
     
+    # Métricas del cleanup periódico de conversaciones
+    cleanup_metrics = get_cleanup_metrics()
+    
     # Leer últimas líneas del log (usar PathManager)
     log_lines = []
     log_file = PathManager.get_logs_dir() / 'app.log'
     if log_file.exists():
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                log_lines = f.readlines()[-50:]  # Últimas 50 líneas
-                log_lines.reverse()  # Más recientes primero
+            # Últimas 50 líneas, más recientes primero (lee desde el final)
+            log_lines = read_log_tail(log_file, limit=50).lines
         except Exception as e:
             log_lines = [f"Error leyendo log: {str(e)}"]
     else:
@@ -79,19 +84,24 @@ def dashboard():
     # Usuarios del sistema
     usuarios = Usuario.query.order_by(Usuario.ultimo_login.desc()).all()
     
-    # Información de backups (usar PathManager)
+    # Información de backups (más recientes primero)
     backups = []
-    backup_dir = PathManager.get_backups_dir()
-    if backup_dir.exists():
-        backup_files = sorted(backup_dir.glob('*.db'), key=lambda x: x.stat().st_mtime, reverse=True)[:10]
-        for filepath in backup_files:
-            backups.append({
-                'nombre': filepath.name,
-                'tamano': filepath.stat().st_size,
-                'fecha': datetime.fromtimestamp(
-                    filepath.stat().st_mtime
-                ).strftime('%Y-%m-%d %H:%M:%S')
-            })
+    for filepath in backup_files()[:10]:
+        backups.append({
+            'nombre': filepath.name,
+            'tamano': filepath.stat().st_size,
+            'fecha': datetime.fromtimestamp(
+                filepath.stat().st_mtime
+            ).strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    # Tiempos por endpoint (solo si [metrics] enabled = true)
+    metrics = get_request_metrics(current_app)
+    request_metrics = {
+        'habilitadas': metrics is not None,
+        'desde': metrics.desde.strftime('%Y-%m-%d %H:%M') if metrics else None,
+        'endpoints': metrics.snapshot()[:15] if metrics else [],
+    }
     
     return render_template(
         'admin/dashboard.html',
@@ -99,10 +109,31 @@ def dashboard():
         db_info=db_info,
         log_lines=log_lines,
         usuarios=usuarios,
-        backups=backups
+        backups=backups,
+        cleanup_metrics=cleanup_metrics,
+        request_metrics=request_metrics
     )
 
 
+@admin_bp.route('/metrics.json')
+@login_required
+@admin_required
+def descargar_metricas():
+    """Descarga las métricas por endpoint (p50/p95/p99, consultas SQL) en JSON."""
+    metrics = get_request_metrics(current_app)
+    if metrics is None:
+        abort(404)
+    response = jsonify({
+        'desde': metrics.desde.isoformat(timespec='seconds'),
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'endpoints': metrics.snapshot(),
+    })
+    response.headers['Content-Disposition'] = (
+        f"attachment; filename=metricas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    return response
+
+
 @admin_bp.route('/run-tests', methods=['POST'])
 @login_required
 @admin_required
@@ -123,18 +154,27 @@ def run_tests():
 @login_required
 @admin_required
 def crear_backup():
-    """Crea un backup manual de la base de datos."""
+    """
+    Crea un backup manual de la base de datos (completo o diferencial según
+    settings.ini) e informa los bytes escritos.
+    """
+    result = None
     try:
-        filename = backup_database()
-        if filename:
-            flash(f'✅ Backup creado: {filename}', 'success')
+        result = create_backup()
+        if result:
+            detalle = f"{result.bytes_written / 1024:.1f} KB escritos"
+            if result.kind == 'diff':
+                detalle += f", {result.changed_pages}/{result.pages} páginas cambiadas"
+            flash(f'✅ Backup creado: {result.filename} ({detalle})', 'success')
         else:
             flash('⚠️ Error al crear backup', 'error')
     except Exception as e:
         flash(f'❌ Error: {str(e)}', 'error')
     
     if request.headers.get('Accept') == 'application/json':
-        return jsonify({"status": "created", "filename": filename})
+        if result is None:
+            return jsonify({"status": "error"}), 500
+        return jsonify({"status": "created", **result.to_dict()})
     return redirect(url_for('admin.dashboard'))
 
 
@@ -150,11 +190,15 @@ def ver_logs():
         - level: DEBUG, INFO, WARNING, ERROR (default: todos)
         - lines: número de líneas a mostrar (default: 200)
         - search: búsqueda de texto
+        - rotated: 1 para seguir buscando en los archivos rotados (app.log.1, ...)
+        - cursor: posición devuelta por la página anterior (líneas más viejas)
     """
     log_type = request.args.get('log_type', 'app')
     level_filter = request.args.get('level', '')
-    lines_count = int(request.args.get('lines', 200))
+    lines_count = request.args.get('lines', 200, type=int) or 200
     search_term = request.args.get('search', '')
+    include_rotated = request.args.get('rotated') == '1'
+    cursor = request.args.get('cursor') or None
     
     # Mapeo de tipos de log a archivos
     logs_dir = PathManager.get_logs_dir()
@@ -167,6 +211,7 @@ def ver_logs():
     
     log_file = log_files.get(log_type, logs_dir / 'app.log')
     log_lines = []
+    next_cursor = None
     file_info = {
         'existe': False,
         'tamano': 0,
@@ -181,21 +226,17 @@ def ver_logs():
         ).strftime('%Y-%m-%d %H:%M:%S')
         
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                all_lines = f.readlines()
-                
-                # Filtrar por nivel si se especificó
-                if level_filter:
-                    all_lines = [line for line in all_lines if level_filter in line]
-                
-                # Filtrar por término de búsqueda
-                if search_term:
-                    all_lines = [line for line in all_lines if search_term.lower() in line.lower()]
-                
-                # Tomar últimas N líneas
-                log_lines = all_lines[-lines_count:]
-                log_lines.reverse()  # Más recientes primero
-                
+            # Lee hacia atrás desde el final y corta al juntar N coincidencias
+            page = read_log_tail(
+                log_file,
+                limit=lines_count,
+                level=level_filter or None,
+                search=search_term or None,
+                cursor=cursor,
+                include_rotated=include_rotated,
+            )
+            log_lines = page.lines
+            next_cursor = page.next_cursor
         except Exception as e:
             log_lines = [f"Error leyendo log: {str(e)}"]
             logger.error(f"Error leyendo {log_file}: {e}")
@@ -209,6 +250,9 @@ def ver_logs():
         level_filter=level_filter,
         lines_count=lines_count,
         search_term=search_term,
+        include_rotated=include_rotated,
+        cursor=cursor,
+        next_cursor=next_cursor,
         file_info=file_info,
         log_types=['app', 'whatsapp', 'security', 'errors'],
         log_levels=['DEBUG', 'INFO', 'WARNING', 'ERROR']
@@ -10,7 +10,8 @@ from app.database.session import DatabaseSession
 from app.models import Paciente, Turno, Prestacion, Estado, CambioEstado
 from app.services.practica import ListarPracticasService
 from app.services.paciente import BuscarPacientesService
-from app.services.common import PacienteNoEncontradoError
+from app.services.prestacion import CrearPrestacionesLoteService, ListarPrestacionesService
+from app.services.common import PacienteNoEncontradoError, DatosInvalidosError, LotePrestacionesInvalidoError
 from . import main_bp
 
 
@@ -286,18 +287,25 @@ def api_listar_prestaciones():
       - name: paciente_id
         in: query
         type: integer
+      - name: con_saldo
+        in: query
+        type: boolean
+        description: Only authorized/performed prestaciones with an outstanding balance, highest first
     responses:
       200:
         description: List of operations
     """
     paciente_id = request.args.get('paciente_id', type=int)
-    
-    query = Prestacion.query.options(joinedload(Prestacion.paciente))
-    
-    if paciente_id:
-        query = query.filter(Prestacion.paciente_id == paciente_id)
-    
-    prestaciones = query.order_by(Prestacion.fecha.desc()).all()
+
+    if request.args.get('con_saldo') in ('1', 'true'):
+        prestaciones = ListarPrestacionesService.listar_con_saldo_pendiente(paciente_id)
+    else:
+        query = Prestacion.query.options(joinedload(Prestacion.paciente))
+        
+        if paciente_id:
+            query = query.filter(Prestacion.paciente_id == paciente_id)
+        
+        prestaciones = query.order_by(Prestacion.fecha.desc()).all()
 
     prestaciones_data = [
         {
@@ -305,6 +313,9 @@ def api_listar_prestaciones():
             'descripcion': o.descripcion,
             'monto': float(o.monto) if o.monto else 0,
             'fecha': o.fecha.isoformat() if o.fecha else None,
+            'estado': o.estado,
+            'total_cobrado': float(o.total_cobrado or 0),
+            'saldo_pendiente': float(o.saldo_pendiente or 0),
             'paciente_id': o.paciente_id,
             'paciente_nombre': f"{o.paciente.nombre} {o.paciente.apellido}" if o.paciente else '',
         }
@@ -349,6 +360,46 @@ def api_ver_prestacion(id: int):
     })
 
 
+@main_bp.route('/api/prestaciones/lote', methods=['POST'])
+@login_required
+def api_crear_prestaciones_lote():
+    """Create many prestaciones in a single transaction (all or nothing)
+    ---
+    tags:
+      - Prestaciones
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            prestaciones:
+              type: array
+              description: "Items with paciente_id or dni, practicas (ids, {id|codigo, cantidad} or codes text), optional descripcion, descuento_porcentaje, descuento_fijo, observaciones"
+              items:
+                type: object
+    responses:
+      201:
+        description: Prestaciones created
+      400:
+        description: Invalid batch; errores lists the problem of each row and nothing was saved
+    """
+    data = request.get_json(silent=True)
+    filas = data.get('prestaciones') if isinstance(data, dict) else data
+    if not isinstance(filas, list):
+        return jsonify({'error': 'Se espera {"prestaciones": [...]}'}), 400
+
+    try:
+        ids = CrearPrestacionesLoteService.execute(filas)
+    except LotePrestacionesInvalidoError as e:
+        return jsonify({'error': e.mensaje, 'errores': e.errores}), 400
+    except DatosInvalidosError as e:
+        return jsonify({'error': e.mensaje}), 400
+
+    return jsonify({'ids': ids, 'cantidad': len(ids)}), 201
+
+
 # ===================== ESTADOS API =====================
 
 @main_bp.route('/api/estados')
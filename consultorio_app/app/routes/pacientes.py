@@ -1,11 +1,12 @@
 import os
-import json
+import mimetypes
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
-from flask import render_template, request, redirect, url_for, flash, jsonify, send_from_directory, current_app
+from flask import render_template, request, redirect, url_for, flash, jsonify, send_from_directory, current_app, abort
 from flask_login import login_required, current_user
 from app.models import Prestacion, ObraSocial, Localidad, Paciente
 from app.forms import PacienteForm
+from app import media_cache
 from app.services.paciente import (
     BuscarPacientesService,
     CrearPacienteService,
@@ -15,6 +16,8 @@ from app.services.paciente import (
 from app.services.odontograma import (
   ObtenerOdontogramaService,
   CrearVersionOdontogramaService,
+  ReconstruirOdontogramaService,
+  CompararOdontogramaService,
 )
 from app.services.common import (
     PacienteNoEncontradoError,
@@ -22,6 +25,7 @@ from app.services.common import (
     DatosInvalidosPacienteError,
     LocalidadNoEncontradaError,
     PacienteError,
+    OdontogramaNoEncontradoError,
 )
 from . import main_bp
 
@@ -42,7 +46,24 @@ def media_file(filename: str):
     public_exts = {'.png', '.ico', '.json'}
     if not current_user.is_authenticated and ext not in public_exts:
         return redirect(url_for('main.login'))
-    return send_from_directory(media_dir, safe_path)
+
+    entry = media_cache.get_entry(safe_path)
+    if entry is None:
+        abort(404)
+    if entry.data is not None:
+        mimetype = mimetypes.guess_type(safe_path)[0] or 'application/octet-stream'
+        response = current_app.response_class(entry.data, mimetype=mimetype)
+    else:
+        response = send_from_directory(media_dir, safe_path, etag=False)
+    response.set_etag(entry.etag)
+    # Con ?v=<hash vigente> la URL es inmutable; sin él, revalidar siempre por ETag
+    if request.args.get('v') == entry.etag:
+        response.cache_control.public = True
+        response.cache_control.max_age = media_cache.CACHE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @main_bp.route('/odontograma/slots', methods=['POST'])
@@ -52,11 +73,9 @@ def guardar_slots_odontograma():
   data = request.get_json(silent=True) or {}
   if 'config' not in data or 'teeth' not in data:
     return jsonify({"error": "Payload inválido"}), 400
-  slots_path = os.path.join(current_app.root_path, 'media', 'odontograma_slots.json')
   try:
-    with open(slots_path, 'w', encoding='utf-8') as f:
-      json.dump(data, f, ensure_ascii=False, indent=2)
-    return jsonify({"ok": True})
+    entry = media_cache.guardar_slots(data)
+    return jsonify({"ok": True, "url": media_cache.media_url(media_cache.SLOTS_FILENAME), "hash": entry.etag})
   except Exception:
     return jsonify({"error": "No se pudo guardar la calibración"}), 500
 
@@ -274,7 +293,7 @@ def obtener_datos_odontograma(id: int):
                 "marca_texto": getattr(c, 'marca_texto', None),
                 "comentario": getattr(c, 'comentario', None),
               }
-              for c in getattr(od, 'caras', [])
+              for c in ReconstruirOdontogramaService.execute(od.id)
             ]
           }
 
@@ -297,6 +316,23 @@ def obtener_datos_odontograma(id: int):
         return jsonify({"error": str(e)}), 400
 
 
+@main_bp.route('/pacientes/<int:id>/odontograma/comparar')
+@login_required
+def comparar_odontograma(id: int):
+    """Devuelve en JSON solo las caras que cambiaron entre dos versiones.
+
+    Query params: desde (obligatorio) y hasta (opcional, default la versión actual).
+    """
+    desde_id = request.args.get('desde', type=int)
+    hasta_id = request.args.get('hasta', type=int)
+    if not desde_id:
+        return jsonify({"error": "Falta el parámetro 'desde'"}), 400
+    try:
+        return jsonify(CompararOdontogramaService.execute(id, desde_id, hasta_id))
+    except OdontogramaNoEncontradoError as e:
+        return jsonify({"error": e.mensaje}), 404
+
+
 @main_bp.route('/pacientes/<int:id>/odontograma/version', methods=['POST'])
 @login_required
 def crear_version_odontograma(id: int):
@@ -342,7 +378,7 @@ def crear_version_odontograma(id: int):
                         "marca_texto": getattr(c, 'marca_texto', None),
                         "comentario": getattr(c, 'comentario', None),
                     }
-                    for c in getattr(od, 'caras', [])
+                    for c in ReconstruirOdontogramaService.execute(od.id)
                 ]
             }
 
@@ -1,3 +1,5 @@
+import json
+
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from app.forms import PracticaForm
@@ -6,11 +8,13 @@ from app.services.practica import (
     CrearPracticaService,
     EditarPracticaService,
     EliminarPracticaService,
+    ImportarPreciosService,
 )
 from app.services.common import (
     PracticaNoEncontradaError,
     PracticaConDependenciasError,
     DatosInvalidosError,
+    ObraSocialNoEncontradaError,
 )
 from app.models import ObraSocial
 from . import main_bp
@@ -155,3 +159,54 @@ def eliminar_practica(id: int):
         flash(f'Error al dar de baja práctica: {str(e)}', 'error')
     
     return redirect(url_for('main.listar_practicas'))
+
+
+@main_bp.route('/practicas/importar', methods=['GET', 'POST'])
+@login_required
+def importar_precios():
+    """Importa una lista de precios (CSV/XLSX): primero muestra el diff, después aplica.
+
+    El primer POST (con archivo) solo planifica y muestra altas/modificaciones/bajas.
+    El POST de confirmación reenvía las filas leídas, se vuelve a planificar contra
+    la base actual y se aplica todo en una transacción.
+    """
+    obras_sociales = ObraSocial.query.filter(~ObraSocial.nombre.ilike('%PARTICULAR%')).order_by(ObraSocial.nombre).all()
+    if request.method == 'GET':
+        return render_template('practicas/importar.html', obras_sociales=obras_sociales, plan=None)
+
+    obra_social_id = request.form.get('obra_social_id', type=int) or None
+    dar_de_baja = request.form.get('dar_de_baja_faltantes') == '1'
+    try:
+        if request.form.get('confirmar'):
+            filas = json.loads(request.form.get('filas_json') or '[]')
+        else:
+            archivo = request.files.get('archivo')
+            if not archivo or not archivo.filename:
+                raise DatosInvalidosError('Seleccioná un archivo .csv o .xlsx')
+            filas = ImportarPreciosService.leer_archivo(archivo.read(), archivo.filename)
+
+        plan = ImportarPreciosService.planificar(filas, obra_social_id, dar_de_baja)
+
+        if request.form.get('confirmar'):
+            aplicado = ImportarPreciosService.aplicar(plan)
+            flash(
+                f"Lista importada: {aplicado['altas']} altas, {aplicado['modificaciones']} modificaciones, "
+                f"{aplicado['bajas']} bajas",
+                'success',
+            )
+            return redirect(url_for('main.listar_practicas'))
+    except (DatosInvalidosError, ObraSocialNoEncontradaError) as e:
+        flash(e.mensaje, 'error')
+        return render_template('practicas/importar.html', obras_sociales=obras_sociales, plan=None)
+    except ValueError:
+        flash('Los datos de la importación no son válidos; volvé a subir el archivo', 'error')
+        return render_template('practicas/importar.html', obras_sociales=obras_sociales, plan=None)
+
+    return render_template(
+        'practicas/importar.html',
+        obras_sociales=obras_sociales,
+        plan=plan,
+        obra_social_id=obra_social_id,
+        dar_de_baja_faltantes=dar_de_baja,
+        filas_json=json.dumps(filas, ensure_ascii=False, default=str),
+    )
@@ -4,10 +4,10 @@ from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app.database import db
 from app.forms import PrestacionForm
-from app.models import Prestacion
 from app.services.prestacion import (
     ListarPrestacionesService,
     CrearPrestacionService,
+    CrearPrestacionesLoteService,
     ActualizarPrestacionService,
     EliminarPrestacionService,
     RegistrarAutorizacionPrestacionService,
@@ -20,11 +20,13 @@ from app.services.practica import ListarPracticasService
 from app.services.common import (
     PacienteNoEncontradoError,
     PracticaNoEncontradaError,
+    PrestacionNoEncontradaError,
     DatosInvalidosError,
     OdontoAppError,
     EstadoPrestacionInvalidoError,
     PrestacionNoAutorizadaError,
     FechasRealizacionInvalidasError,
+    LotePrestacionesInvalidoError,
 )
 from . import main_bp
 
@@ -168,15 +170,41 @@ def nueva_prestacion():
     )
 
 
+@main_bp.route('/prestaciones/importar', methods=['GET', 'POST'])
+@login_required
+def importar_prestaciones():
+    """Alta masiva de prestaciones desde CSV/XLSX (lotes de autorizaciones).
+
+    Se guarda todo el lote o nada: si alguna fila tiene errores se muestran
+    por fila y no se crea ninguna prestación.
+    """
+    if request.method == 'GET':
+        return render_template('prestaciones/importar.html', errores=None)
+
+    archivo = request.files.get('archivo')
+    try:
+        if not archivo or not archivo.filename:
+            raise DatosInvalidosError('Seleccioná un archivo .csv o .xlsx')
+        filas = CrearPrestacionesLoteService.leer_archivo(archivo.read(), archivo.filename)
+        ids = CrearPrestacionesLoteService.execute(filas)
+    except LotePrestacionesInvalidoError as e:
+        flash(e.mensaje, 'error')
+        return render_template('prestaciones/importar.html', errores=e.errores)
+    except DatosInvalidosError as e:
+        flash(e.mensaje, 'error')
+        return render_template('prestaciones/importar.html', errores=None)
+
+    flash(f'Se registraron {len(ids)} prestaciones', 'success')
+    return redirect(url_for('main.listar_prestaciones'))
+
+
 @main_bp.route('/prestaciones/<int:prestacion_id>', methods=['GET'])
 @login_required
 def ver_prestacion(prestacion_id: int):
     """Ver detalles de una prestación y permitir autorizar, cobrar, realizar."""
-    prestacion = db.session.query(Prestacion).filter(
-        Prestacion.id == prestacion_id
-    ).first()
-    
-    if not prestacion:
+    try:
+        prestacion = ListarPrestacionesService.obtener_detalle(prestacion_id)
+    except PrestacionNoEncontradaError:
         flash('Prestación no encontrada', 'error')
         return redirect(url_for('main.listar_prestaciones'))
     
@@ -190,11 +218,9 @@ def ver_prestacion(prestacion_id: int):
 @login_required
 def editar_prestacion(prestacion_id: int):
     """Permite editar una prestación en estado borrador."""
-    prestacion = db.session.query(Prestacion).filter(
-        Prestacion.id == prestacion_id
-    ).first()
-
-    if not prestacion:
+    try:
+        prestacion = ListarPrestacionesService.obtener_detalle(prestacion_id)
+    except PrestacionNoEncontradaError:
         flash('Prestación no encontrada', 'error')
         return redirect(url_for('main.listar_prestaciones'))
 
@@ -290,11 +316,11 @@ def editar_prestacion(prestacion_id: int):
 @login_required
 def eliminar_prestacion(prestacion_id: int):
     """Elimina físicamente una prestación en estado borrador."""
-    prestacion = db.session.query(Prestacion).filter(
-        Prestacion.id == prestacion_id
-    ).first()
-
-    paciente_id = prestacion.paciente_id if prestacion else None
+    try:
+        # Con las colecciones ya cargadas, el cascade del borrado no hace SELECTs lazy
+        paciente_id = ListarPrestacionesService.obtener_detalle(prestacion_id).paciente_id
+    except PrestacionNoEncontradaError:
+        paciente_id = None
 
     try:
         EliminarPrestacionService.execute(prestacion_id)
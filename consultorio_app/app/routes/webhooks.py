@@ -43,8 +43,8 @@ def whatsapp_webhook():
             return "Invalid request", 400
     
     elif request.method == 'POST':
-        # Procesar webhook
-        body = request.get_data(as_text=True)
+        # Procesar webhook: la firma se valida sobre los bytes crudos (sin decodificar)
+        body = request.get_data()
         signature = request.headers.get('X-Hub-Signature-256', '')
         
         # Log de entrada
@@ -54,40 +54,31 @@ def whatsapp_webhook():
         response_data, status = handler.handle_webhook(
             body,
             signature,
-            ConversationService
+            ConversationService,
+            rate_limiter=RateLimiter,
         )
         
+        if handler.rate_limited:
+            logger.warning(f"Rate limit exceeded for {handler.last_payload.channel_user_id}; mensaje descartado")
+        
         # Si la respuesta fue procesada exitosamente, intentar enviar mensaje
-        if status == 200 and response_data.get('status') == 'received' and getattr(handler, 'last_reply_message', None):
+        payload = handler.last_payload
+        if status == 200 and response_data.get('status') == 'received' and handler.last_reply_message and payload:
             try:
-                # Extraer información del webhook
-                import json
-                payload = json.loads(body)
+                # Reutilizar el payload ya parseado por el handler
+                # (el rate limit ya se aplicó antes de procesar el mensaje)
+                channel_user_id = payload.channel_user_id
                 
-                # Información del mensaje
-                from app.adapters.whatsapp.webhook_handler import WhatsAppPayloadParser
-                message_info = WhatsAppPayloadParser.extract_message_info(payload)
+                # Enviar respuesta vía WhatsApp (reply_message ya contiene el texto)
+                success, result = WhatsAppMessageService.send_text_message(
+                    channel_user_id,
+                    handler.last_reply_message
+                )
                 
-                if message_info:
-                    channel_user_id, _ = message_info
-                    
-                    # Verificar rate limit
-                    allowed, limit_message = RateLimiter.check_rate_limit(channel_user_id)
-                    if not allowed:
-                        logger.warning(f"Rate limit exceeded for {channel_user_id}")
-                        # El rate limit se debe aplicar antes de procesar, 
-                        # pero por ahora solo lo logueamos
-                    
-                    # Enviar respuesta vía WhatsApp (reply_message ya contiene el texto)
-                    success, result = WhatsAppMessageService.send_text_message(
-                        channel_user_id,
-                        handler.last_reply_message
-                    )
-                    
-                    if success:
-                        logger.info(f"Message sent successfully to {channel_user_id}")
-                    else:
-                        logger.error(f"Failed to send message to {channel_user_id}: {result}")
+                if success:
+                    logger.info(f"Message sent successfully to {channel_user_id}")
+                else:
+                    logger.error(f"Failed to send message to {channel_user_id}: {result}")
             
             except Exception as e:
                 logger.exception(f"Error sending WhatsApp message: {str(e)}")
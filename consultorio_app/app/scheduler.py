@@ -3,27 +3,76 @@ Tareas periódicas para mantenimiento de la aplicación.
 """
 
 from datetime import datetime, date
+import time
 
+from sqlalchemy import delete, select
+
+from app.config import SettingsLoader
 from app.database import db
+from app.database.backup import create_backup
 from app.models import Conversation, Turno, Estado
+from app.security import RateLimiter
 from app.services.turno.cambiar_estado_turno_service import CambiarEstadoTurnoService
 
+# Filas borradas por transacción en el cleanup: acota cuánto tiempo se
+# retiene el lock de escritura de SQLite aunque haya un backlog grande.
+CLEANUP_BATCH_SIZE = 500
+
+# Métricas del cleanup de conversaciones (en memoria, por proceso)
+_cleanup_metrics = {
+    'ejecuciones': 0,
+    'conversaciones_eliminadas': 0,
+    'ultima_ejecucion': None,
+    'ultima_eliminadas': 0,
+    'ultima_duracion_ms': None,
+}
+
+
+def get_cleanup_metrics() -> dict:
+    """Retorna una copia de las métricas del cleanup de conversaciones."""
+    return dict(_cleanup_metrics)
+
+
+def get_interval_minutes() -> int:
+    """Intervalo de las tareas periódicas ([scheduler] update_interval_minutes, mínimo 1)."""
+    return max(1, SettingsLoader.get_int('scheduler', 'update_interval_minutes', 5))
+
 
-def cleanup_expired_conversations():
+def cleanup_expired_conversations(batch_size: int = CLEANUP_BATCH_SIZE):
     """
     Elimina conversaciones que han expirado.
     
     Debe ejecutarse periodicamente (ej: cada 5 minutos) para mantener
     la tabla conversations limpia de intentos abandonados.
+
+    Borra en lotes de `batch_size` (DELETE ... WHERE id IN (SELECT ... LIMIT n)
+    sobre el índice de expira_en), con un commit por lote para no bloquear
+    la base mientras se procesa un backlog grande.
     """
     now = datetime.utcnow()
+    inicio = time.perf_counter()
+    expired_count = 0
     
-    # Buscar conversaciones expiradas
-    expired_count = Conversation.query.filter(
-        Conversation.expira_en < now
-    ).delete()
+    while True:
+        lote = (
+            select(Conversation.id)
+            .where(Conversation.expira_en < now)
+            .limit(batch_size)
+        )
+        deleted = db.session.execute(
+            delete(Conversation).where(Conversation.id.in_(lote)),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        db.session.commit()
+        expired_count += deleted
+        if deleted < batch_size:
+            break
     
-    db.session.commit()
+    _cleanup_metrics['ejecuciones'] += 1
+    _cleanup_metrics['conversaciones_eliminadas'] += expired_count
+    _cleanup_metrics['ultima_ejecucion'] = now
+    _cleanup_metrics['ultima_eliminadas'] = expired_count
+    _cleanup_metrics['ultima_duracion_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
     
     if expired_count > 0:
         print(f"[cleanup] Eliminadas {expired_count} conversaciones expiradas")
@@ -31,6 +80,37 @@ def cleanup_expired_conversations():
     return expired_count
 
 
+def cleanup_rate_limiter():
+    """
+    Elimina del rate limiter los usuarios sin mensajes en la ventana actual.
+
+    Mantiene la memoria acotada aunque lleguen mensajes de muchos números
+    distintos (spam): cada número inactivo se descarta en la próxima pasada.
+    """
+    evicted = RateLimiter.cleanup_old_entries()
+    if evicted > 0:
+        print(f"[cleanup] Rate limiter: eliminados {evicted} usuarios inactivos")
+    return evicted
+
+
+def get_backup_interval_hours() -> int:
+    """Frecuencia del backup automático ([database] backup_interval_hours, 0 = deshabilitado)."""
+    return max(0, SettingsLoader.get_int('database', 'backup_interval_hours', 24))
+
+
+def run_scheduled_backup():
+    """
+    Backup online periódico de la base (ver app/database/backup.py).
+
+    Corre en el hilo del scheduler y no usa la sesión de SQLAlchemy: la copia
+    se hace con la API de backup de SQLite en pasos de pocas páginas.
+    """
+    result = create_backup()
+    if result is not None:
+        print(f"[scheduler] Backup creado: {result.filename} ({result.bytes_written} bytes)")
+    return result
+
+
 def actualizar_turnos_no_atendidos():
     """
     Marca como NoAtendido los turnos vencidos que no fueron atendidos.
@@ -127,32 +207,57 @@ def register_background_tasks(app):
             return wrapper
 
         scheduler = BackgroundScheduler()
+        interval_minutes = get_interval_minutes()
         
-        # Cleanup de conversaciones cada 5 minutos
+        # Cleanup de conversaciones cada [scheduler] update_interval_minutes
         scheduler.add_job(
             _with_app_context(cleanup_expired_conversations),
             'interval',
-            minutes=5,
+            minutes=interval_minutes,
             id='cleanup_conversations',
             name='Cleanup conversaciones expiradas',
             replace_existing=True
         )
 
-        # Actualizar turnos vencidos a NoAtendido cada 5 minutos
+        # Eviction de usuarios inactivos del rate limiter (solo memoria, sin app_context)
+        scheduler.add_job(
+            cleanup_rate_limiter,
+            'interval',
+            minutes=RateLimiter.CLEANUP_INTERVAL_MINUTES,
+            id='cleanup_rate_limiter',
+            name='Cleanup rate limiter',
+            replace_existing=True
+        )
+
+        # Actualizar turnos vencidos a NoAtendido (mismo intervalo)
         scheduler.add_job(
             _with_app_context(actualizar_turnos_no_atendidos),
             'interval',
-            minutes=5,
+            minutes=interval_minutes,
             id='actualizar_turnos_vencidos',
             name='Actualizar turnos vencidos',
             replace_existing=True
         )
         
+        # Backup online periódico (sin app_context: usa su propia conexión sqlite3)
+        backup_hours = get_backup_interval_hours()
+        if backup_hours > 0:
+            scheduler.add_job(
+                run_scheduled_backup,
+                'interval',
+                hours=backup_hours,
+                id='backup_database',
+                name='Backup de la base de datos',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+        
         with app.app_context():
             scheduler.start()
         app.extensions = getattr(app, 'extensions', {})
         app.extensions['apscheduler'] = scheduler
-        print("[scheduler] Tareas periódicas registradas")
+        print(f"[scheduler] Tareas periódicas registradas (cada {interval_minutes} min)")
         
         return scheduler
     except ImportError:
@@ -165,6 +270,11 @@ def register_background_tasks(app):
 
 __all__ = [
     "cleanup_expired_conversations",
+    "cleanup_rate_limiter",
+    "get_cleanup_metrics",
+    "get_interval_minutes",
+    "get_backup_interval_hours",
+    "run_scheduled_backup",
     "actualizar_turnos_no_atendidos",
     "register_background_tasks",
 ]
@@ -3,5 +3,15 @@ Inicializador del módulo security.
 """
 
 from .rate_limiter import RateLimiter
+from .rate_limit_backends import (
+    RateLimitBackend,
+    MemoryRateLimitBackend,
+    SQLiteRateLimitBackend,
+)
 
-__all__ = ["RateLimiter"]
+__all__ = [
+    "RateLimiter",
+    "RateLimitBackend",
+    "MemoryRateLimitBackend",
+    "SQLiteRateLimitBackend",
+]
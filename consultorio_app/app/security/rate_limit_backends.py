@@ -0,0 +1,216 @@
+"""
+Backends de almacenamiento para RateLimiter.
+
+- MemoryRateLimitBackend: ventana deslizante en memoria del proceso. Es el
+  default y alcanza cuando la app corre en un único proceso (modo desktop).
+- SQLiteRateLimitBackend: contadores por (usuario, ventana) en una tabla de
+  SQLite, actualizados con UPSERT atómico. Permite que varios workers
+  (waitress/gunicorn) compartan los límites sin depender de un servicio externo.
+
+Se selecciona en settings.ini:
+
+    [rate_limit]
+    backend = memory        ; memory | sqlite
+    requests_per_minute = 5
+"""
+
+from collections import deque
+from contextlib import closing
+from pathlib import Path
+from typing import Deque, Dict, List, Union
+import logging
+import sqlite3
+import threading
+import time
+
+from app.config import PathManager
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend:
+    """Interfaz común de los backends de rate limiting."""
+
+    name = "base"
+
+    def __init__(self, limit: int, window_seconds: int):
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    def hit(self, key: str) -> bool:
+        """Registra un mensaje de `key`. Retorna True si está dentro del límite."""
+        raise NotImplementedError
+
+    def cleanup(self) -> int:
+        """Elimina registros que ya no aportan al chequeo. Retorna cuántos se borraron."""
+        raise NotImplementedError
+
+    def tracked_keys(self) -> int:
+        """Cantidad de usuarios con registros almacenados."""
+        raise NotImplementedError
+
+    def reset(self):
+        """Vacía el almacenamiento (uso en tests)."""
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Ventana deslizante en memoria.
+
+    Cada usuario tiene un deque acotado (maxlen = limit) de timestamps de
+    time.monotonic(): cada chequeo es O(1) y no depende de cambios en el reloj
+    del sistema. El store se reparte en shards con su propio lock para que
+    usuarios distintos no compitan entre sí.
+    """
+
+    name = "memory"
+    NUM_SHARDS = 16
+
+    def __init__(self, limit: int, window_seconds: int):
+        super().__init__(limit, window_seconds)
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(self.NUM_SHARDS)]
+        self._stores: List[Dict[str, Deque[float]]] = [{} for _ in range(self.NUM_SHARDS)]
+
+    def _shard(self, key: str) -> int:
+        return hash(key) % self.NUM_SHARDS
+
+    def hit(self, key: str) -> bool:
+        idx = self._shard(key)
+        now = time.monotonic()
+        window_start = now - self.window_seconds
+
+        with self._locks[idx]:
+            store = self._stores[idx]
+            records = store.get(key)
+            if records is None or records.maxlen != self.limit:
+                records = deque(records or (), maxlen=self.limit)
+                store[key] = records
+
+            # El deque guarda como máximo N timestamps: si está lleno y el más
+            # viejo sigue dentro de la ventana, ya hubo N mensajes en el último minuto.
+            if len(records) == records.maxlen and records[0] > window_start:
+                return False
+
+            # Agregar nuevo registro (maxlen descarta el más viejo)
+            records.append(now)
+            return True
+
+    def cleanup(self) -> int:
+        # Un usuario es inactivo si su último mensaje quedó fuera de la ventana
+        window_start = time.monotonic() - self.window_seconds
+        evicted = 0
+        for idx in range(self.NUM_SHARDS):
+            with self._locks[idx]:
+                store = self._stores[idx]
+                idle = [key for key, records in store.items() if not records or records[-1] <= window_start]
+                for key in idle:
+                    del store[key]
+                evicted += len(idle)
+        return evicted
+
+    def tracked_keys(self) -> int:
+        total = 0
+        for idx in range(self.NUM_SHARDS):
+            with self._locks[idx]:
+                total += len(self._stores[idx])
+        return total
+
+    def reset(self):
+        for idx in range(self.NUM_SHARDS):
+            with self._locks[idx]:
+                self._stores[idx].clear()
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Contadores de ventana fija en una tabla SQLite compartida entre procesos.
+
+    Cada mensaje hace un UPSERT sobre (channel_user_id, window_start) dentro
+    de una transacción BEGIN IMMEDIATE, por lo que dos workers nunca pierden
+    incrementos. La ventana se calcula con time.time() (reloj de pared),
+    porque time.monotonic() no es comparable entre procesos.
+
+    Cada operación abre y cierra su propia conexión sqlite3 (no la sesión
+    de SQLAlchemy) para no mezclar sus commits con la transacción del
+    request ni dejar conexiones abiertas en los hilos del servidor.
+
+    La tabla la crea la migración 22 (app/database/migrations.py).
+    """
+
+    name = "sqlite"
+    TABLE = "rate_limit_counters"
+
+    def __init__(self, limit: int, window_seconds: int, db_path: Union[str, Path]):
+        super().__init__(limit, window_seconds)
+        self.db_path = str(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: manejamos BEGIN/COMMIT explícitamente
+        return sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+
+    def _current_window(self) -> int:
+        return int(time.time() // self.window_seconds) * self.window_seconds
+
+    def hit(self, key: str) -> bool:
+        window_start = self._current_window()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    f"INSERT INTO {self.TABLE} (channel_user_id, window_start, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT(channel_user_id, window_start) DO UPDATE SET count = count + 1",
+                    (key, window_start),
+                )
+                count = conn.execute(
+                    f"SELECT count FROM {self.TABLE} WHERE channel_user_id = ? AND window_start = ?",
+                    (key, window_start),
+                ).fetchone()[0]
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return count <= self.limit
+
+    def cleanup(self) -> int:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE window_start < ?",
+                (self._current_window(),),
+            )
+            return cursor.rowcount
+
+    def tracked_keys(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                f"SELECT COUNT(DISTINCT channel_user_id) FROM {self.TABLE}"
+            ).fetchone()[0]
+
+    def reset(self):
+        with closing(self._connect()) as conn:
+            conn.execute(f"DELETE FROM {self.TABLE}")
+
+
+def create_backend(name: str, limit: int, window_seconds: int, db_path=None) -> RateLimitBackend:
+    """
+    Construye el backend indicado por nombre ('memory' o 'sqlite').
+
+    Un nombre desconocido cae en 'memory' con un warning, para no impedir
+    el arranque por un typo en settings.ini.
+    """
+    name = (name or "memory").strip().lower()
+    if name == SQLiteRateLimitBackend.name:
+        if db_path is None:
+            db_path = PathManager.get_db_path()
+        return SQLiteRateLimitBackend(limit, window_seconds, db_path)
+    if name != MemoryRateLimitBackend.name:
+        logger.warning(f"Backend de rate limit desconocido '{name}'. Usando 'memory'.")
+    return MemoryRateLimitBackend(limit, window_seconds)
+
+
+__all__ = [
+    "RateLimitBackend",
+    "MemoryRateLimitBackend",
+    "SQLiteRateLimitBackend",
+    "create_backend",
+]
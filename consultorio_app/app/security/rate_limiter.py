@@ -1,29 +1,53 @@
 """
 Rate limiting simple por usuario/canal para prevenir abuso.
+
+El almacenamiento se delega a un backend (ver rate_limit_backends.py)
+elegido en settings.ini, sección [rate_limit]:
+- memory (default): ventana deslizante en memoria del proceso
+- sqlite: contadores compartidos entre workers en una tabla de la BD
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Tuple
+from typing import Optional, Tuple
 import threading
 
-# Lock para thread-safety
-_rate_limit_lock = threading.RLock()
+from app.config import SettingsLoader
+from .rate_limit_backends import RateLimitBackend, create_backend
 
-# Store de rate limits: {channel_user_id: [(timestamp, count), ...]}
-_rate_limit_store: Dict[str, list] = {}
+# Lock solo para la construcción perezosa del backend
+_backend_lock = threading.Lock()
 
 
 class RateLimiter:
-    """Rate limiter simple en memoria."""
+    """Rate limiter por usuario con backend configurable."""
     
-    # Configuración
+    # Configuración (requests_per_minute se puede sobreescribir en settings.ini)
     REQUESTS_PER_MINUTE = 5  # Máximo 5 mensajes por minuto por usuario
+    WINDOW_SECONDS = 60
     CLEANUP_INTERVAL_MINUTES = 10
+
+    _backend: Optional[RateLimitBackend] = None
+
+    @classmethod
+    def get_backend(cls) -> RateLimitBackend:
+        """Retorna el backend activo, construyéndolo desde settings.ini la primera vez."""
+        if cls._backend is None:
+            with _backend_lock:
+                if cls._backend is None:
+                    name = SettingsLoader.get('rate_limit', 'backend', 'memory')
+                    limit = SettingsLoader.get_int('rate_limit', 'requests_per_minute', cls.REQUESTS_PER_MINUTE)
+                    cls._backend = create_backend(name, limit, cls.WINDOW_SECONDS)
+        return cls._backend
+
+    @classmethod
+    def configure(cls, backend: Optional[RateLimitBackend]):
+        """Fija el backend explícitamente (None = volver a leer settings.ini)."""
+        with _backend_lock:
+            cls._backend = backend
     
-    @staticmethod
-    def check_rate_limit(channel_user_id: str) -> Tuple[bool, str]:
+    @classmethod
+    def check_rate_limit(cls, channel_user_id: str) -> Tuple[bool, str]:
         """
-        Verifica si el usuario ha excedido el rate limit.
+        Verifica si el usuario ha excedido el rate limit y, si no, registra el mensaje.
         
         Args:
             channel_user_id: ID del usuario (ej: número de WhatsApp)
@@ -33,45 +57,30 @@ class RateLimiter:
             - (True, "") si está dentro del límite
             - (False, "Rate limit exceeded...") si excedió
         """
-        with _rate_limit_lock:
-            now = datetime.utcnow()
-            window_start = now - timedelta(minutes=1)
-            
-            if channel_user_id not in _rate_limit_store:
-                _rate_limit_store[channel_user_id] = [(now, 1)]
-                return True, ""
-            
-            # Limpiar registros viejos (> 1 minuto)
-            records = _rate_limit_store[channel_user_id]
-            records = [(ts, count) for ts, count in records if ts > window_start]
-            
-            # Contar mensajes en ventana
-            message_count = sum(count for _, count in records)
-            
-            if message_count >= RateLimiter.REQUESTS_PER_MINUTE:
-                return False, f"Rate limit exceeded. Max {RateLimiter.REQUESTS_PER_MINUTE} messages per minute."
-            
-            # Agregar nuevo registro
-            records.append((now, 1))
-            _rate_limit_store[channel_user_id] = records
-            
+        backend = cls.get_backend()
+        if backend.hit(channel_user_id):
             return True, ""
+        return False, f"Rate limit exceeded. Max {backend.limit} messages per minute."
     
-    @staticmethod
-    def cleanup_old_entries():
-        """Limpia entradas antiguas del store (ejecutar periódicamente)."""
-        with _rate_limit_lock:
-            now = datetime.utcnow()
-            cleanup_window = now - timedelta(minutes=RateLimiter.CLEANUP_INTERVAL_MINUTES)
-            
-            for channel_user_id in list(_rate_limit_store.keys()):
-                records = _rate_limit_store[channel_user_id]
-                records = [(ts, count) for ts, count in records if ts > cleanup_window]
-                
-                if not records:
-                    del _rate_limit_store[channel_user_id]
-                else:
-                    _rate_limit_store[channel_user_id] = records
+    @classmethod
+    def cleanup_old_entries(cls) -> int:
+        """
+        Elimina registros de usuarios inactivos (ejecutar periódicamente).
+        
+        Returns:
+            int: Cantidad de registros eliminados
+        """
+        return cls.get_backend().cleanup()
+
+    @classmethod
+    def tracked_users(cls) -> int:
+        """Cantidad de usuarios con registros almacenados (útil para monitoreo/tests)."""
+        return cls.get_backend().tracked_keys()
+
+    @classmethod
+    def reset(cls):
+        """Vacía el almacenamiento del backend activo (uso en tests)."""
+        cls.get_backend().reset()
 
 
 __all__ = ["RateLimiter"]
@@ -20,82 +20,82 @@ Principios arquitectónicos:
 - Excepciones propias para errores de negocio
 """
 
+from importlib import import_module
 
-# Nuevos services por dominio
-from .common import (
-    OdontoAppError,
-    PacienteError,
-    PacienteNoEncontradoError,
-    PacienteDuplicadoError,
-    DatosInvalidosPacienteError,
-    LocalidadError,
-    LocalidadNoEncontradaError,
-    TurnoError,
-    TurnoNoEncontradoError,
-    TurnoSolapamientoError,
-    TurnoFechaInvalidaError,
-    TurnoHoraInvalidaError,
-    TurnoDuracionInvalidaError,
-    TransicionEstadoInvalidaError,
-    EstadoFinalError,
-    TurnoYaAtendidoError,
-    TurnoPendienteEliminableError,
-    OdontogramaError,
-    OdontogramaNoEncontradoError,
-    ConversacionError,
-    MensajeInvalidoError,
-    BaseDatosError,
-    TransactionError,
-    ValidadorPaciente,
-    ValidadorTurno,
-    ValidadorLocalidad,
-)
 
-from .paciente import (
-    CrearPacienteService,
-    EditarPacienteService,
-    BuscarPacientesService,
-)
+# Nuevos services por dominio.
+# Los re-exports se resuelven de forma diferida (PEP 562): `from app.services
+# import X` importa solo el subpaquete que define X, no todos los dominios.
+_LAZY_EXPORTS = {
+    'OdontoAppError': '.common',
+    'PacienteError': '.common',
+    'PacienteNoEncontradoError': '.common',
+    'PacienteDuplicadoError': '.common',
+    'DatosInvalidosPacienteError': '.common',
+    'LocalidadError': '.common',
+    'LocalidadNoEncontradaError': '.common',
+    'TurnoError': '.common',
+    'TurnoNoEncontradoError': '.common',
+    'TurnoSolapamientoError': '.common',
+    'TurnoFechaInvalidaError': '.common',
+    'TurnoHoraInvalidaError': '.common',
+    'TurnoDuracionInvalidaError': '.common',
+    'TransicionEstadoInvalidaError': '.common',
+    'EstadoFinalError': '.common',
+    'TurnoYaAtendidoError': '.common',
+    'TurnoPendienteEliminableError': '.common',
+    'OdontogramaError': '.common',
+    'OdontogramaNoEncontradoError': '.common',
+    'ConversacionError': '.common',
+    'MensajeInvalidoError': '.common',
+    'BaseDatosError': '.common',
+    'TransactionError': '.common',
+    'ValidadorPaciente': '.common',
+    'ValidadorTurno': '.common',
+    'ValidadorLocalidad': '.common',
+    'CrearPacienteService': '.paciente',
+    'EditarPacienteService': '.paciente',
+    'BuscarPacientesService': '.paciente',
+    'UltimaPrestacionService': '.paciente',
+    'AgendarTurnoService': '.turno',
+    'CambiarEstadoTurnoService': '.turno',
+    'ObtenerAgendaService': '.turno',
+    'ListarTurnosService': '.turno',
+    'ObtenerHorariosService': '.turno',
+    'EliminarTurnoService': '.turno',
+    'BuscarLocalidadesService': '.localidad',
+    'CrearLocalidadService': '.localidad',
+    'BuscarObrasSocialesService': '.obra_social',
+    'ObtenerOdontogramaService': '.odontograma',
+    'CrearVersionOdontogramaService': '.odontograma',
+    'ReconstruirOdontogramaService': '.odontograma',
+    'CompararOdontogramaService': '.odontograma',
+    'ListarPrestacionesService': '.prestacion',
+    'CrearPrestacionService': '.prestacion',
+    'CrearPrestacionesLoteService': '.prestacion',
+    'SaldoPrestacionService': '.prestacion',
+    'ListarPracticasService': '.practica',
+    'CrearPracticaService': '.practica',
+    'EditarPracticaService': '.practica',
+    'EliminarPracticaService': '.practica',
+    'ImportarPreciosService': '.practica',
+    'ConversationService': '.conversacion.conversation_service',
+    'ConversationReply': '.conversacion.conversation_service',
+}
 
-from .turno import (
-    AgendarTurnoService,
-    CambiarEstadoTurnoService,
-    ObtenerAgendaService,
-    ListarTurnosService,
-    ObtenerHorariosService,
-    EliminarTurnoService,
-)
 
-from .localidad import (
-    BuscarLocalidadesService,
-    CrearLocalidadService,
-)
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # los accesos siguientes no pasan por __getattr__
+    return value
 
-from .obra_social import (
-    BuscarObrasSocialesService,
-)
 
-from .odontograma import (
-    ObtenerOdontogramaService,
-    CrearVersionOdontogramaService,
-)
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
-from .prestacion import (
-    ListarPrestacionesService,
-    CrearPrestacionService,
-)
-
-from .practica import (
-    ListarPracticasService,
-    CrearPracticaService,
-    EditarPracticaService,
-    EliminarPracticaService,
-)
-
-from .conversacion.conversation_service import (
-    ConversationService,
-    ConversationReply,
-)
 
 __all__ = [
     # Legacy utils
@@ -136,6 +136,7 @@ __all__ = [
     'CrearPacienteService',
     'EditarPacienteService',
     'BuscarPacientesService',
+    'UltimaPrestacionService',
     
     # Turno services
     'AgendarTurnoService',
@@ -155,16 +156,21 @@ __all__ = [
     # Odontograma services
     'ObtenerOdontogramaService',
     'CrearVersionOdontogramaService',
+    'ReconstruirOdontogramaService',
+    'CompararOdontogramaService',
     
     # Prestacion services
     'ListarPrestacionesService',
     'CrearPrestacionService',
+    'CrearPrestacionesLoteService',
+    'SaldoPrestacionService',
     
     # Practica services
     'ListarPracticasService',
     'CrearPracticaService',
     'EditarPracticaService',
     'EliminarPracticaService',
+    'ImportarPreciosService',
 
     # Conversacion services
     'ConversationService',
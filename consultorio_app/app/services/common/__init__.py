@@ -40,6 +40,7 @@ from .exceptions import (
     FechasRealizacionInvalidasError,
     ReglaIPSSViolada,
     PracticaDadaDeBajaError,
+    LotePrestacionesInvalidoError,
 )
 
 from .validators import (
@@ -86,6 +87,7 @@ __all__ = [
     'FechasRealizacionInvalidasError',
     'ReglaIPSSViolada',
     'PracticaDadaDeBajaError',
+    'LotePrestacionesInvalidoError',
     'ValidadorPaciente',
     'ValidadorTurno',
     'ValidadorLocalidad',
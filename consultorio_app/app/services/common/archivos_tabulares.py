@@ -0,0 +1,122 @@
+"""
+Lectura de archivos tabulares (CSV/XLSX) para las importaciones masivas.
+
+Lo usan ImportarPreciosService (listas de precios) y
+CrearPrestacionesLoteService (lotes de prestaciones). Devuelve filas con
+número de fila y solo las columnas reconocidas; cada service valida los
+valores.
+
+- CSV: utf-8 (con o sin BOM) o latin-1 (exportado desde Excel en Windows),
+  separador ';', ',' o tabulación detectado automáticamente.
+- XLSX: requiere openpyxl (se importa solo al leer un .xlsx).
+"""
+
+import csv
+import io
+import unicodedata
+from typing import Any, Dict, List, Sequence
+
+from .exceptions import DatosInvalidosError
+
+
+def normalizar_encabezado(valor: Any) -> str:
+    """Minúsculas, sin tildes ni espacios sobrantes."""
+    texto = unicodedata.normalize('NFKD', str(valor or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c)).strip()
+
+
+def leer_tabla(contenido: bytes, nombre_archivo: str) -> List[List[Any]]:
+    """
+    Lee un .csv/.txt o .xlsx y devuelve la tabla cruda (lista de filas).
+
+    Raises:
+        DatosInvalidosError: Formato no soportado, archivo vacío o falta openpyxl
+    """
+    nombre = (nombre_archivo or '').lower()
+    if nombre.endswith('.xlsx'):
+        tabla = _leer_xlsx(contenido)
+    elif nombre.endswith(('.csv', '.txt')):
+        tabla = _leer_csv(contenido)
+    else:
+        raise DatosInvalidosError('Formato no soportado: usar .csv o .xlsx')
+    if not tabla:
+        raise DatosInvalidosError('El archivo está vacío')
+    return tabla
+
+
+def leer_filas(
+    contenido: bytes,
+    nombre_archivo: str,
+    columnas: Dict[str, Sequence[str]],
+    requeridas: Sequence[str] = (),
+    error_requeridas: str = 'Faltan columnas requeridas en el archivo',
+) -> List[Dict[str, Any]]:
+    """
+    Lee el archivo y devuelve dicts {fila, <campo>: valor} según `columnas`.
+
+    Args:
+        columnas: campo -> alias aceptados en el encabezado (ya normalizados)
+        requeridas: campos que tienen que estar en el encabezado
+        error_requeridas: mensaje si falta alguno de `requeridas`
+
+    Las filas en blanco se omiten; `fila` es el número de fila en el archivo
+    (el encabezado es la fila 1).
+    """
+    tabla = leer_tabla(contenido, nombre_archivo)
+    indices = mapear_encabezados(tabla[0], columnas)
+    if any(campo not in indices for campo in requeridas):
+        raise DatosInvalidosError(error_requeridas)
+
+    filas = []
+    for numero, valores in enumerate(tabla[1:], start=2):
+        fila = {'fila': numero}
+        for campo, indice in indices.items():
+            fila[campo] = valores[indice] if indice < len(valores) else None
+        if not any(v not in (None, '') for k, v in fila.items() if k != 'fila'):
+            continue  # fila en blanco
+        filas.append(fila)
+    return filas
+
+
+def mapear_encabezados(encabezados: List[Any], columnas: Dict[str, Sequence[str]]) -> Dict[str, int]:
+    """campo -> índice de la primera columna cuyo encabezado es uno de sus alias."""
+    indices = {}
+    for indice, encabezado in enumerate(encabezados):
+        nombre = normalizar_encabezado(encabezado)
+        for campo, alias in columnas.items():
+            if nombre in alias and campo not in indices:
+                indices[campo] = indice
+    return indices
+
+
+def _leer_csv(contenido: bytes) -> List[List[str]]:
+    try:
+        texto = contenido.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        texto = contenido.decode('latin-1')  # exportado desde Excel en Windows
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=';,\t')
+    except csv.Error:
+        dialecto = csv.excel
+    return [fila for fila in csv.reader(io.StringIO(texto), dialecto)]
+
+
+def _leer_xlsx(contenido: bytes) -> List[List[Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise DatosInvalidosError('Para importar .xlsx hace falta instalar openpyxl (o exportar el archivo como .csv)')
+    libro = load_workbook(io.BytesIO(contenido), read_only=True, data_only=True)
+    try:
+        hoja = libro.worksheets[0]
+        return [list(fila) for fila in hoja.iter_rows(values_only=True)]
+    finally:
+        libro.close()
+
+
+__all__ = [
+    'normalizar_encabezado',
+    'leer_tabla',
+    'leer_filas',
+    'mapear_encabezados',
+]
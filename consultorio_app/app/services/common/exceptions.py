@@ -379,3 +379,14 @@ class PracticaDadaDeBajaError(PrestacionError):
             msg += f" (ID: {practica_id})"
         super().__init__(msg, "PRACTICA_DADA_DE_BAJA")
 
+
+
+class LotePrestacionesInvalidoError(PrestacionError):
+    """El lote de prestaciones tiene filas inválidas; no se guardó ninguna."""
+    
+    def __init__(self, errores: list):
+        self.errores = errores
+        super().__init__(
+            f"El lote tiene {len(errores)} fila(s) con errores; no se guardó ninguna prestación",
+            "LOTE_PRESTACIONES_INVALIDO"
+        )
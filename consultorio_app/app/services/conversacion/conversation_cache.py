@@ -0,0 +1,137 @@
+"""
+Cache en memoria del estado de conversaciones de WhatsApp.
+
+Evita el SELECT sobre `conversations` en cada mensaje: el estado de cada
+usuario se guarda como un ConversationState desacoplado de la sesión de
+SQLAlchemy, en un LRU acotado con TTL (igual a la expiración de la
+conversación).
+
+IMPORTANTE: el cache es por proceso. Con varios workers atendiendo el
+webhook, configurar `conversation_cache_size = 0` en settings.ini para
+que cada mensaje lea el estado desde la base.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import threading
+import time
+
+
+class ConversationState:
+    """Snapshot editable de una fila de `conversations`."""
+
+    FIELDS = (
+        "channel_user_id",
+        "paso_actual",
+        "paciente_id",
+        "dni_propuesto",
+        "nombre_tmp",
+        "apellido_tmp",
+        "telefono_tmp",
+        "fecha_candidate",
+        "hora_candidate",
+        "duracion_candidate",
+        "detalle",
+        "expira_en",
+        "ultima_interaccion_ts",
+        "intentos_actuales",
+        "confirmed",
+    )
+    TIMESTAMP_FIELDS = frozenset({"expira_en", "ultima_interaccion_ts"})
+
+    def __init__(self, id: Optional[int] = None, **values: Any):
+        self.id = id
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+        if self.intentos_actuales is None:
+            self.intentos_actuales = 0
+        if self.confirmed is None:
+            self.confirmed = False
+        # Valores tal como están en la base (vacío = fila aún no insertada)
+        self._persisted: Dict[str, Any] = {}
+
+    @classmethod
+    def from_model(cls, convo) -> "ConversationState":
+        state = cls(id=convo.id, **{field: getattr(convo, field) for field in cls.FIELDS})
+        state.mark_persisted()
+        return state
+
+    def as_row(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def copy(self) -> "ConversationState":
+        clone = ConversationState(id=self.id, **self.as_row())
+        clone._persisted = dict(self._persisted)
+        return clone
+
+    def changed_fields(self) -> Dict[str, Any]:
+        """Campos cuyo valor difiere del último persistido."""
+        if self.id is None:
+            return self.as_row()
+        return {
+            field: value
+            for field, value in self.as_row().items()
+            if self._persisted.get(field) != value
+        }
+
+    def mark_persisted(self, fields=None):
+        """Registra los campos indicados (todos por defecto) como guardados en la base."""
+        row = self.as_row()
+        for field in (fields if fields is not None else self.FIELDS):
+            self._persisted[field] = row[field]
+
+    def persisted_value(self, field: str) -> Any:
+        return self._persisted.get(field)
+
+
+class ConversationStateCache:
+    """LRU acotado con TTL, thread-safe, indexado por channel_user_id."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 1800):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, channel_user_id: str) -> Optional[ConversationState]:
+        """Retorna una COPIA del estado cacheado (o None si no está o expiró)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(channel_user_id)
+            if entry is None:
+                return None
+            stored_at, state = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[channel_user_id]
+                return None
+            self._entries.move_to_end(channel_user_id)
+            return state.copy()
+
+    def put(self, state: ConversationState):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[state.channel_user_id] = (time.monotonic(), state.copy())
+            self._entries.move_to_end(state.channel_user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, channel_user_id: str):
+        with self._lock:
+            self._entries.pop(channel_user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+__all__ = ["ConversationState", "ConversationStateCache"]
@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy import update
+from app.config import SettingsLoader
 from app.database.session import DatabaseSession
 from app.models import Conversation, Paciente
+from app.services.conversacion.conversation_cache import ConversationState, ConversationStateCache
 from app.services.paciente import CrearPacienteService, BuscarPacientesService
 from app.services.turno import AgendarTurnoService
 from app.services.common import PacienteDuplicadoError, DatosInvalidosPacienteError, PacienteNoEncontradoError, TurnoError
@@ -19,37 +22,110 @@ class ConversationReply:
 
 class ConversationService:
     EXPIRATION_MINUTES = 30
+    # Un mensaje que solo mueve ultima_interaccion_ts/expira_en no se escribe
+    # si la última escritura de esos campos es más reciente que este intervalo.
+    TIMESTAMP_WRITE_INTERVAL_SECONDS = 60
+    CACHE_MAX_ENTRIES = 1000
+
+    _cache: Optional[ConversationStateCache] = None
 
     @staticmethod
     def _get_session():
         return DatabaseSession.get_instance().session
 
+    @classmethod
+    def _get_cache(cls) -> ConversationStateCache:
+        if cls._cache is None:
+            max_entries = SettingsLoader.get_int('whatsapp', 'conversation_cache_size', cls.CACHE_MAX_ENTRIES)
+            cls._cache = ConversationStateCache(
+                max_entries=max_entries,
+                ttl_seconds=cls.EXPIRATION_MINUTES * 60,
+            )
+        return cls._cache
+
     @staticmethod
-    def _get_or_create(channel_user_id: str) -> Conversation:
+    def _get_or_create(channel_user_id: str) -> ConversationState:
+        """
+        Retorna el estado de la conversación (cache -> base -> nuevo).
+
+        Una conversación nueva NO se inserta aquí: se persiste junto con el
+        resto de los cambios del mensaje en _persist (un único commit).
+        """
         import logging
         logger = logging.getLogger(__name__)
         
+        cache = ConversationService._get_cache()
+        state = cache.get(channel_user_id)
+        if state:
+            return state
+        
         session = ConversationService._get_session()
         convo = session.query(Conversation).filter_by(channel_user_id=channel_user_id).first()
         if convo:
             logger.debug(f"[_get_or_create] Found existing: id={convo.id}, paso={convo.paso_actual}, nombre={convo.nombre_tmp}")
-            return convo
+            return ConversationState.from_model(convo)
         
         logger.debug(f"[_get_or_create] Creating new conversation for {channel_user_id}")
         now = datetime.utcnow()
-        convo = Conversation(
+        return ConversationState(
             channel_user_id=channel_user_id,
             paso_actual="solicitar_dni",
             expira_en=now + timedelta(minutes=ConversationService.EXPIRATION_MINUTES),
             ultima_interaccion_ts=now,
         )
-        session.add(convo)
-        session.commit()
-        logger.debug(f"[_get_or_create] Created: id={convo.id}, paso={convo.paso_actual}")
-        return convo
+
+    @staticmethod
+    def _persist(convo: ConversationState):
+        """
+        Escribe los cambios del mensaje en un solo commit y actualiza el cache.
+
+        - Conversación nueva: un INSERT.
+        - Cambió algún campo de negocio: un UPDATE con solo esos campos.
+        - Solo cambiaron los timestamps: se omite la escritura si la última
+          fue hace menos de TIMESTAMP_WRITE_INTERVAL_SECONDS (ráfagas de
+          mensajes inválidos no generan escrituras).
+        """
+        session = ConversationService._get_session()
+        changes = convo.changed_fields()
+        now = convo.ultima_interaccion_ts or datetime.utcnow()
+
+        if convo.id is not None and changes and set(changes) <= ConversationState.TIMESTAMP_FIELDS:
+            last_write = convo.persisted_value('ultima_interaccion_ts')
+            if last_write and (now - last_write).total_seconds() < ConversationService.TIMESTAMP_WRITE_INTERVAL_SECONDS:
+                changes = {}
+
+        if convo.id is None:
+            row = Conversation(**convo.as_row())
+            session.add(row)
+            session.commit()
+            convo.id = row.id
+            convo.mark_persisted()
+        elif changes:
+            result = session.execute(
+                update(Conversation)
+                .where(Conversation.id == convo.id)
+                .values(**changes, updated_at=datetime.utcnow())
+            )
+            if result.rowcount == 0:
+                # La fila fue eliminada (cleanup/reset) mientras el estado estaba en cache
+                row = Conversation(**convo.as_row())
+                session.add(row)
+                session.flush()
+                convo.id = row.id
+            session.commit()
+            convo.mark_persisted()
+
+        ConversationService._get_cache().put(convo)
 
     @staticmethod
     def handle_message(channel_user_id: str, text: str) -> ConversationReply:
+        """
+        Procesa un mensaje y avanza la conversación.
+
+        El estado se toma del cache (o de la base si no está) y todos los
+        cambios del mensaje se persisten juntos al final en _persist. Si el
+        paso falla, no se persiste nada y el cache conserva el estado previo.
+        """
         session = ConversationService._get_session()
         convo = ConversationService._get_or_create(channel_user_id)
         
@@ -69,7 +145,7 @@ class ConversationService:
             if step == "solicitar_dni":
                 digits = "".join([c for c in message if c.isdigit()])
                 if len(digits) < 6:
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Necesito el DNI para continuar (6+ dígitos).", step)
                 convo.dni_propuesto = digits
                 # Buscar paciente
@@ -77,27 +153,27 @@ class ConversationService:
                 if paciente:
                     convo.paciente_id = paciente.id
                     convo.paso_actual = "solicitar_fecha"
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Encontré tu ficha. Indicá la fecha (YYYY-MM-DD).", convo.paso_actual)
                 else:
                     convo.paso_actual = "solicitar_nombre"
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("No encontré tu ficha. Decime tu nombre para registrarte.", convo.paso_actual)
 
             if step == "solicitar_nombre":
                 if not message:
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Necesito tu nombre.", step)
                 logger.debug(f"[solicitar_nombre] Guardando nombre_tmp='{message}'")
                 convo.nombre_tmp = message
                 convo.paso_actual = "solicitar_apellido"
-                session.commit()
+                ConversationService._persist(convo)
                 logger.debug(f"[solicitar_nombre] Después de commit: nombre_tmp={convo.nombre_tmp}, paso={convo.paso_actual}")
                 return ConversationReply("Gracias. Ahora tu apellido.", convo.paso_actual)
 
             if step == "solicitar_apellido":
                 if not message:
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Necesito tu apellido.", step)
                 logger.debug(f"[solicitar_apellido] ANTES de guardar: nombre_tmp={convo.nombre_tmp}, apellido_tmp={convo.apellido_tmp}")
                 convo.apellido_tmp = message
@@ -128,7 +204,7 @@ class ConversationService:
                     )
                     convo.paciente_id = paciente.id
                     convo.paso_actual = "solicitar_fecha"
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Te registré. Indicá la fecha del turno (YYYY-MM-DD).", convo.paso_actual)
                 except (PacienteDuplicadoError, DatosInvalidosPacienteError) as e:
                     session.rollback()
@@ -139,11 +215,10 @@ class ConversationService:
                     fecha = datetime.strptime(message, "%Y-%m-%d").date()
                     convo.fecha_candidate = fecha
                     convo.paso_actual = "solicitar_hora"
-                    session.commit()
-                    session.refresh(convo)
+                    ConversationService._persist(convo)
                     return ConversationReply("Anotado. Indicá la hora (HH:MM).", convo.paso_actual)
                 except ValueError:
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Formato inválido. Usa YYYY-MM-DD.", step)
 
             if step == "solicitar_hora":
@@ -162,8 +237,7 @@ class ConversationService:
                     )
                     convo.paso_actual = "completado"
                     convo.confirmed = False
-                    session.commit()
-                    session.refresh(convo)
+                    ConversationService._persist(convo)
                     return ConversationReply(
                         "Turno solicitado en estado Pendiente. La doctora confirmará el horario.",
                         convo.paso_actual,
@@ -173,11 +247,11 @@ class ConversationService:
                     session.rollback()
                     return ConversationReply(f"No pude agendar: {str(e)}", step)
                 except ValueError:
-                    session.commit()
+                    ConversationService._persist(convo)
                     return ConversationReply("Formato inválido. Usa HH:MM.", step)
 
             # Default fallback
-            session.commit()
+            ConversationService._persist(convo)
             return ConversationReply("No entendí. Podés enviar tu DNI para comenzar.", step)
         except Exception:
             session.rollback()
@@ -185,6 +259,7 @@ class ConversationService:
 
     @staticmethod
     def reset(channel_user_id: str):
+        ConversationService._get_cache().invalidate(channel_user_id)
         session = ConversationService._get_session()
         convo = session.query(Conversation).filter_by(channel_user_id=channel_user_id).first()
         if convo:
@@ -309,7 +309,7 @@ class ObtenerEstadisticasFinanzasService:
         Obtiene detalle de prestaciones individuales para una obra social.
         
         Ahora muestra montos reales:
-        - Total cobrado al paciente (suma de PrestacionCobro)
+        - Total cobrado al paciente (Prestacion.total_cobrado, suma de PrestacionCobro)
         - Importe profesional autorizado (a cobrar de OS)
         
         Args:
@@ -328,6 +328,7 @@ class ObtenerEstadisticasFinanzasService:
             Prestacion.estado,
             Prestacion.importe_afiliado_autorizado,
             Prestacion.importe_profesional_autorizado,
+            Prestacion.total_cobrado,
             Paciente.nombre.label('paciente_nombre'),
             Paciente.apellido.label('paciente_apellido'),
             func.coalesce(ObraSocial.nombre, 'Particular').label('obra_social_nombre')
@@ -384,13 +385,6 @@ class ObtenerEstadisticasFinanzasService:
                 for p in practicas
             ])
             
-            # Obtener total cobrado al paciente
-            total_cobrado = db.session.query(
-                func.sum(PrestacionCobro.monto)
-            ).filter(
-                PrestacionCobro.prestacion_id == row.id
-            ).scalar() or 0
-            
             prestaciones_detalle.append({
                 'id': row.id,
                 'fecha': row.fecha_autorizacion or row.fecha_solicitud,
@@ -398,7 +392,7 @@ class ObtenerEstadisticasFinanzasService:
                 'paciente': f"{row.paciente_nombre} {row.paciente_apellido}",
                 'practicas': practicas_str,
                 'monto_paciente': float(row.importe_afiliado_autorizado or 0),
-                'cobrado_paciente': float(total_cobrado),
+                'cobrado_paciente': float(row.total_cobrado or 0),
                 'monto_os': float(row.importe_profesional_autorizado or 0),
                 'obra_social': row.obra_social_nombre
             })
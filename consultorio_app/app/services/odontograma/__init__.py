@@ -4,8 +4,12 @@ Inicializador del módulo de servicios de odontograma.
 
 from .obtener_odontograma_service import ObtenerOdontogramaService
 from .crear_version_odontograma_service import CrearVersionOdontogramaService
+from .reconstruir_odontograma_service import ReconstruirOdontogramaService
+from .comparar_odontograma_service import CompararOdontogramaService
 
 __all__ = [
     'ObtenerOdontogramaService',
     'CrearVersionOdontogramaService',
+    'ReconstruirOdontogramaService',
+    'CompararOdontogramaService',
 ]
@@ -0,0 +1,99 @@
+"""
+CompararOdontogramaService: diferencias a nivel cara entre dos versiones.
+
+Reconstruye ambas versiones (una consulta con CTE recursivo cada una, ver
+ReconstruirOdontogramaService) y compara los mapas (diente, cara) en
+memoria. Devuelve solo las caras que cambiaron, así la UI puede dibujar
+la superposición de cambios sin recibir dos odontogramas completos.
+
+SQLite anterior a 3.39 no soporta FULL OUTER JOIN, por eso la
+comparación se hace en Python sobre los estados ya reconstruidos.
+"""
+
+from typing import Dict, List, Optional
+
+from app.database.session import DatabaseSession
+from app.models import Odontograma
+from app.services.common import OdontogramaNoEncontradoError
+from .crear_version_odontograma_service import CAMPOS_CARA
+from .reconstruir_odontograma_service import ReconstruirOdontogramaService
+
+
+class CompararOdontogramaService:
+    """Caso de uso: comparar dos versiones de odontograma de un paciente."""
+
+    @staticmethod
+    def execute(paciente_id: int, desde_id: int, hasta_id: Optional[int] = None) -> Dict:
+        """
+        Compara dos versiones del mismo paciente.
+
+        Args:
+            paciente_id: ID del paciente
+            desde_id: ID de la versión de origen
+            hasta_id: ID de la versión de destino (si None, la actual)
+
+        Returns:
+            Dict con 'desde', 'hasta' (id y version_seq) y 'cambios': lista de
+            {diente, cara, tipo (agregada|eliminada|modificada), antes, despues}
+
+        Raises:
+            OdontogramaNoEncontradoError: Si alguna versión no existe o es de otro paciente
+        """
+        session = DatabaseSession.get_instance().session
+
+        desde = CompararOdontogramaService._obtener(session, paciente_id, desde_id)
+        if hasta_id:
+            hasta = CompararOdontogramaService._obtener(session, paciente_id, hasta_id)
+        else:
+            hasta = session.query(Odontograma).filter_by(paciente_id=paciente_id, es_actual=True).first()
+            if not hasta:
+                raise OdontogramaNoEncontradoError(hasta_id)
+
+        return {
+            'desde': {'id': desde.id, 'version_seq': desde.version_seq},
+            'hasta': {'id': hasta.id, 'version_seq': hasta.version_seq},
+            'cambios': CompararOdontogramaService.diferencias(session, desde.id, hasta.id),
+        }
+
+    @staticmethod
+    def diferencias(session, desde_id: int, hasta_id: int) -> List[Dict]:
+        """Caras que difieren entre dos versiones, ordenadas por diente y cara."""
+        if desde_id == hasta_id:
+            return []
+        antes = CompararOdontogramaService._valores(session, desde_id)
+        despues = CompararOdontogramaService._valores(session, hasta_id)
+
+        cambios = []
+        for clave in sorted(antes.keys() | despues.keys()):
+            valor_antes, valor_despues = antes.get(clave), despues.get(clave)
+            if valor_antes == valor_despues:
+                continue
+            if valor_antes is None:
+                tipo = 'agregada'
+            elif valor_despues is None:
+                tipo = 'eliminada'
+            else:
+                tipo = 'modificada'
+            cambios.append({
+                'diente': clave[0],
+                'cara': clave[1],
+                'tipo': tipo,
+                'antes': valor_antes,
+                'despues': valor_despues,
+            })
+        return cambios
+
+    @staticmethod
+    def _valores(session, odontograma_id: int) -> Dict:
+        estado = ReconstruirOdontogramaService.caras_por_clave(odontograma_id, session)
+        return {
+            clave: {campo: getattr(cara, campo) for campo in CAMPOS_CARA}
+            for clave, cara in estado.items()
+        }
+
+    @staticmethod
+    def _obtener(session, paciente_id: int, odontograma_id: int) -> Odontograma:
+        odontograma = session.get(Odontograma, odontograma_id)
+        if not odontograma or odontograma.paciente_id != paciente_id:
+            raise OdontogramaNoEncontradoError(odontograma_id)
+        return odontograma
@@ -6,18 +6,27 @@ Responsabilidades:
 - Aplicar cambios de caras
 - Marcar como actual
 - Gestionar historial de versiones
+
+Almacenamiento ([odontograma] storage en settings.ini):
+- delta (default): la versión guarda solo las caras cambiadas y apunta a su
+  base; cada `snapshot_interval` versiones se guarda un snapshot completo.
+- full: cada versión es un snapshot con todas las caras.
 """
 
 from datetime import datetime
-from typing import List, Tuple, Optional
-from sqlalchemy import func
+from typing import Dict, List, Tuple, Optional
+from sqlalchemy import delete, func, insert
+from app.config import SettingsLoader
 from app.database.session import DatabaseSession
-from app.models import Odontograma, OdontogramaCara, Paciente, Prestacion
+from app.models import Odontograma, OdontogramaCara, Paciente
 from app.services.common import (
     PacienteNoEncontradoError,
     OdontogramaError,
     OdontogramaNoEncontradoError,
 )
+from .reconstruir_odontograma_service import ReconstruirOdontogramaService
+
+CAMPOS_CARA = ('marca_codigo', 'marca_texto', 'comentario')
 
 
 class CrearVersionOdontogramaService:
@@ -63,12 +72,11 @@ class CrearVersionOdontogramaService:
                 if not base or base.paciente_id != paciente_id:
                     raise OdontogramaNoEncontradoError(base_odontograma_id)
             else:
+                # Sin odontograma previo (el vacío virtual de obtener_actual): primera versión
                 base = session.query(Odontograma).filter_by(
                     paciente_id=paciente_id,
                     es_actual=True
                 ).first()
-                if not base:
-                    raise OdontogramaError("No hay odontograma base para crear versión")
             
             # Obtener siguiente número de versión
             max_version = session.query(func.max(Odontograma.version_seq)).filter(
@@ -83,13 +91,13 @@ class CrearVersionOdontogramaService:
                 nota_general=nota_general,
                 creado_en=datetime.now(),
                 actualizado_en=datetime.now(),
-                ultima_prestacion_registrada_en=CrearVersionOdontogramaService._obtener_ultima_prestacion(session, paciente_id),
+                ultima_prestacion_registrada_en=paciente.ultima_prestacion_en,
             )
             session.add(nueva_version)
             session.flush()
             
-            # Copiar caras del base y aplicar cambios
-            CrearVersionOdontogramaService._copiar_y_aplicar_cambios(
+            # Guardar caras (delta o snapshot) según el estado de la base
+            CrearVersionOdontogramaService._guardar_caras(
                 session, base, nueva_version, cambios_caras
             )
             
@@ -121,52 +129,82 @@ class CrearVersionOdontogramaService:
             raise OdontogramaError(f"Error al crear versión: {str(exc)}")
     
     @staticmethod
-    def _copiar_y_aplicar_cambios(session, base: Odontograma, nueva: Odontograma, cambios_caras: List[dict]) -> None:
-        """Copia caras del base a la nueva versión y aplica cambios."""
-        # Copiar todas las caras del base
-        for cara_base in base.caras:
-            cara_nueva = OdontogramaCara(
-                odontograma_id=nueva.id,
-                diente=cara_base.diente,
-                cara=cara_base.cara,
-                marca_codigo=cara_base.marca_codigo,
-                marca_texto=cara_base.marca_texto,
-                comentario=cara_base.comentario,
-            )
-            session.add(cara_nueva)
+    def _modo_delta() -> bool:
+        storage = (SettingsLoader.get('odontograma', 'storage', 'delta') or 'delta').strip().lower()
+        return storage != 'full'
+    
+    @staticmethod
+    def _snapshot_interval() -> int:
+        return max(1, SettingsLoader.get_int('odontograma', 'snapshot_interval', 10))
+    
+    @staticmethod
+    def _valores_cambiados(estado_base: Dict, cambios_caras: List[dict]) -> Dict[Tuple[str, str], dict]:
+        """
+        Valores finales de cada cara tocada por los cambios.
         
-        # Aplicar cambios
-        if cambios_caras:
-            for cambio in cambios_caras:
-                diente = cambio.get('diente')
-                cara = cambio.get('cara')
-                
-                # Buscar cara existente o crear nueva
-                cara_obj = session.query(OdontogramaCara).filter_by(
-                    odontograma_id=nueva.id,
-                    diente=diente,
-                    cara=cara
-                ).first()
-                
-                if cara_obj:
-                    # Actualizar cara existente
-                    if 'marca_codigo' in cambio:
-                        cara_obj.marca_codigo = cambio['marca_codigo']
-                    if 'marca_texto' in cambio:
-                        cara_obj.marca_texto = cambio['marca_texto']
-                    if 'comentario' in cambio:
-                        cara_obj.comentario = cambio['comentario']
-                else:
-                    # Crear nueva cara
-                    nueva_cara = OdontogramaCara(
-                        odontograma_id=nueva.id,
-                        diente=diente,
-                        cara=cara,
-                        marca_codigo=cambio.get('marca_codigo'),
-                        marca_texto=cambio.get('marca_texto'),
-                        comentario=cambio.get('comentario'),
-                    )
-                    session.add(nueva_cara)
+        Un cambio solo pisa los campos que trae; el resto se conserva de la base.
+        """
+        valores = {}
+        for cambio in cambios_caras or []:
+            clave = (cambio.get('diente'), cambio.get('cara'))
+            if clave not in valores:
+                actual = estado_base.get(clave)
+                valores[clave] = {campo: getattr(actual, campo, None) for campo in CAMPOS_CARA}
+            for campo in CAMPOS_CARA:
+                if campo in cambio:
+                    valores[clave][campo] = cambio[campo]
+        return valores
+    
+    @staticmethod
+    def _insertar_caras(session, odontograma_id: int, filas: Dict[Tuple[str, str], dict]) -> None:
+        """Inserta todas las caras en un solo INSERT (executemany), sin objetos ORM."""
+        if not filas:
+            return
+        session.execute(insert(OdontogramaCara), [
+            {'odontograma_id': odontograma_id, 'diente': diente, 'cara': cara, **valores}
+            for (diente, cara), valores in filas.items()
+        ])
+    
+    @staticmethod
+    def _guardar_caras(session, base: Optional[Odontograma], nueva: Odontograma, cambios_caras: List[dict]) -> None:
+        """
+        Escribe las caras de la nueva versión: solo las cambiadas (delta) o todas (snapshot).
+        
+        El estado de la base se arma una sola vez como dict (diente, cara) -> cara
+        y los cambios se aplican en memoria: no hay consultas por cambio.
+        """
+        estado_base = ReconstruirOdontogramaService.caras_por_clave(base.id, session) if base else {}
+        cambiadas = CrearVersionOdontogramaService._valores_cambiados(estado_base, cambios_caras)
+        
+        profundidad = (base.profundidad_delta or 0) + 1 if base else 0
+        if base and CrearVersionOdontogramaService._modo_delta() and profundidad < CrearVersionOdontogramaService._snapshot_interval():
+            nueva.base_id = base.id
+            nueva.profundidad_delta = profundidad
+            filas = cambiadas
+        else:
+            nueva.base_id = None
+            nueva.profundidad_delta = 0
+            filas = {
+                clave: {campo: getattr(cara, campo) for campo in CAMPOS_CARA}
+                for clave, cara in estado_base.items()
+            }
+            filas.update(cambiadas)
+        
+        CrearVersionOdontogramaService._insertar_caras(session, nueva.id, filas)
+    
+    @staticmethod
+    def _convertir_en_snapshot(session, odontograma: Odontograma) -> None:
+        """Materializa una versión delta como snapshot (su base va a eliminarse)."""
+        estado = ReconstruirOdontogramaService.caras_por_clave(odontograma.id, session)
+        heredadas = {
+            clave: {campo: getattr(fila, campo) for campo in CAMPOS_CARA}
+            for clave, fila in estado.items()
+            if fila.odontograma_id != odontograma.id
+        }
+        CrearVersionOdontogramaService._insertar_caras(session, odontograma.id, heredadas)
+        session.expire(odontograma, ['caras'])
+        odontograma.base_id = None
+        odontograma.profundidad_delta = 0
     
     @staticmethod
     def _aplicar_retencion(session, paciente_id: int) -> None:
@@ -178,13 +216,29 @@ class CrearVersionOdontogramaService:
         if len(ids_ordenados) > CrearVersionOdontogramaService.RETENCION_MAX_VERSIONES:
             ids_a_eliminar = ids_ordenados[CrearVersionOdontogramaService.RETENCION_MAX_VERSIONES:]
             if ids_a_eliminar:
-                antiguos = session.query(Odontograma).filter(Odontograma.id.in_(ids_a_eliminar)).all()
-                for od in antiguos:
-                    session.delete(od)
-    
-    @staticmethod
-    def _obtener_ultima_prestacion(session, paciente_id: int) -> Optional[datetime]:
-        """Obtiene la fecha de la prestación más reciente."""
-        return session.query(func.max(Prestacion.fecha)).filter(
-            Prestacion.paciente_id == paciente_id
-        ).scalar()
+                # Las versiones que se conservan y dependen de una eliminada pasan a snapshot
+                huerfanas = session.query(Odontograma).filter(
+                    Odontograma.base_id.in_(ids_a_eliminar),
+                    Odontograma.id.notin_(ids_a_eliminar),
+                ).all()
+                for od in huerfanas:
+                    CrearVersionOdontogramaService._convertir_en_snapshot(session, od)
+                session.flush()
+                
+                # Dos DELETE por conjunto (caras y versiones) en vez de cargar y borrar cada objeto
+                session.execute(
+                    delete(OdontogramaCara).where(OdontogramaCara.odontograma_id.in_(ids_a_eliminar)),
+                    execution_options={'synchronize_session': False},
+                )
+                session.execute(
+                    delete(Odontograma).where(Odontograma.id.in_(ids_a_eliminar)),
+                    execution_options={'synchronize_session': False},
+                )
+                # Sacar de la sesión los objetos ya borrados que estuvieran cargados
+                # (se lee el estado sin disparar cargas: pueden estar expirados)
+                eliminados = set(ids_a_eliminar)
+                for state in list(session.identity_map.all_states()):
+                    if (state.class_ is Odontograma and state.key[1][0] in eliminados) or (
+                        state.class_ is OdontogramaCara and state.dict.get('odontograma_id') in eliminados
+                    ):
+                        session.expunge(state.obj())
@@ -3,17 +3,17 @@ ObtenerOdontogramaService: Caso de uso para obtener/crear y consultar odontogram
 
 Responsabilidades:
 - Obtener odontograma actual de un paciente
-- Crear odontograma vacío si no existe
+- Devolver un odontograma vacío virtual (sin escribir) si no existe
 - Obtener versiones específicas
-- Marcar como desactualizado si hay prestaciones nuevas
+- Marcar como desactualizado si hay prestaciones nuevas (Paciente.ultima_prestacion_en)
 - Gestionar historial de versiones (retención)
 """
 
 from datetime import datetime
 from typing import Optional, Tuple, List
-from sqlalchemy import func
+from sqlalchemy.orm.attributes import set_committed_value
 from app.database.session import DatabaseSession
-from app.models import Odontograma, Paciente, Prestacion
+from app.models import Odontograma, Paciente
 from app.services.common import (
     PacienteNoEncontradoError,
     OdontogramaNoEncontradoError,
@@ -28,7 +28,11 @@ class ObtenerOdontogramaService:
     @staticmethod
     def obtener_actual(paciente_id: int) -> Tuple[Odontograma, List[Odontograma], bool, Optional[datetime]]:
         """
-        Obtiene el odontograma actual de un paciente o lo crea vacío.
+        Obtiene el odontograma actual de un paciente.
+        
+        Si el paciente todavía no tiene odontograma devuelve uno vacío *virtual*
+        (no persistido, id None): la lectura nunca escribe en la base. La primera
+        versión real se crea al guardar cambios (CrearVersionOdontogramaService).
         
         Args:
             paciente_id: ID del paciente
@@ -46,55 +50,21 @@ class ObtenerOdontogramaService:
         if not paciente:
             raise PacienteNoEncontradoError(paciente_id)
         
-        try:
-            # Obtener odontograma actual
-            odontograma = session.query(Odontograma).filter_by(
-                paciente_id=paciente_id, 
-                es_actual=True
-            ).order_by(Odontograma.version_seq.desc()).first()
-            
-            # Si no existe, crear vacío
-            if not odontograma:
-                max_version = (
-                    session.query(func.max(Odontograma.version_seq))
-                    .filter(Odontograma.paciente_id == paciente_id)
-                    .scalar()
-                ) or 0
-                
-                ultima_prestacion = ObtenerOdontogramaService._obtener_ultima_prestacion(session, paciente_id)
-                
-                odontograma = Odontograma(
-                    paciente_id=paciente_id,
-                    version_seq=max_version + 1,
-                    es_actual=True,
-                    nota_general=None,
-                    creado_en=datetime.now(),
-                    actualizado_en=datetime.now(),
-                    ultima_prestacion_registrada_en=ultima_prestacion,
-                )
-                session.add(odontograma)
-                session.flush()
-                
-                # Marcar solo este como actual
-                ObtenerOdontogramaService._marcar_solo_un_actual(session, paciente_id, odontograma.id)
-                session.commit()
-            
-            # Obtener versiones
-            versiones = ObtenerOdontogramaService._obtener_versiones(session, paciente_id)
-            
-            # Detectar desactualización
-            ultima_prestacion = ObtenerOdontogramaService._obtener_ultima_prestacion(session, paciente_id)
-            desactualizado = (
-                ultima_prestacion and 
-                odontograma.creado_en and 
-                ultima_prestacion > odontograma.creado_en
-            )
-            
-            return odontograma, versiones, desactualizado, ultima_prestacion
-            
-        except Exception as exc:
-            session.rollback()
-            raise
+        odontograma = session.query(Odontograma).filter_by(
+            paciente_id=paciente_id, 
+            es_actual=True
+        ).order_by(Odontograma.version_seq.desc()).first()
+        
+        if not odontograma:
+            return ObtenerOdontogramaService.odontograma_vacio(paciente), [], False, paciente.ultima_prestacion_en
+        
+        versiones = ObtenerOdontogramaService._obtener_versiones(session, paciente_id)
+        return (
+            odontograma,
+            versiones,
+            ObtenerOdontogramaService._desactualizado(paciente, odontograma),
+            paciente.ultima_prestacion_en,
+        )
     
     @staticmethod
     def obtener_version(paciente_id: int, odontograma_id: int) -> Tuple[Odontograma, List[Odontograma], bool, Optional[datetime]]:
@@ -113,29 +83,52 @@ class ObtenerOdontogramaService:
         """
         session = DatabaseSession.get_instance().session
         
-        try:
-            odontograma = session.query(Odontograma).filter_by(
-                id=odontograma_id, 
-                paciente_id=paciente_id
-            ).first()
-            
-            if not odontograma:
-                raise OdontogramaNoEncontradoError(odontograma_id)
-            
-            versiones = ObtenerOdontogramaService._obtener_versiones(session, paciente_id)
-            ultima_prestacion = ObtenerOdontogramaService._obtener_ultima_prestacion(session, paciente_id)
-            
-            desactualizado = (
-                ultima_prestacion and 
-                odontograma.creado_en and 
-                ultima_prestacion > odontograma.creado_en
-            )
-            
-            return odontograma, versiones, desactualizado, ultima_prestacion
-            
-        except Exception as exc:
-            session.rollback()
-            raise
+        odontograma = session.query(Odontograma).filter_by(
+            id=odontograma_id, 
+            paciente_id=paciente_id
+        ).first()
+        
+        if not odontograma:
+            raise OdontogramaNoEncontradoError(odontograma_id)
+        
+        paciente = session.get(Paciente, paciente_id)
+        versiones = ObtenerOdontogramaService._obtener_versiones(session, paciente_id)
+        return (
+            odontograma,
+            versiones,
+            ObtenerOdontogramaService._desactualizado(paciente, odontograma),
+            paciente.ultima_prestacion_en,
+        )
+    
+    @staticmethod
+    def odontograma_vacio(paciente: Paciente) -> Odontograma:
+        """Odontograma vacío sin persistir para un paciente que aún no tiene ninguno."""
+        ahora = datetime.now()
+        odontograma = Odontograma(
+            id=None,
+            paciente_id=paciente.id,
+            version_seq=1,
+            es_actual=True,
+            nota_general=None,
+            base_id=None,
+            profundidad_delta=0,
+            creado_en=ahora,
+            actualizado_en=ahora,
+            ultima_prestacion_registrada_en=paciente.ultima_prestacion_en,
+        )
+        # Sin backref ni cascade: asignar la relación normal lo agregaría a la sesión
+        set_committed_value(odontograma, 'paciente', paciente)
+        set_committed_value(odontograma, 'caras', [])
+        return odontograma
+    
+    @staticmethod
+    def _desactualizado(paciente: Paciente, odontograma: Odontograma) -> bool:
+        """Hay prestaciones posteriores a la versión (comparación de columnas, sin consultas)."""
+        return bool(
+            paciente.ultima_prestacion_en
+            and odontograma.creado_en
+            and paciente.ultima_prestacion_en > odontograma.creado_en
+        )
     
     @staticmethod
     def _obtener_versiones(session, paciente_id: int) -> List[Odontograma]:
@@ -145,18 +138,3 @@ class ObtenerOdontogramaService:
         ).order_by(Odontograma.version_seq.desc()).limit(
             ObtenerOdontogramaService.RETENCION_MAX_VERSIONES
         ).all()
-    
-    @staticmethod
-    def _marcar_solo_un_actual(session, paciente_id: int, odontograma_id: int) -> None:
-        """Marcar solo un odontograma como actual para el paciente."""
-        session.query(Odontograma).filter(
-            Odontograma.paciente_id == paciente_id,
-            Odontograma.id != odontograma_id,
-        ).update({Odontograma.es_actual: False}, synchronize_session=False)
-    
-    @staticmethod
-    def _obtener_ultima_prestacion(session, paciente_id: int) -> Optional[datetime]:
-        """Obtiene la fecha de la prestación más reciente del paciente."""
-        return session.query(func.max(Prestacion.fecha)).filter(
-            Prestacion.paciente_id == paciente_id
-        ).scalar()
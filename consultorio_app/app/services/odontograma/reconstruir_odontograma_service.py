@@ -0,0 +1,64 @@
+"""
+ReconstruirOdontogramaService: materializa el estado completo de una versión.
+
+Con almacenamiento delta cada versión guarda solo las caras que cambiaron
+respecto de su base (base_id); cada tanto se guarda un snapshot completo
+(base_id NULL). El estado de una versión es el snapshot más las caras de
+cada delta de la cadena, aplicadas en orden: la última escritura gana.
+
+La cadena completa (versión -> base -> ... -> snapshot) se resuelve con un
+CTE recursivo, así que reconstruir cualquier versión es una sola consulta.
+"""
+
+from typing import Dict, List, Tuple
+
+from sqlalchemy import literal, select
+
+from app.database.session import DatabaseSession
+from app.models import Odontograma, OdontogramaCara
+
+ClaveCara = Tuple[str, str]
+
+
+class ReconstruirOdontogramaService:
+    """Caso de uso: obtener las caras completas de una versión de odontograma."""
+
+    @staticmethod
+    def caras_por_clave(odontograma_id: int, session=None) -> Dict[ClaveCara, OdontogramaCara]:
+        """
+        Estado de la versión como dict (diente, cara) -> OdontogramaCara vigente.
+
+        Las caras devueltas pueden pertenecer a versiones anteriores de la
+        cadena (son las filas donde se registró el valor vigente).
+        """
+        if odontograma_id is None:
+            return {}  # odontograma vacío virtual (todavía no guardado)
+        session = session or DatabaseSession.get_instance().session
+
+        cadena = (
+            select(Odontograma.id, Odontograma.base_id, literal(0).label('nivel'))
+            .where(Odontograma.id == odontograma_id)
+            .cte('cadena', recursive=True)
+        )
+        cadena = cadena.union_all(
+            select(Odontograma.id, Odontograma.base_id, (cadena.c.nivel + 1).label('nivel'))
+            .join(cadena, Odontograma.id == cadena.c.base_id)
+        )
+
+        # Del snapshot (nivel más alto) hacia la versión pedida (nivel 0)
+        filas = session.execute(
+            select(OdontogramaCara)
+            .join(cadena, OdontogramaCara.odontograma_id == cadena.c.id)
+            .order_by(cadena.c.nivel.desc(), OdontogramaCara.id)
+        ).scalars()
+
+        estado: Dict[ClaveCara, OdontogramaCara] = {}
+        for cara in filas:
+            estado[(cara.diente, cara.cara)] = cara
+        return estado
+
+    @staticmethod
+    def execute(odontograma_id: int, session=None) -> List[OdontogramaCara]:
+        """Caras vigentes de la versión, ordenadas por diente y cara."""
+        estado = ReconstruirOdontogramaService.caras_por_clave(odontograma_id, session)
+        return [estado[clave] for clave in sorted(estado)]
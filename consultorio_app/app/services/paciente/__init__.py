@@ -6,10 +6,12 @@ from .crear_paciente_service import CrearPacienteService
 from .editar_paciente_service import EditarPacienteService
 from .buscar_pacientes_service import BuscarPacientesService
 from .eliminar_paciente_service import EliminarPacienteService
+from .ultima_prestacion_service import UltimaPrestacionService
 
 __all__ = [
     'CrearPacienteService',
     'EditarPacienteService',
     'BuscarPacientesService',
     'EliminarPacienteService',
+    'UltimaPrestacionService',
 ]
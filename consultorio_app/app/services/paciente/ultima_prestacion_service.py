@@ -0,0 +1,39 @@
+"""
+UltimaPrestacionService: mantiene Paciente.ultima_prestacion_en.
+
+Es el max(Prestacion.fecha) del paciente, desnormalizado para que consultar
+si el odontograma está desactualizado sea comparar dos columnas en vez de
+recorrer las prestaciones en cada GET de la ficha.
+
+Lo llaman los services que crean, actualizan o eliminan prestaciones, dentro
+de su misma transacción (no hacen commit).
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.models import Paciente, Prestacion
+
+
+class UltimaPrestacionService:
+    """Caso de uso: mantener la fecha de la última prestación de un paciente."""
+
+    @staticmethod
+    def registrar(paciente: Paciente, fecha: Optional[datetime]) -> None:
+        """Alta de una prestación: solo puede adelantar la fecha, sin consultar."""
+        if fecha and (paciente.ultima_prestacion_en is None or fecha > paciente.ultima_prestacion_en):
+            paciente.ultima_prestacion_en = fecha
+
+    @staticmethod
+    def recalcular(session, paciente_id: int) -> Optional[datetime]:
+        """Recalcula desde prestaciones (baja o cambio de paciente/fecha)."""
+        paciente = session.get(Paciente, paciente_id)
+        if not paciente:
+            return None
+        session.flush()
+        paciente.ultima_prestacion_en = session.query(func.max(Prestacion.fecha)).filter(
+            Prestacion.paciente_id == paciente_id
+        ).scalar()
+        return paciente.ultima_prestacion_en
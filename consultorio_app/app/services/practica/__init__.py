@@ -6,10 +6,18 @@ from .listar_practicas_service import ListarPracticasService
 from .crear_practica_service import CrearPracticaService
 from .editar_practica_service import EditarPracticaService
 from .eliminar_practica_service import EliminarPracticaService
+from .importar_precios_service import ImportarPreciosService, PlanImportacion
+from .catalogo_practicas import PracticaItem, CatalogoPracticas, obtener_catalogo, invalidar_catalogo
 
 __all__ = [
     'ListarPracticasService',
     'CrearPracticaService',
     'EditarPracticaService',
     'EliminarPracticaService',
+    'ImportarPreciosService',
+    'PlanImportacion',
+    'PracticaItem',
+    'CatalogoPracticas',
+    'obtener_catalogo',
+    'invalidar_catalogo',
 ]
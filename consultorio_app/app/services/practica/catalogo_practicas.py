@@ -0,0 +1,170 @@
+"""
+Catálogo de prácticas en memoria, indexado por obra social.
+
+El catálogo cambia muy poco (altas/ediciones/bajas desde la pantalla de
+prácticas) pero se consulta en cada formulario de prestación y en
+/api/pacientes/<id>/practicas. Se arma una sola vez con dos consultas y
+se sirve desde memoria hasta que CrearPracticaService,
+EditarPracticaService o EliminarPracticaService lo invalidan.
+
+Estructuras:
+- por_id: id -> PracticaItem (incluye bajas)
+- listas por proveedor (obra_social_id, o None = particulares), ordenadas
+  por descripción, con y sin bajas
+- índice de búsqueda: "codigo descripcion" normalizado (minúsculas, sin tildes)
+
+Los PracticaItem son snapshots desacoplados de la sesión de SQLAlchemy
+(como ConversationState): se pueden compartir entre requests sin cargas
+lazy ni DetachedInstanceError. Son de solo lectura; para editar, cargar
+el modelo Practica.
+
+IMPORTANTE: el catálogo es por proceso. Con varios procesos sirviendo la
+app, configurar `cache_catalogo = false` en [practicas] de settings.ini.
+"""
+
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import joinedload
+
+from app.config import SettingsLoader
+from app.models import ObraSocial, Practica
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculas y sin tildes, para buscar sin importar acentos."""
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+class ObraSocialRef:
+    """Id y nombre de la obra social de una práctica."""
+
+    __slots__ = ('id', 'nombre')
+
+    def __init__(self, id: int, nombre: str):
+        self.id = id
+        self.nombre = nombre
+
+
+class PracticaItem:
+    """Snapshot de solo lectura de una fila de `practicas`."""
+
+    FIELDS = (
+        'id',
+        'codigo',
+        'descripcion',
+        'proveedor_tipo',
+        'obra_social_id',
+        'monto_unitario',
+        'es_plus',
+        'activa',
+        'fecha_baja',
+        'razon_baja',
+    )
+    __slots__ = FIELDS + ('obra_social', 'clave_busqueda')
+
+    def __init__(self, obra_social: Optional[ObraSocialRef] = None, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+        self.obra_social = obra_social
+        self.clave_busqueda = f"{normalizar(self.codigo)} {normalizar(self.descripcion)}"
+
+    @classmethod
+    def from_model(cls, practica: Practica) -> "PracticaItem":
+        obra_social = practica.obra_social
+        return cls(
+            obra_social=ObraSocialRef(obra_social.id, obra_social.nombre) if obra_social else None,
+            **{field: getattr(practica, field) for field in cls.FIELDS},
+        )
+
+    def __str__(self):
+        proveedor = self.proveedor_tipo + (f"/{self.obra_social.nombre}" if self.obra_social else "")
+        return f"[{proveedor}] {self.codigo} - {self.descripcion}"
+
+
+class CatalogoPracticas:
+    """Catálogo armado desde la base; inmutable una vez construido."""
+
+    def __init__(self, practicas: List[Practica], particular_os_ids: List[int]):
+        items = sorted((PracticaItem.from_model(p) for p in practicas), key=lambda i: i.descripcion or '')
+        self.por_id: Dict[int, PracticaItem] = {item.id: item for item in items}
+        self._todas: Dict[Optional[int], List[PracticaItem]] = {}
+        self._activas: Dict[Optional[int], List[PracticaItem]] = {}
+
+        particulares = set(particular_os_ids)
+        for item in items:
+            # Compatibilidad legacy: prácticas "particulares" guardadas como
+            # OBRA_SOCIAL apuntando a la obra social PARTICULAR.
+            if item.proveedor_tipo == 'PARTICULAR' or item.obra_social_id in particulares:
+                claves = [None]
+            else:
+                claves = []
+            if item.proveedor_tipo == 'OBRA_SOCIAL':
+                claves.append(item.obra_social_id)
+            for clave in claves:
+                self._todas.setdefault(clave, []).append(item)
+                if item.fecha_baja is None:
+                    self._activas.setdefault(clave, []).append(item)
+
+    @classmethod
+    def cargar(cls) -> "CatalogoPracticas":
+        practicas = Practica.query.options(joinedload(Practica.obra_social)).all()
+        particular_os_ids = [
+            os.id for os in ObraSocial.query.filter(ObraSocial.nombre.ilike('%PARTICULAR%')).all()
+        ]
+        return cls(practicas, particular_os_ids)
+
+    def listar(self, obra_social_id: Optional[int] = None, incluir_bajas: bool = False) -> List[PracticaItem]:
+        """Prácticas del proveedor (None = particulares), ordenadas por descripción."""
+        listas = self._todas if incluir_bajas else self._activas
+        return list(listas.get(obra_social_id, ()))
+
+    def buscar(self, termino: Optional[str] = None, obra_social_id: Optional[int] = None) -> List[PracticaItem]:
+        """Prácticas del proveedor cuyo código o descripción contiene `termino`."""
+        termino = normalizar((termino or '').strip())
+        items = self._todas.get(obra_social_id, ())
+        if not termino:
+            return list(items)
+        return [item for item in items if termino in item.clave_busqueda]
+
+    def obtener(self, practica_id: int) -> Optional[PracticaItem]:
+        return self.por_id.get(practica_id)
+
+
+_catalogo: Optional[CatalogoPracticas] = None
+_lock = threading.Lock()
+
+
+def cache_habilitado() -> bool:
+    return SettingsLoader.get_bool('practicas', 'cache_catalogo', True)
+
+
+def obtener_catalogo() -> CatalogoPracticas:
+    """Catálogo cacheado (lo arma la primera vez o después de invalidar)."""
+    global _catalogo
+    if not cache_habilitado():
+        return CatalogoPracticas.cargar()
+    catalogo = _catalogo
+    if catalogo is None:
+        with _lock:
+            if _catalogo is None:
+                _catalogo = CatalogoPracticas.cargar()
+            catalogo = _catalogo
+    return catalogo
+
+
+def invalidar_catalogo() -> None:
+    """Descarta el catálogo cacheado; se rearma en la próxima consulta."""
+    global _catalogo
+    with _lock:
+        _catalogo = None
+
+
+__all__ = [
+    'PracticaItem',
+    'CatalogoPracticas',
+    'obtener_catalogo',
+    'invalidar_catalogo',
+]
@@ -11,6 +11,7 @@ from app.services.common import (
     ObraSocialNoEncontradaError,
     DatosInvalidosError,
 )
+from .catalogo_practicas import invalidar_catalogo
 
 
 class CrearPracticaService:
@@ -114,5 +115,6 @@ class CrearPracticaService:
         )
         session.add(practica)
         session.commit()
+        invalidar_catalogo()
         
         return practica
@@ -6,12 +6,14 @@ Replica la funcionalidad de actualizar_practica() del viejo practica_service.py.
 
 from typing import Dict, Any, Optional
 from app.database.session import DatabaseSession
-from app.models import Practica, ObraSocial
+from app.models import Practica, ObraSocial, PrestacionPractica
 from app.services.common import (
     PracticaNoEncontradaError,
     ObraSocialNoEncontradaError,
     DatosInvalidosError,
 )
+from app.services.prestacion.saldo_prestacion_service import SaldoPrestacionService
+from .catalogo_practicas import invalidar_catalogo
 
 
 class EditarPracticaService:
@@ -79,8 +81,11 @@ class EditarPracticaService:
                 practica.codigo = codigo
         
         # Es Plus (solo permitir cambio al crear, pero si se envía, actualizar)
+        es_plus_cambio = False
         if 'es_plus' in data:
-            practica.es_plus = data.get('es_plus', False)
+            es_plus_nuevo = data.get('es_plus', False)
+            es_plus_cambio = bool(es_plus_nuevo) != bool(practica.es_plus)
+            practica.es_plus = es_plus_nuevo
         
         # Descripción
         if 'descripcion' in data:
@@ -132,5 +137,16 @@ class EditarPracticaService:
                 # PARTICULAR: no debe tener obra_social_id
                 practica.obra_social_id = None
         
+        # El plus entra en saldo_pendiente: recalcular las prestaciones que usan la práctica
+        if es_plus_cambio:
+            prestacion_ids = [
+                fila.prestacion_id
+                for fila in session.query(PrestacionPractica.prestacion_id).filter(
+                    PrestacionPractica.practica_id == practica_id
+                ).distinct()
+            ]
+            SaldoPrestacionService.recalcular(session, prestacion_ids)
+
         session.commit()
+        invalidar_catalogo()
         return practica
@@ -14,6 +14,7 @@ from app.services.common import (
     PracticaConDependenciasError,
     DatosInvalidosError,
 )
+from .catalogo_practicas import invalidar_catalogo
 
 
 class EliminarPracticaService:
@@ -63,6 +64,7 @@ class EliminarPracticaService:
         practica.activa = False
         
         session.commit()
+        invalidar_catalogo()
         
         # 4. Informar si tiene prestaciones asociadas
         prestaciones_asociadas = session.query(PrestacionPractica).filter(
@@ -0,0 +1,304 @@
+"""
+ImportarPreciosService: importación masiva de listas de precios (nomencladores).
+
+Las obras sociales publican listas nuevas varias veces al año. En vez de
+editar práctica por práctica (cada edición hace su consulta de duplicados
+y su commit), se carga la lista completa desde CSV o XLSX y:
+
+1. planificar(): arma en memoria un mapa (codigo, proveedor_tipo,
+   obra_social_id) -> práctica existente con UNA consulta, y compara cada
+   fila del archivo contra ese mapa. El resultado (PlanImportacion) es el
+   "dry-run": altas, modificaciones de precio/descripción, reactivaciones,
+   bajas opcionales de códigos que ya no figuran, y errores por fila.
+2. aplicar(): ejecuta el plan con executemany (un INSERT y un UPDATE por
+   lote) en una sola transacción e invalida el catálogo en memoria.
+
+Formato del archivo: primera fila con encabezados. Columnas reconocidas
+(sin importar mayúsculas/tildes): codigo, descripcion, monto (o precio,
+importe, valor, monto_unitario) y opcionalmente es_plus. Los montos
+aceptan formato local ("1.234,56") o con punto decimal.
+
+XLSX requiere openpyxl (se importa solo al leer un .xlsx).
+"""
+
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, insert, or_, select, update
+
+from app.database.session import DatabaseSession
+from app.models import ObraSocial, Practica
+from app.services.common import DatosInvalidosError, ObraSocialNoEncontradaError
+from app.services.common.archivos_tabulares import leer_filas
+from .catalogo_practicas import invalidar_catalogo, normalizar
+
+COLUMNAS = {
+    'codigo': ('codigo', 'cod', 'code', 'codigo practica'),
+    'descripcion': ('descripcion', 'practica', 'detalle', 'nombre'),
+    'monto': ('monto', 'monto_unitario', 'monto unitario', 'precio', 'importe', 'valor', 'honorario'),
+    'es_plus': ('es_plus', 'es plus', 'plus'),
+}
+VERDADEROS = {'1', 'si', 'sí', 's', 'x', 'true', 'verdadero', 'yes'}
+RAZON_BAJA = 'Baja por importación de lista de precios'
+
+ClavePractica = Tuple[str, str, Optional[int]]
+
+
+class PlanImportacion:
+    """Resultado del dry-run: qué haría la importación, sin haber escrito nada."""
+
+    def __init__(self, proveedor_tipo: str, obra_social_id: Optional[int]):
+        self.proveedor_tipo = proveedor_tipo
+        self.obra_social_id = obra_social_id
+        self.altas: List[Dict[str, Any]] = []
+        self.modificaciones: List[Dict[str, Any]] = []
+        self.bajas: List[Dict[str, Any]] = []
+        self.sin_cambios = 0
+        self.errores: List[str] = []
+
+    @property
+    def hay_cambios(self) -> bool:
+        return bool(self.altas or self.modificaciones or self.bajas)
+
+    def resumen(self) -> Dict[str, int]:
+        return {
+            'altas': len(self.altas),
+            'modificaciones': len(self.modificaciones),
+            'bajas': len(self.bajas),
+            'sin_cambios': self.sin_cambios,
+            'errores': len(self.errores),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'proveedor_tipo': self.proveedor_tipo,
+            'obra_social_id': self.obra_social_id,
+            'resumen': self.resumen(),
+            'altas': self.altas,
+            'modificaciones': self.modificaciones,
+            'bajas': self.bajas,
+            'errores': self.errores,
+        }
+
+
+class ImportarPreciosService:
+    """Caso de uso: importar una lista de precios completa de un proveedor."""
+
+    @staticmethod
+    def leer_archivo(contenido: bytes, nombre_archivo: str) -> List[Dict[str, Any]]:
+        """
+        Lee un CSV o XLSX y devuelve filas {fila, codigo, descripcion, monto, es_plus}.
+
+        `monto` queda como texto/número crudo; se valida en planificar().
+
+        Raises:
+            DatosInvalidosError: Formato no soportado o sin columnas codigo/monto
+        """
+        return leer_filas(
+            contenido,
+            nombre_archivo,
+            COLUMNAS,
+            requeridas=('codigo', 'monto'),
+            error_requeridas='El archivo debe tener columnas de código y monto',
+        )
+
+    @staticmethod
+    def planificar(
+        filas: List[Dict[str, Any]],
+        obra_social_id: Optional[int] = None,
+        dar_de_baja_faltantes: bool = False,
+    ) -> PlanImportacion:
+        """
+        Compara las filas contra las prácticas existentes del proveedor (dry-run).
+
+        Args:
+            filas: Salida de leer_archivo() (o dicts con codigo/descripcion/monto/es_plus)
+            obra_social_id: Obra social de la lista; None = prácticas particulares
+            dar_de_baja_faltantes: Dar de baja las prácticas activas que no figuran en la lista
+
+        Raises:
+            ObraSocialNoEncontradaError: Si obra_social_id no existe
+        """
+        session = DatabaseSession.get_instance().session
+        if obra_social_id is not None and not session.get(ObraSocial, obra_social_id):
+            raise ObraSocialNoEncontradaError(obra_social_id)
+        proveedor_tipo = 'OBRA_SOCIAL' if obra_social_id is not None else 'PARTICULAR'
+        plan = PlanImportacion(proveedor_tipo, obra_social_id)
+
+        if obra_social_id is not None:
+            filtro = and_(Practica.proveedor_tipo == proveedor_tipo, Practica.obra_social_id == obra_social_id)
+        else:
+            # Compatibilidad legacy (como CatalogoPracticas.cargar): prácticas
+            # "particulares" guardadas como OBRA_SOCIAL apuntando a la obra
+            # social PARTICULAR; se actualizan en vez de duplicarlas.
+            particular_os_ids = select(ObraSocial.id).where(ObraSocial.nombre.ilike('%PARTICULAR%'))
+            filtro = or_(
+                and_(Practica.proveedor_tipo == 'PARTICULAR', Practica.obra_social_id.is_(None)),
+                and_(Practica.proveedor_tipo == 'OBRA_SOCIAL', Practica.obra_social_id.in_(particular_os_ids)),
+            )
+
+        # Mapa en memoria de las prácticas del proveedor: una sola consulta.
+        # Las legacy se indexan con la clave particular; si un código está en
+        # ambas formas, gana la práctica PARTICULAR.
+        existentes: Dict[ClavePractica, Any] = {}
+        for row in session.execute(
+            select(
+                Practica.id, Practica.codigo, Practica.descripcion, Practica.proveedor_tipo,
+                Practica.obra_social_id, Practica.monto_unitario, Practica.fecha_baja,
+            ).where(filtro).order_by(Practica.proveedor_tipo.desc(), Practica.id)
+        ):
+            existentes.setdefault((row.codigo, proveedor_tipo, obra_social_id), row)
+
+        vistos = set()
+        for fila in filas:
+            numero = fila.get('fila', '?')
+            try:
+                codigo, es_plus = ImportarPreciosService._normalizar_codigo(fila.get('codigo'), fila.get('es_plus'))
+                monto = ImportarPreciosService.parsear_monto(fila.get('monto'))
+            except DatosInvalidosError as exc:
+                plan.errores.append(f"Fila {numero}: {exc.mensaje}")
+                continue
+            descripcion = str(fila.get('descripcion') or '').strip()
+
+            clave = (codigo, proveedor_tipo, obra_social_id)
+            if clave in vistos:
+                plan.errores.append(f"Fila {numero}: código {codigo} repetido en el archivo")
+                continue
+            vistos.add(clave)
+
+            actual = existentes.get(clave)
+            if actual is None:
+                if not descripcion:
+                    plan.errores.append(f"Fila {numero}: falta la descripción de la práctica nueva {codigo}")
+                    continue
+                plan.altas.append({
+                    'codigo': codigo,
+                    'descripcion': descripcion,
+                    'monto_unitario': monto,
+                    'es_plus': es_plus,
+                })
+                continue
+
+            nueva_descripcion = descripcion or actual.descripcion
+            reactivar = actual.fecha_baja is not None
+            if (
+                not reactivar
+                and abs((actual.monto_unitario or 0) - monto) < 0.005
+                and nueva_descripcion == actual.descripcion
+            ):
+                plan.sin_cambios += 1
+                continue
+            plan.modificaciones.append({
+                'id': actual.id,
+                'codigo': codigo,
+                'descripcion': nueva_descripcion,
+                'descripcion_anterior': actual.descripcion,
+                'monto_unitario': monto,
+                'monto_anterior': actual.monto_unitario,
+                'reactivar': reactivar,
+            })
+
+        if dar_de_baja_faltantes:
+            for clave, actual in existentes.items():
+                if clave not in vistos and actual.fecha_baja is None:
+                    plan.bajas.append({
+                        'id': actual.id,
+                        'codigo': actual.codigo,
+                        'descripcion': actual.descripcion,
+                        'monto_unitario': actual.monto_unitario,
+                    })
+        plan.bajas.sort(key=lambda b: b['codigo'])
+        return plan
+
+    @staticmethod
+    def aplicar(plan: PlanImportacion) -> Dict[str, int]:
+        """
+        Ejecuta el plan en una sola transacción (executemany por tipo de cambio).
+
+        Returns:
+            Resumen con la cantidad de altas, modificaciones y bajas aplicadas
+        """
+        session = DatabaseSession.get_instance().session
+        try:
+            if plan.altas:
+                session.execute(insert(Practica), [
+                    {
+                        'codigo': alta['codigo'],
+                        'descripcion': alta['descripcion'],
+                        'monto_unitario': alta['monto_unitario'],
+                        'es_plus': alta['es_plus'],
+                        'proveedor_tipo': plan.proveedor_tipo,
+                        'obra_social_id': plan.obra_social_id,
+                        'activa': True,
+                    }
+                    for alta in plan.altas
+                ])
+            if plan.modificaciones:
+                # UPDATE por clave primaria, ejecutado como executemany
+                session.execute(update(Practica), [
+                    {
+                        'id': mod['id'],
+                        'descripcion': mod['descripcion'],
+                        'monto_unitario': mod['monto_unitario'],
+                        'activa': True,
+                        'fecha_baja': None,
+                        'razon_baja': None,
+                    }
+                    for mod in plan.modificaciones
+                ])
+            if plan.bajas:
+                hoy = date.today()
+                session.execute(update(Practica), [
+                    {'id': baja['id'], 'activa': False, 'fecha_baja': hoy, 'razon_baja': RAZON_BAJA}
+                    for baja in plan.bajas
+                ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            invalidar_catalogo()
+
+        resumen = plan.resumen()
+        return {k: resumen[k] for k in ('altas', 'modificaciones', 'bajas')}
+
+    @staticmethod
+    def parsear_monto(valor: Any) -> float:
+        """Convierte '1.234,56', '1234.56', '$ 1.500' o un número a float > 0."""
+        if isinstance(valor, (int, float)):
+            monto = float(valor)
+        else:
+            texto = re.sub(r'[^\d,.\-]', '', str(valor or ''))
+            if not texto:
+                raise DatosInvalidosError('monto vacío')
+            if ',' in texto and '.' in texto:
+                # El último separador es el decimal
+                if texto.rfind(',') > texto.rfind('.'):
+                    texto = texto.replace('.', '').replace(',', '.')
+                else:
+                    texto = texto.replace(',', '')
+            elif ',' in texto:
+                texto = texto.replace(',', '.')
+            elif re.fullmatch(r'-?\d{1,3}(\.\d{3})+', texto):
+                texto = texto.replace('.', '')  # "1.500" = mil quinientos
+            try:
+                monto = float(texto)
+            except ValueError:
+                raise DatosInvalidosError(f'monto inválido: {valor}')
+        if monto <= 0:
+            raise DatosInvalidosError(f'el monto debe ser mayor a 0 ({valor})')
+        return round(monto, 2)
+
+    @staticmethod
+    def _normalizar_codigo(valor: Any, es_plus_valor: Any) -> Tuple[str, bool]:
+        """Mismo criterio que CrearPracticaService: mayúsculas y prefijo 'plus_'."""
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)  # XLSX devuelve 101.0
+        codigo = str(valor or '').strip().upper()
+        es_plus = normalizar(str(es_plus_valor or '')).strip() in VERDADEROS
+        if codigo.startswith('PLUS_'):
+            codigo, es_plus = codigo[5:], True
+        if not codigo:
+            raise DatosInvalidosError('falta el código')
+        return (f'plus_{codigo}' if es_plus else codigo), es_plus
@@ -6,13 +6,13 @@ Responsabilidades:
 - Buscar prácticas por nombre o código
 - Filtrar por obra social
 - Obtener práctica específica
+
+Listados y búsquedas se sirven del catálogo en memoria (ver catalogo_practicas).
 """
 
 from typing import List, Optional
-from sqlalchemy import or_, and_
-from app.database.session import DatabaseSession
 from app.models import Practica
-from app.models import ObraSocial
+from .catalogo_practicas import PracticaItem, obtener_catalogo
 
 
 class ListarPracticasService:
@@ -31,9 +31,9 @@ class ListarPracticasService:
         return query.order_by(Practica.descripcion).all()
     
     @staticmethod
-    def listar_por_proveedor(obra_social_id: Optional[int] = None, incluir_bajas: bool = False) -> List[Practica]:
+    def listar_por_proveedor(obra_social_id: Optional[int] = None, incluir_bajas: bool = False) -> List[PracticaItem]:
         """
-        Lista prácticas filtradas por proveedor.
+        Lista prácticas filtradas por proveedor (desde el catálogo en memoria).
         
         - Si obra_social_id está presente: solo prácticas de esa obra social (proveedor_tipo='OBRA_SOCIAL').
         - Si obra_social_id es None: solo prácticas particulares (proveedor_tipo='PARTICULAR').
@@ -42,41 +42,13 @@ class ListarPracticasService:
             obra_social_id: ID de obra social o None para particulares
             incluir_bajas: Si True, incluye prácticas dadas de baja. Default False.
         """
-        query = Practica.query
-        
-        # Filtrar bajas lógicas
-        if not incluir_bajas:
-            query = query.filter(Practica.fecha_baja.is_(None))
-
-        if obra_social_id is not None:
-            query = query.filter(
-                and_(
-                    Practica.proveedor_tipo == 'OBRA_SOCIAL',
-                    Practica.obra_social_id == obra_social_id,
-                )
-            )
-        else:
-            # Compatibilidad legacy: algunas prácticas "particulares" quedaron
-            # guardadas como OBRA_SOCIAL apuntando a la obra social PARTICULAR.
-            particular_os_ids = [
-                os.id for os in ObraSocial.query.filter(ObraSocial.nombre.ilike('%PARTICULAR%')).all()
-            ]
-            query = query.filter(
-                or_(
-                    Practica.proveedor_tipo == 'PARTICULAR',
-                    and_(
-                        Practica.proveedor_tipo == 'OBRA_SOCIAL',
-                        Practica.obra_social_id.in_(particular_os_ids) if particular_os_ids else False,
-                    ),
-                )
-            )
-
-        return query.order_by(Practica.descripcion).all()
+        return obtener_catalogo().listar(obra_social_id, incluir_bajas)
     
     @staticmethod
-    def buscar(termino: Optional[str] = None, obra_social_id: Optional[int] = None) -> List[Practica]:
+    def buscar(termino: Optional[str] = None, obra_social_id: Optional[int] = None) -> List[PracticaItem]:
         """
-        Busca prácticas por nombre o código (case-insensitive) con filtro opcional por obra social.
+        Busca prácticas por nombre o código (sin distinguir mayúsculas ni tildes)
+        con filtro opcional por obra social, desde el catálogo en memoria.
         
         Args:
             termino: Término de búsqueda (opcional)
@@ -85,43 +57,7 @@ class ListarPracticasService:
         Returns:
             Lista de prácticas que coinciden
         """
-        termino = (termino or "").strip()
-        
-        query = Practica.query
-        
-        # Aplicar filtro de búsqueda por término
-        if termino:
-            like_term = f"%{termino.lower()}%"
-            query = query.filter(
-                or_(
-                    Practica.descripcion.ilike(like_term),
-                    Practica.codigo.ilike(like_term)
-                )
-            )
-        
-        # Aplicar filtro de obra social
-        if obra_social_id is not None:
-            query = query.filter(
-                and_(
-                    Practica.proveedor_tipo == 'OBRA_SOCIAL',
-                    Practica.obra_social_id == obra_social_id,
-                )
-            )
-        else:
-            particular_os_ids = [
-                os.id for os in ObraSocial.query.filter(ObraSocial.nombre.ilike('%PARTICULAR%')).all()
-            ]
-            query = query.filter(
-                or_(
-                    Practica.proveedor_tipo == 'PARTICULAR',
-                    and_(
-                        Practica.proveedor_tipo == 'OBRA_SOCIAL',
-                        Practica.obra_social_id.in_(particular_os_ids) if particular_os_ids else False,
-                    ),
-                )
-            )
-        
-        return query.order_by(Practica.descripcion).all()
+        return obtener_catalogo().buscar(termino, obra_social_id)
     
     @staticmethod
     def obtener_por_id(practica_id: int) -> Practica:
@@ -4,20 +4,24 @@ Inicializador del módulo de servicios de prestación.
 
 from .listar_prestaciones_service import ListarPrestacionesService
 from .crear_prestacion_service import CrearPrestacionService
+from .crear_prestaciones_lote_service import CrearPrestacionesLoteService
 from .actualizar_prestacion_service import ActualizarPrestacionService
 from .eliminar_prestacion_service import EliminarPrestacionService
 from .registrar_autorizacion_service import RegistrarAutorizacionPrestacionService
 from .registrar_cobro_service import RegistrarCobroPrestacionService
 from .registrar_realizacion_service import RegistrarRealizacionPrestacionService
 from .marcar_item_realizado_service import MarcarItemRealizadoService
+from .saldo_prestacion_service import SaldoPrestacionService
 
 __all__ = [
     'ListarPrestacionesService',
     'CrearPrestacionService',
+    'CrearPrestacionesLoteService',
     'ActualizarPrestacionService',
     'EliminarPrestacionService',
     'RegistrarAutorizacionPrestacionService',
     'RegistrarCobroPrestacionService',
     'RegistrarRealizacionPrestacionService',
     'MarcarItemRealizadoService',
+    'SaldoPrestacionService',
 ]
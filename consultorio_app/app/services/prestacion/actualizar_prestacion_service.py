@@ -8,6 +8,8 @@ from typing import Dict, Any
 from app.database.session import DatabaseSession
 from app.models import Prestacion, PrestacionPractica, Practica, Paciente
 from app.services.prestacion.crear_prestacion_service import CrearPrestacionService
+from app.services.prestacion.saldo_prestacion_service import SaldoPrestacionService
+from app.services.paciente.ultima_prestacion_service import UltimaPrestacionService
 from app.services.common import (
     PrestacionNoEncontradaError,
     EstadoPrestacionInvalidoError,
@@ -75,6 +77,7 @@ class ActualizarPrestacionService:
         monto = subtotal * (1 - descuento_porcentaje / 100)
         monto = max(0, monto - descuento_fijo)
 
+        paciente_anterior_id = prestacion.paciente_id
         prestacion.paciente_id = paciente_id
         prestacion.descripcion = descripcion
         prestacion.observaciones = observaciones
@@ -100,5 +103,10 @@ class ActualizarPrestacionService:
             )
             session.add(pp)
 
+        UltimaPrestacionService.registrar(paciente, prestacion.fecha)
+        if paciente_anterior_id != paciente_id:
+            UltimaPrestacionService.recalcular(session, paciente_anterior_id)
+        SaldoPrestacionService.recalcular(session, [prestacion.id])
+
         session.commit()
         return prestacion
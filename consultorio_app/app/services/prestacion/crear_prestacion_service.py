@@ -10,11 +10,13 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from app.database.session import DatabaseSession
 from app.models import Prestacion, Practica, PrestacionPractica, Paciente
+from app.services.paciente.ultima_prestacion_service import UltimaPrestacionService
 from app.services.common import (
     PacienteNoEncontradoError,
     DatosInvalidosError,
     PracticaNoEncontradaError,
 )
+from app.services.prestacion.saldo_prestacion_service import SaldoPrestacionService
 
 
 class CrearPrestacionService:
@@ -130,6 +132,7 @@ class CrearPrestacionService:
         )
         session.add(prestacion)
         session.flush()  # Para obtener el ID generado
+        UltimaPrestacionService.registrar(paciente, prestacion.fecha)
         
         # 10. Crear PrestacionPractica entries para cada práctica
         for practica in practicas:
@@ -148,6 +151,8 @@ class CrearPrestacionService:
             )
             session.add(pp)
         
+        SaldoPrestacionService.recalcular(session, [prestacion.id])
+
         # Commit de todo junto
         session.commit()
         
@@ -0,0 +1,375 @@
+"""
+CrearPrestacionesLoteService: alta masiva de prestaciones (lotes IPSS).
+
+Las autorizaciones de IPSS llegan en lotes de varios pacientes. Crear cada
+prestación con CrearPrestacionService cuesta una consulta de paciente, una
+de prácticas y un commit por prestación. Acá el lote completo se resuelve
+con dos consultas:
+
+1. pacientes del lote (por id o DNI) -> paciente
+2. prácticas del lote (por id o código) -> práctica
+
+Después se validan las filas y se calculan montos y descuentos en una sola
+pasada en memoria (misma fórmula que CrearPrestacionService). Si alguna
+fila tiene errores se lanza LotePrestacionesInvalidoError con el detalle
+por fila y no se escribe nada. Si todo es válido se insertan las
+prestaciones (un INSERT ... RETURNING) y sus ítems (executemany) en una
+sola transacción.
+
+Formato de cada fila (dict o fila de CSV/XLSX):
+- paciente_id o dni: paciente de la prestación
+- practicas: lista de ids / {'id' o 'codigo', 'cantidad'}, o texto con
+  códigos separados por coma, punto y coma, '+' o espacios; "2201x2"
+  indica cantidad 2. Los códigos se buscan en las prácticas de la obra
+  social del paciente (particulares si no tiene).
+- descripcion (opcional): por defecto, las descripciones de las prácticas
+- descuento_porcentaje, descuento_fijo, observaciones (opcionales)
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, or_, select
+
+from app.database.session import DatabaseSession
+from app.models import ObraSocial, Paciente, Practica, Prestacion, PrestacionPractica
+from app.services.common import DatosInvalidosError, LotePrestacionesInvalidoError
+from app.services.common.archivos_tabulares import leer_filas
+from app.services.paciente.ultima_prestacion_service import UltimaPrestacionService
+from app.services.prestacion.saldo_prestacion_service import SaldoPrestacionService
+
+COLUMNAS = {
+    'paciente_id': ('paciente_id', 'id paciente', 'paciente id'),
+    'dni': ('dni', 'documento', 'nro documento', 'dni paciente'),
+    'practicas': ('practicas', 'codigos', 'codigo', 'practica'),
+    'descripcion': ('descripcion', 'detalle', 'prestacion'),
+    'descuento_porcentaje': ('descuento_porcentaje', 'descuento porcentaje', 'descuento %'),
+    'descuento_fijo': ('descuento_fijo', 'descuento fijo'),
+    'observaciones': ('observaciones', 'obs', 'observacion'),
+}
+CODIGO_CONSULTA = '101'
+_SEPARADORES = re.compile(r'[\s,;+]+')
+_CANTIDAD = re.compile(r'^(.+?)[x*](\d+)$', re.IGNORECASE)
+
+
+class _FilaInvalida(ValueError):
+    """Error de una fila del lote; se junta con los demás en LotePrestacionesInvalidoError."""
+
+
+class CrearPrestacionesLoteService:
+    """Caso de uso: crear muchas prestaciones en una sola transacción."""
+
+    @staticmethod
+    def leer_archivo(contenido: bytes, nombre_archivo: str) -> List[Dict[str, Any]]:
+        """
+        Lee un CSV o XLSX con una prestación por fila.
+
+        Raises:
+            DatosInvalidosError: Formato no soportado o sin columnas de paciente/prácticas
+        """
+        filas = leer_filas(
+            contenido,
+            nombre_archivo,
+            COLUMNAS,
+            requeridas=('practicas',),
+            error_requeridas='El archivo debe tener una columna de prácticas (códigos)',
+        )
+        if filas and 'dni' not in filas[0] and 'paciente_id' not in filas[0]:
+            raise DatosInvalidosError('El archivo debe tener una columna de DNI o de ID de paciente')
+        return filas
+
+    @staticmethod
+    def execute(filas: List[Dict[str, Any]]) -> List[int]:
+        """
+        Crea todas las prestaciones del lote o ninguna.
+
+        Args:
+            filas: Dicts con el formato descripto en el módulo. `fila` (opcional)
+                es el número que se informa en los errores; por defecto, la
+                posición en el lote empezando en 1.
+
+        Returns:
+            IDs de las prestaciones creadas, en el orden de las filas
+
+        Raises:
+            DatosInvalidosError: Lote vacío
+            LotePrestacionesInvalidoError: Alguna fila es inválida; `errores`
+                tiene [{'fila', 'error'}] y no se guardó nada
+        """
+        if not filas:
+            raise DatosInvalidosError('El lote no tiene prestaciones')
+
+        session = DatabaseSession.get_instance().session
+        errores: List[Tuple[int, str]] = []  # (posición en el lote, mensaje)
+
+        # 1. Normalizar filas (sin tocar la base)
+        normalizadas = []
+        for posicion, fila in enumerate(filas, start=1):
+            if not isinstance(fila, dict):
+                errores.append((posicion, 'la fila debe ser un objeto con paciente y prácticas'))
+                continue
+            try:
+                normalizadas.append((posicion, CrearPrestacionesLoteService._normalizar_fila(fila)))
+            except _FilaInvalida as exc:
+                errores.append((posicion, str(exc)))
+
+        # 2. Dos consultas para todo el lote
+        pacientes_por_id, pacientes_por_dni = CrearPrestacionesLoteService._cargar_pacientes(
+            session, [datos for _, datos in normalizadas]
+        )
+        practicas_por_id, practicas_por_codigo = CrearPrestacionesLoteService._cargar_practicas(
+            session, [datos for _, datos in normalizadas]
+        )
+
+        # 3. Validar y calcular montos en una pasada
+        fecha = datetime.now()
+        prestaciones: List[Dict[str, Any]] = []
+        items_por_prestacion: List[List[Dict[str, Any]]] = []
+        pacientes: List[Paciente] = []
+        for posicion, datos in normalizadas:
+            try:
+                paciente = CrearPrestacionesLoteService._resolver_paciente(
+                    datos, pacientes_por_id, pacientes_por_dni
+                )
+                items = CrearPrestacionesLoteService._resolver_practicas(
+                    datos['practicas'], paciente, practicas_por_id, practicas_por_codigo
+                )
+            except _FilaInvalida as exc:
+                errores.append((posicion, str(exc)))
+                continue
+
+            subtotal = sum((practica.monto_unitario or 0) * cantidad for practica, cantidad in items)
+            monto = subtotal * (1 - datos['descuento_porcentaje'] / 100)
+            monto = max(0, monto - datos['descuento_fijo'])
+
+            prestaciones.append({
+                'paciente_id': paciente.id,
+                'descripcion': datos['descripcion'] or ', '.join(p.descripcion for p, _ in items),
+                'monto': monto,
+                'observaciones': datos['observaciones'],
+                'fecha': fecha,
+                'fecha_solicitud': fecha.date(),
+                'estado': 'borrador',
+            })
+            items_por_prestacion.append([
+                {
+                    'practica_id': practica.id,
+                    'cantidad': cantidad,
+                    'monto_unitario': practica.monto_unitario,
+                    # Consulta (101): realizada en el momento, como en CrearPrestacionService
+                    'estado_item': 'realizado' if practica.codigo == CODIGO_CONSULTA else 'pendiente',
+                    'fecha_realizacion_item': fecha.date() if practica.codigo == CODIGO_CONSULTA else None,
+                }
+                for practica, cantidad in items
+            ])
+            pacientes.append(paciente)
+
+        if errores:
+            raise LotePrestacionesInvalidoError([
+                {'fila': CrearPrestacionesLoteService._numero_fila(filas[posicion - 1], posicion), 'error': mensaje}
+                for posicion, mensaje in sorted(errores)
+            ])
+
+        # 4. Escritura: todo o nada
+        try:
+            ids = session.scalars(
+                insert(Prestacion).returning(Prestacion.id, sort_by_parameter_order=True),
+                prestaciones,
+            ).all()
+            session.execute(insert(PrestacionPractica), [
+                dict(item, prestacion_id=prestacion_id)
+                for prestacion_id, items in zip(ids, items_por_prestacion)
+                for item in items
+            ])
+            SaldoPrestacionService.recalcular(session, ids)
+            for paciente in pacientes:
+                UltimaPrestacionService.registrar(paciente, fecha)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return list(ids)
+
+    @staticmethod
+    def _numero_fila(fila: Any, posicion: int):
+        """Número de fila del archivo si vino de leer_archivo(), si no la posición."""
+        return (fila.get('fila') if isinstance(fila, dict) else None) or posicion
+
+    @staticmethod
+    def _normalizar_fila(fila: Dict[str, Any]) -> Dict[str, Any]:
+        paciente_id = fila.get('paciente_id')
+        dni = fila.get('dni')
+        if isinstance(dni, float) and dni.is_integer():
+            dni = int(dni)  # XLSX devuelve 12345678.0
+        dni = str(dni or '').strip().replace('.', '') or None
+        if paciente_id not in (None, ''):
+            try:
+                paciente_id = int(paciente_id)
+            except (TypeError, ValueError):
+                raise _FilaInvalida(f'ID de paciente inválido: {paciente_id}')
+        else:
+            paciente_id = None
+        if paciente_id is None and dni is None:
+            raise _FilaInvalida('falta el paciente (paciente_id o DNI)')
+
+        descuento_porcentaje = CrearPrestacionesLoteService._parsear_numero(
+            fila.get('descuento_porcentaje'), 'descuento_porcentaje'
+        )
+        descuento_fijo = CrearPrestacionesLoteService._parsear_numero(fila.get('descuento_fijo'), 'descuento_fijo')
+        if descuento_porcentaje < 0 or descuento_porcentaje > 100:
+            raise _FilaInvalida('descuento_porcentaje debe estar entre 0 y 100')
+        if descuento_fijo < 0:
+            raise _FilaInvalida('descuento_fijo no puede ser negativo')
+
+        descripcion = str(fila.get('descripcion') or '').strip() or None
+        observaciones = str(fila.get('observaciones') or '').strip() or None
+
+        return {
+            'paciente_id': paciente_id,
+            'dni': dni,
+            'practicas': CrearPrestacionesLoteService._normalizar_practicas(fila.get('practicas')),
+            'descripcion': descripcion,
+            'descuento_porcentaje': descuento_porcentaje,
+            'descuento_fijo': descuento_fijo,
+            'observaciones': observaciones,
+        }
+
+    @staticmethod
+    def _normalizar_practicas(valor: Any) -> List[Tuple[Optional[int], Optional[str], int]]:
+        """Devuelve [(practica_id, codigo, cantidad)]; uno de id/codigo es None."""
+        if isinstance(valor, str):
+            valor = [token for token in _SEPARADORES.split(valor) if token]
+        elif isinstance(valor, (int, float)):
+            valor = [{'codigo': valor}]  # celda de XLSX con un solo código
+        if not valor or not isinstance(valor, list):
+            raise _FilaInvalida('debe indicar al menos una práctica')
+
+        practicas = []
+        for item in valor:
+            if isinstance(item, dict):
+                practica_id, codigo, cantidad = item.get('id'), item.get('codigo'), item.get('cantidad', 1)
+            elif isinstance(item, str):
+                match = _CANTIDAD.match(item)
+                codigo, cantidad = (match.group(1), match.group(2)) if match else (item, 1)
+                practica_id = None
+            else:
+                practica_id, codigo, cantidad = item, None, 1
+
+            try:
+                cantidad = max(1, int(cantidad)) if cantidad is not None else 1
+            except (TypeError, ValueError):
+                raise _FilaInvalida(f'cantidad inválida: {cantidad}')
+
+            if practica_id is not None:
+                try:
+                    practicas.append((int(practica_id), None, cantidad))
+                except (TypeError, ValueError):
+                    raise _FilaInvalida(f'ID de práctica inválido: {practica_id}')
+                continue
+
+            codigo = CrearPrestacionesLoteService._normalizar_codigo(codigo)
+            if not codigo:
+                raise _FilaInvalida('cada práctica debe tener id o código')
+            practicas.append((None, codigo, cantidad))
+        return practicas
+
+    @staticmethod
+    def _normalizar_codigo(valor: Any) -> str:
+        """Mismo criterio que CrearPracticaService: mayúsculas y prefijo 'plus_'."""
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)
+        codigo = str(valor or '').strip().upper()
+        if codigo.startswith('PLUS_'):
+            return f'plus_{codigo[5:]}'
+        return codigo
+
+    @staticmethod
+    def _parsear_numero(valor: Any, campo: str) -> float:
+        if valor in (None, ''):
+            return 0.0
+        if isinstance(valor, (int, float)):
+            return float(valor)
+        texto = str(valor).strip().replace('%', '').replace('$', '').replace(' ', '')
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+        try:
+            return float(texto)
+        except ValueError:
+            raise _FilaInvalida(f'{campo} inválido: {valor}')
+
+    @staticmethod
+    def _cargar_pacientes(session, filas: List[Dict[str, Any]]):
+        ids = {f['paciente_id'] for f in filas if f['paciente_id'] is not None}
+        dnis = {f['dni'] for f in filas if f['paciente_id'] is None}
+        if not ids and not dnis:
+            return {}, {}
+        pacientes = session.scalars(
+            select(Paciente).where(or_(Paciente.id.in_(ids), Paciente.dni.in_(dnis)))
+        ).all()
+        por_dni: Dict[str, List[Paciente]] = {}
+        for paciente in pacientes:
+            por_dni.setdefault(paciente.dni, []).append(paciente)
+        return {p.id: p for p in pacientes}, por_dni
+
+    @staticmethod
+    def _cargar_practicas(session, filas: List[Dict[str, Any]]):
+        ids = {pid for f in filas for pid, _, _ in f['practicas'] if pid is not None}
+        codigos = {codigo for f in filas for _, codigo, _ in f['practicas'] if codigo is not None}
+        if not ids and not codigos:
+            return {}, {}
+        # Compatibilidad legacy (como CatalogoPracticas): prácticas "particulares"
+        # guardadas como OBRA_SOCIAL apuntando a la obra social PARTICULAR.
+        es_particular_legacy = Practica.obra_social_id.in_(
+            select(ObraSocial.id).where(ObraSocial.nombre.ilike('%PARTICULAR%'))
+        )
+        filas_practicas = session.execute(
+            select(Practica, es_particular_legacy)
+            .where(or_(Practica.id.in_(ids), Practica.codigo.in_(codigos)))
+        ).all()
+        por_codigo: Dict[Tuple[str, Optional[int]], Practica] = {}
+        for practica, particular_legacy in filas_practicas:
+            if practica.proveedor_tipo != 'OBRA_SOCIAL':
+                proveedores = [None]
+            elif particular_legacy:
+                proveedores = [None, practica.obra_social_id]
+            else:
+                proveedores = [practica.obra_social_id]
+            for proveedor in proveedores:
+                clave = (practica.codigo, proveedor)
+                # Ante códigos repetidos (bajas viejas), gana la práctica activa
+                if clave not in por_codigo or por_codigo[clave].fecha_baja is not None:
+                    por_codigo[clave] = practica
+        return {practica.id: practica for practica, _ in filas_practicas}, por_codigo
+
+    @staticmethod
+    def _resolver_paciente(datos, pacientes_por_id, pacientes_por_dni) -> Paciente:
+        if datos['paciente_id'] is not None:
+            paciente = pacientes_por_id.get(datos['paciente_id'])
+            if paciente is None:
+                raise _FilaInvalida(f"paciente no encontrado (ID: {datos['paciente_id']})")
+            return paciente
+        candidatos = pacientes_por_dni.get(datos['dni'], [])
+        if not candidatos:
+            raise _FilaInvalida(f"no hay un paciente con DNI {datos['dni']}")
+        if len(candidatos) > 1:
+            raise _FilaInvalida(f"hay más de un paciente con DNI {datos['dni']}; usar paciente_id")
+        return candidatos[0]
+
+    @staticmethod
+    def _resolver_practicas(practicas, paciente, practicas_por_id, practicas_por_codigo) -> List[Tuple[Practica, int]]:
+        items = []
+        for practica_id, codigo, cantidad in practicas:
+            if practica_id is not None:
+                practica = practicas_por_id.get(practica_id)
+                if practica is None:
+                    raise _FilaInvalida(f'práctica no encontrada (ID: {practica_id})')
+            else:
+                practica = practicas_por_codigo.get((codigo, paciente.obra_social_id))
+                if practica is None:
+                    proveedor = 'su obra social' if paciente.obra_social_id else 'particulares'
+                    raise _FilaInvalida(f'no hay una práctica con código {codigo} para {proveedor}')
+            if practica.fecha_baja is not None:
+                raise _FilaInvalida(f'la práctica {practica.codigo} está dada de baja')
+            items.append((practica, cantidad))
+        return items
@@ -5,6 +5,7 @@ Solo permite borrado físico de prestaciones que aún no fueron autorizadas.
 
 from app.database.session import DatabaseSession
 from app.models import Prestacion
+from app.services.paciente.ultima_prestacion_service import UltimaPrestacionService
 from app.services.common import (
     PrestacionNoEncontradaError,
     EstadoPrestacionInvalidoError,
@@ -38,5 +39,7 @@ class EliminarPrestacionService:
         if prestacion.estado != 'borrador':
             raise EstadoPrestacionInvalidoError(prestacion.estado, 'eliminar')
 
+        paciente_id = prestacion.paciente_id
         session.delete(prestacion)
+        UltimaPrestacionService.recalcular(session, paciente_id)
         session.commit()
@@ -6,12 +6,16 @@ Responsabilidades:
 - Obtener prestación específica
 - Filtrar por descripción, monto, fecha
 - Paginación
+- Perfil de carga (eager loading) para la ficha de una prestación
+- Prestaciones con saldo pendiente de cobro
 """
 
 from typing import List, Dict, Any, Optional
 from datetime import date
+from sqlalchemy.orm import joinedload, selectinload
 from app.database.session import DatabaseSession
-from app.models import Prestacion, Paciente
+from app.models import Prestacion, Paciente, PrestacionPractica
+from app.services.prestacion.saldo_prestacion_service import ESTADOS_COBRABLES, TOLERANCIA
 
 
 class ListarPrestacionesService:
@@ -130,6 +134,59 @@ class ListarPrestacionesService:
             raise PrestacionNoEncontradaError(prestacion_id)
         return prestacion
     
+    @staticmethod
+    def listar_con_saldo_pendiente(paciente_id: Optional[int] = None) -> List[Prestacion]:
+        """
+        Prestaciones autorizadas o realizadas que todavía tienen saldo a cobrar.
+
+        Filtra por la columna indexada saldo_pendiente (ver SaldoPrestacionService),
+        sin sumar cobros. Ordena por saldo descendente.
+        """
+        query = Prestacion.query.options(joinedload(Prestacion.paciente)).filter(
+            Prestacion.saldo_pendiente > TOLERANCIA,
+            Prestacion.estado.in_(ESTADOS_COBRABLES),
+        )
+        if paciente_id:
+            query = query.filter(Prestacion.paciente_id == paciente_id)
+        return query.order_by(Prestacion.saldo_pendiente.desc(), Prestacion.fecha.desc()).all()
+
+    @staticmethod
+    def opciones_detalle() -> tuple:
+        """
+        Opciones de carga para mostrar, editar o eliminar una prestación.
+
+        La ficha recorre paciente, prácticas (con su Practica), cobros y
+        auditoría; sin estas opciones cada relación es un SELECT lazy, y uno
+        por ítem para la práctica. Con ellas son 4 consultas fijas:
+        prestación + paciente + obra social (JOIN), ítems + prácticas (JOIN),
+        cobros y auditoría (selectin). El cascade del borrado también usa
+        estas colecciones ya cargadas.
+        """
+        return (
+            joinedload(Prestacion.paciente).joinedload(Paciente.obra_social),
+            selectinload(Prestacion.practicas_assoc).joinedload(PrestacionPractica.practica),
+            selectinload(Prestacion.cobros),
+            selectinload(Prestacion.audits),
+        )
+
+    @staticmethod
+    def obtener_detalle(prestacion_id: int) -> Prestacion:
+        """
+        Obtiene una prestación con el perfil de carga de opciones_detalle().
+
+        Raises:
+            PrestacionNoEncontradaError: Si no existe
+        """
+        from app.services.common import PrestacionNoEncontradaError
+
+        session = DatabaseSession.get_instance().session
+        prestacion = session.query(Prestacion).options(
+            *ListarPrestacionesService.opciones_detalle()
+        ).filter(Prestacion.id == prestacion_id).first()
+        if not prestacion:
+            raise PrestacionNoEncontradaError(prestacion_id)
+        return prestacion
+
     @staticmethod
     def listar_recientes_paciente(paciente_id: int, limite: int = 5) -> List[Prestacion]:
         """
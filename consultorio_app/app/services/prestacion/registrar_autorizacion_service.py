@@ -10,6 +10,7 @@ from app.services.common import (
     OdontoAppError,
     EstadoPrestacionInvalidoError,
 )
+from app.services.prestacion.saldo_prestacion_service import SaldoPrestacionService
 
 
 class RegistrarAutorizacionPrestacionService:
@@ -79,6 +80,7 @@ class RegistrarAutorizacionPrestacionService:
         
         # Cambiar estado a 'autorizada'
         prestacion.estado = 'autorizada'
+        SaldoPrestacionService.recalcular(session, [prestacion.id])
         
         session.commit()
         return prestacion
@@ -7,6 +7,7 @@ from typing import Dict, Any
 from app.database.session import DatabaseSession
 from app.models import Prestacion, PrestacionCobro
 from app.services.common import OdontoAppError
+from app.services.prestacion.saldo_prestacion_service import SaldoPrestacionService
 
 
 class RegistrarCobroPrestacionService:
@@ -65,5 +66,6 @@ class RegistrarCobroPrestacionService:
         )
         
         session.add(cobro)
+        SaldoPrestacionService.recalcular(session, [prestacion_id])
         session.commit()
         return cobro
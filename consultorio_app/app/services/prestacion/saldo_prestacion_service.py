@@ -0,0 +1,124 @@
+"""
+SaldoPrestacionService: mantiene Prestacion.total_cobrado y saldo_pendiente.
+
+- total_cobrado = SUM(PrestacionCobro.monto)
+- saldo_pendiente = importe_afiliado_autorizado + importe_coseguro_autorizado
+  + plus (ítems es_plus no anulados: monto_unitario * cantidad) - total_cobrado
+
+Es el mismo "Pendiente de Cobro" de la ficha de la prestación, guardado en
+la fila para que finanzas y los listados de saldos no sumen cobros en cada
+consulta (saldo_pendiente está indexado).
+
+Los services que registran cobros, autorizan, crean o editan prestaciones
+llaman a recalcular() después de escribir, dentro de su misma transacción
+(no hace commit): un único UPDATE que recalcula ambas columnas desde
+cobros e ítems, así el saldo nunca queda a medio actualizar.
+
+verificar()/reconstruir() revisan o rearman todas las filas
+(tools/rebuild_saldos_prestaciones.py).
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select, update
+
+from app.database.session import DatabaseSession
+from app.models import Practica, Prestacion, PrestacionCobro, PrestacionPractica
+
+TOLERANCIA = 0.005
+ESTADOS_COBRABLES = ('autorizada', 'realizada')
+
+
+class SaldoPrestacionService:
+    """Caso de uso: mantener los saldos desnormalizados de las prestaciones."""
+
+    @staticmethod
+    def expresiones():
+        """(total_cobrado, saldo_pendiente) calculados desde cobros e ítems (subconsultas correlacionadas)."""
+        cobrado = (
+            select(func.coalesce(func.sum(PrestacionCobro.monto), 0.0))
+            .where(PrestacionCobro.prestacion_id == Prestacion.id)
+            .correlate(Prestacion)
+            .scalar_subquery()
+        )
+        plus = (
+            select(func.coalesce(
+                func.sum(func.coalesce(PrestacionPractica.monto_unitario, 0.0) * PrestacionPractica.cantidad),
+                0.0,
+            ))
+            .join(Practica, Practica.id == PrestacionPractica.practica_id)
+            .where(
+                PrestacionPractica.prestacion_id == Prestacion.id,
+                Practica.es_plus.is_(True),
+                PrestacionPractica.fecha_anulacion.is_(None),
+            )
+            .correlate(Prestacion)
+            .scalar_subquery()
+        )
+        saldo = (
+            func.coalesce(Prestacion.importe_afiliado_autorizado, 0.0)
+            + func.coalesce(Prestacion.importe_coseguro_autorizado, 0.0)
+            + plus
+            - cobrado
+        )
+        return cobrado, saldo
+
+    @staticmethod
+    def recalcular(session, prestacion_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recalcula los saldos de las prestaciones indicadas (todas si es None).
+
+        Hace flush antes, para incluir cobros/ítems pendientes de la sesión.
+
+        Returns:
+            Cantidad de filas actualizadas
+        """
+        session.flush()
+        cobrado, saldo = SaldoPrestacionService.expresiones()
+        stmt = update(Prestacion).values(total_cobrado=cobrado, saldo_pendiente=saldo)
+        if prestacion_ids is not None:
+            ids = list(prestacion_ids)
+            if not ids:
+                return 0
+            stmt = stmt.where(Prestacion.id.in_(ids))
+        # 'fetch': las expresiones no se pueden evaluar en Python; expira los
+        # atributos de las prestaciones cargadas para que se relean.
+        return session.execute(stmt, execution_options={'synchronize_session': 'fetch'}).rowcount
+
+    @staticmethod
+    def verificar() -> List[Dict[str, float]]:
+        """
+        Prestaciones cuyos saldos guardados no coinciden con cobros e ítems.
+
+        Returns:
+            [{'id', 'total_cobrado', 'total_cobrado_real', 'saldo_pendiente', 'saldo_pendiente_real'}]
+        """
+        session = DatabaseSession.get_instance().session
+        cobrado, saldo = SaldoPrestacionService.expresiones()
+        filas = session.execute(
+            select(
+                Prestacion.id,
+                Prestacion.total_cobrado,
+                cobrado.label('total_cobrado_real'),
+                Prestacion.saldo_pendiente,
+                saldo.label('saldo_pendiente_real'),
+            ).order_by(Prestacion.id)
+        )
+        return [
+            dict(fila._mapping)
+            for fila in filas
+            if abs((fila.total_cobrado or 0) - fila.total_cobrado_real) > TOLERANCIA
+            or abs((fila.saldo_pendiente or 0) - fila.saldo_pendiente_real) > TOLERANCIA
+        ]
+
+    @staticmethod
+    def reconstruir() -> int:
+        """Recalcula los saldos de todas las prestaciones y hace commit."""
+        session = DatabaseSession.get_instance().session
+        try:
+            actualizadas = SaldoPrestacionService.recalcular(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return actualizadas
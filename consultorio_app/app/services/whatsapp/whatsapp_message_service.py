@@ -9,7 +9,6 @@ Responsabilidades:
 
 import os
 import logging
-import requests
 from typing import Tuple, Optional
 from datetime import datetime
 
@@ -80,6 +79,9 @@ class WhatsAppMessageService:
             logger.warning(f"Invalid phone number format: {phone_number}")
             return False, "Invalid phone number format (use E.164: 34612345678)"
         
+        # Import diferido: requests suma ~90 ms al arranque y solo se usa al enviar
+        import requests
+
         url = f"{WhatsAppMessageService.WHATSAPP_API_BASE_URL}/{phone_id}/messages"
         
         headers = {
@@ -210,6 +212,8 @@ class WhatsAppMessageService:
             logger.warning(f"Invalid phone number format: {phone_number}")
             return False, "Invalid phone number format (use E.164: 34612345678)"
 
+        import requests
+
         url = f"{WhatsAppMessageService.WHATSAPP_API_BASE_URL}/{phone_id}/messages"
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -4,6 +4,7 @@ Punto de entrada principal para el Sistema de Gestión de Consultorio Odontológ
 Ejecuta el servidor web Flask para la aplicación.
 """
 
+import hashlib
 import os
 import sys
 import webbrowser
@@ -21,7 +22,7 @@ from app import create_app
 from app.config import SettingsLoader
 from app.database import db
 from app.models import *  # Importar todos los modelos para que SQLAlchemy los reconozca
-from sqlalchemy import text
+from sqlalchemy import delete, exists, insert, or_, select
 
 # Importador de localidades (Salta) desde Georef
 try:
@@ -30,52 +31,90 @@ except Exception:
     import_georef_salta = None
 
 
-def init_default_data():
-    """Inicializar datos por defecto en la BD (estados, localidades, obras sociales)."""
-    # Estados predefinidos para turnos (normalizados)
-    estados_predefinidos = ['Pendiente', 'Confirmado', 'Atendido', 'NoAtendido', 'Cancelado']
-    for nombre in estados_predefinidos:
-        if not Estado.query.filter_by(nombre=nombre).first():
-            estado = Estado(nombre=nombre)
-            db.session.add(estado)
-    
-    # Localidades por defecto (se suman capitales de provincias y algunas del AMBA
-    # + placeholders para complementar el import de Salta). El script de Georef
-    # ya puede haber insertado varias; aquí solo aseguramos que existan las mínimas
-    # para operar en caso de reinicio limpio.
-    provincias_capitales = [
-        'Buenos Aires', 'Ciudad Autónoma de Buenos Aires', 'Catamarca', 'Chaco', 'Chubut',
-        'Córdoba', 'Corrientes', 'Entre Ríos', 'Formosa', 'Jujuy', 'La Pampa', 'La Rioja',
-        'Mendoza', 'Misiones', 'Neuquén', 'Río Negro', 'Salta', 'San Juan', 'San Luis',
-        'Santa Cruz', 'Santa Fe', 'Santiago del Estero', 'Tierra del Fuego', 'Tucumán'
-    ]
+# Datos por defecto (estados, localidades, obras sociales)
+# Estados predefinidos para turnos (normalizados)
+ESTADOS_PREDEFINIDOS = ['Pendiente', 'Confirmado', 'Atendido', 'NoAtendido', 'Cancelado']
 
-    for nombre in provincias_capitales:
-        if not Localidad.query.filter_by(nombre=nombre).first():
-            db.session.add(Localidad(nombre=nombre))
-    
-    # Obras sociales por defecto (solo las 3 operativas)
-    obras_operativas = ['PARTICULAR', 'IPSS', 'SANCOR SALUD']
-    for nombre in obras_operativas:
-        if not ObraSocial.query.filter_by(nombre=nombre).first():
-            db.session.add(ObraSocial(nombre=nombre))
+# Localidades por defecto (se suman capitales de provincias y algunas del AMBA
+# + placeholders para complementar el import de Salta). El script de Georef
+# ya puede haber insertado varias; aquí solo aseguramos que existan las mínimas
+# para operar en caso de reinicio limpio.
+PROVINCIAS_CAPITALES = [
+    'Buenos Aires', 'Ciudad Autónoma de Buenos Aires', 'Catamarca', 'Chaco', 'Chubut',
+    'Córdoba', 'Corrientes', 'Entre Ríos', 'Formosa', 'Jujuy', 'La Pampa', 'La Rioja',
+    'Mendoza', 'Misiones', 'Neuquén', 'Río Negro', 'Salta', 'San Juan', 'San Luis',
+    'Santa Cruz', 'Santa Fe', 'Santiago del Estero', 'Tierra del Fuego', 'Tucumán'
+]
+
+# Obras sociales por defecto (solo las 3 operativas)
+OBRAS_OPERATIVAS = ['PARTICULAR', 'IPSS', 'SANCOR SALUD']
+
+# Clave en app_metadata con la huella de los datos por defecto ya cargados
+SEED_VERSION_KEY = 'seed_version'
+
+
+def _seed_version() -> str:
+    """Huella de los datos por defecto: cambia sola si se editan las listas de arriba."""
+    contenido = '|'.join([
+        ','.join(ESTADOS_PREDEFINIDOS),
+        ','.join(PROVINCIAS_CAPITALES),
+        ','.join(OBRAS_OPERATIVAS),
+    ])
+    return hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:16]
+
+
+def _insertar_faltantes(model, nombres) -> int:
+    """Un SELECT para los nombres existentes y un INSERT masivo de los que faltan."""
+    existentes = set(
+        db.session.execute(select(model.nombre).where(model.nombre.in_(nombres))).scalars()
+    )
+    faltantes = [{'nombre': nombre} for nombre in nombres if nombre not in existentes]
+    if faltantes:
+        db.session.execute(insert(model), faltantes)
+    return len(faltantes)
+
+
+def init_default_data(force: bool = False):
+    """Inicializar datos por defecto en la BD (estados, localidades, obras sociales).
+
+    Si la versión registrada en app_metadata coincide con la actual, el paso
+    completo se saltea (una sola consulta). Usar force=True para re-verificar.
+    """
+    version = _seed_version()
+    if not force and AppMetadata.obtener(SEED_VERSION_KEY) == version:
+        print("[SKIP] Datos por defecto ya inicializados")
+        return
+
+    creados = (
+        _insertar_faltantes(Estado, ESTADOS_PREDEFINIDOS)
+        + _insertar_faltantes(Localidad, PROVINCIAS_CAPITALES)
+        + _insertar_faltantes(ObraSocial, OBRAS_OPERATIVAS)
+    )
     
     # Limpiar obras sociales no usadas (si no tienen pacientes ni prácticas asociadas)
-    otras_obras = ObraSocial.query.filter(~ObraSocial.nombre.in_(obras_operativas)).all()
-    for os_extra in otras_obras:
-        tiene_pacientes = bool(os_extra.pacientes)
-        tiene_practicas = bool(os_extra.practicas)
-        if not tiene_pacientes and not tiene_practicas:
-            db.session.delete(os_extra)
-        else:
-            print(f"[WARN] Obra social extra conservada por referencias: {os_extra.nombre}")
+    es_extra = ~ObraSocial.nombre.in_(OBRAS_OPERATIVAS)
+    tiene_pacientes = exists().where(Paciente.obra_social_id == ObraSocial.id)
+    tiene_practicas = exists().where(Practica.obra_social_id == ObraSocial.id)
+
+    conservadas = db.session.execute(
+        select(ObraSocial.nombre).where(es_extra, or_(tiene_pacientes, tiene_practicas))
+    ).scalars()
+    for nombre in conservadas:
+        print(f"[WARN] Obra social extra conservada por referencias: {nombre}")
+
+    db.session.execute(
+        delete(ObraSocial)
+        .where(es_extra, ~tiene_pacientes, ~tiene_practicas)
+        .execution_options(synchronize_session=False)
+    )
 
     # NOTA: El import de Georef se ejecuta AHORA solo bajo demanda explícita
     # Anteriormente causaba SQLite database locked errors por nested sessions
     # Para importar localidades de Salta: python tools/import_georef_salta.py
     
+    AppMetadata.guardar(SEED_VERSION_KEY, version)
     db.session.commit()
-    print("[OK] Datos por defecto inicializados")
+    print(f"[OK] Datos por defecto inicializados ({creados} registros nuevos)")
     print("[INFO] Para importar localidades de Salta: python tools/import_georef_salta.py")
 
 
@@ -142,10 +181,9 @@ def reset_database_with_basics():
     db.create_all()
     print("[OK] Tablas creadas")
 
-    # Ejecutar migraciones estructurales (columnas adicionales, tablas auxiliares)
-    # Solo si se solicita explícitamente con FLASK_RUN_MIGRATIONS
-    if os.environ.get('FLASK_RUN_MIGRATIONS', '').lower() in ('1', 'true', 'yes'):
-        run_migrations_sqlite()
+    # Registrar las migraciones estructurales en schema_version (sobre un esquema
+    # recién creado son no-ops, salvo ajustes que create_all no contempla)
+    run_migrations_sqlite()
 
     # Semillas indispensables
     init_default_data()
@@ -153,464 +191,60 @@ def reset_database_with_basics():
     print("[OK] Datos básicos cargados (estados, localidades, obras sociales, usuarios)")
 
 def run_migrations_sqlite():
-    """Execute DB migrations to align schema with Prestaciones and nro_afiliado.
-    SQLite doesn't support renaming FKs directly; perform safe table rebuilds.
-    """
-    # 1) Rename table 'operaciones' -> 'prestaciones'
-    # If prestaciones already exists, skip
-    existing_tables = db.session.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
-    table_names = {row[0] for row in existing_tables}
-
-    if 'operaciones' in table_names and 'prestaciones' not in table_names:
-        print("[TOOLS] Migrando tabla operaciones -> prestaciones...")
-        db.session.execute(text("ALTER TABLE operaciones RENAME TO prestaciones"))
-        db.session.commit()
+    """Aplica las migraciones de esquema pendientes (ver app/database/migrations.py).
 
-    # 1b) Crear tabla conversations si no existe (para WhatsApp conversation store)
-    if 'conversations' not in table_names:
-        print("[TOOLS] Creando tabla conversations...")
-        db.session.execute(text(
-            """
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                channel_user_id STRING NOT NULL UNIQUE,
-                paso_actual STRING NOT NULL,
-                paciente_id INTEGER,
-                dni_propuesto STRING,
-                nombre_tmp STRING,
-                apellido_tmp STRING,
-                telefono_tmp STRING,
-                fecha_candidate DATE,
-                hora_candidate TIME,
-                duracion_candidate INTEGER,
-                detalle STRING,
-                expira_en DATETIME,
-                ultima_interaccion_ts DATETIME,
-                intentos_actuales INTEGER DEFAULT 0,
-                confirmed BOOLEAN DEFAULT 0,
-                created_at DATETIME,
-                updated_at DATETIME,
-                FOREIGN KEY(paciente_id) REFERENCES pacientes(id)
-            )
-            """
-        ))
-        db.session.commit()
-
-    # 2) Update Turnos: operacion_id -> prestacion_id
-    # SQLite requires table rebuild to rename columns
-    turnos_cols = db.session.execute(text("PRAGMA table_info('turnos')")).fetchall()
-    turnos_col_names = {c[1] for c in turnos_cols}
-    if 'operacion_id' in turnos_col_names and 'prestacion_id' not in turnos_col_names:
-        print("[DB] Migrando columna turnos.operacion_id -> prestacion_id...")
-        db.session.execute(text("BEGIN TRANSACTION"))
-        db.session.execute(text(
-            "CREATE TABLE IF NOT EXISTS turnos_tmp (\n"
-            "    id INTEGER PRIMARY KEY,\n"
-            "    paciente_id INTEGER NOT NULL,\n"
-            "    fecha DATE NOT NULL,\n"
-            "    hora TIME NOT NULL,\n"
-            "    detalle STRING,\n"
-            "    estado STRING,\n"
-            "    prestacion_id INTEGER,\n"
-            "    FOREIGN KEY(paciente_id) REFERENCES pacientes(id),\n"
-            "    FOREIGN KEY(prestacion_id) REFERENCES prestaciones(id)\n"
-            ")"
-        ))
-        db.session.execute(text(
-            "INSERT INTO turnos_tmp (id, paciente_id, fecha, hora, detalle, estado, prestacion_id)\n"
-            "SELECT id, paciente_id, fecha, hora, detalle, estado, operacion_id FROM turnos"
-        ))
-        db.session.execute(text("DROP TABLE turnos"))
-        db.session.execute(text("ALTER TABLE turnos_tmp RENAME TO turnos"))
-        db.session.execute(text("COMMIT"))
-        print("[OK] turnos migrados")
-
-    # 3) Update Pacientes: carnet -> nro_afiliado
-    pacientes_cols = db.session.execute(text("PRAGMA table_info('pacientes')")).fetchall()
-    pacientes_col_names = {c[1] for c in pacientes_cols}
-    if 'carnet' in pacientes_col_names and 'nro_afiliado' not in pacientes_col_names:
-        print("[TOOLS] Migrando columna pacientes.carnet -> nro_afiliado...")
-        db.session.execute(text("BEGIN TRANSACTION"))
-        # Build new table with same structure but renamed column
-        db.session.execute(text(
-            "CREATE TABLE IF NOT EXISTS pacientes_tmp (\n"
-            "    id INTEGER PRIMARY KEY,\n"
-            "    nombre STRING NOT NULL,\n"
-            "    apellido STRING NOT NULL,\n"
-            "    dni STRING NOT NULL,\n"
-            "    fecha_nac DATE NOT NULL,\n"
-            "    telefono STRING,\n"
-            "    direccion STRING,\n"
-            "    localidad_id INTEGER,\n"
-            "    obra_social_id INTEGER,\n"
-            "    nro_afiliado STRING,\n"
-            "    titular STRING,\n"
-            "    parentesco STRING,\n"
-            "    lugar_trabajo STRING,\n"
-            "    barrio STRING,\n"
-            "    FOREIGN KEY(localidad_id) REFERENCES localidades(id),\n"
-            "    FOREIGN KEY(obra_social_id) REFERENCES obras_sociales(id)\n"
-            ")"
-        ))
-        db.session.execute(text(
-            "INSERT INTO pacientes_tmp (id, nombre, apellido, dni, fecha_nac, telefono, direccion, localidad_id, obra_social_id, nro_afiliado, titular, parentesco, lugar_trabajo, barrio)\n"
-            "SELECT id, nombre, apellido, dni, fecha_nac, telefono, direccion, localidad_id, obra_social_id, carnet, titular, parentesco, lugar_trabajo, barrio FROM pacientes"
-        ))
-        db.session.execute(text("DROP TABLE pacientes"))
-        db.session.execute(text("ALTER TABLE pacientes_tmp RENAME TO pacientes"))
-        db.session.execute(text("COMMIT"))
-        print("[OK] pacientes migrados")
-
-    # 4) Add monto_unitario to practicas if missing
-    if 'practicas' in table_names:
-        practicas_cols = db.session.execute(text("PRAGMA table_info('practicas')")).fetchall()
-        practicas_col_names = {c[1] for c in practicas_cols}
-        if 'monto_unitario' not in practicas_col_names:
-            print("[TOOLS] Agregando columna monto_unitario a practicas...")
-            db.session.execute(text("ALTER TABLE practicas ADD COLUMN monto_unitario REAL NOT NULL DEFAULT 0.0"))
-            db.session.commit()
-            print("[OK] practicas.monto_unitario agregada")
-        
-        # 4b) Add es_plus to practicas if missing
-        if 'es_plus' not in practicas_col_names:
-            print("[TOOLS] Agregando columna es_plus a practicas...")
-            db.session.execute(text("ALTER TABLE practicas ADD COLUMN es_plus BOOLEAN NOT NULL DEFAULT 0"))
-            db.session.commit()
-            print("[OK] practicas.es_plus agregada")
-
-    # 5) Remove codigo_id from prestaciones if exists
-    if 'prestaciones' in table_names:
-        prestaciones_cols = db.session.execute(text("PRAGMA table_info('prestaciones')")).fetchall()
-        prestaciones_col_names = {c[1] for c in prestaciones_cols}
-        if 'codigo_id' in prestaciones_col_names:
-            print("[TOOLS] Eliminando columna codigo_id de prestaciones...")
-            db.session.execute(text("BEGIN TRANSACTION"))
-            
-            col_defs = []
-            for col in prestaciones_cols:
-                col_name = col[1]
-                if col_name != 'codigo_id':
-                    col_type = col[2]
-                    col_defs.append(f"{col_name} {col_type}")
-            
-            db.session.execute(text(
-                f"CREATE TABLE prestaciones_tmp ({', '.join(col_defs)})"
-            ))
-            
-            col_names = [c[1] for c in prestaciones_cols if c[1] != 'codigo_id']
-            db.session.execute(text(
-                f"INSERT INTO prestaciones_tmp ({', '.join(col_names)}) "
-                f"SELECT {', '.join(col_names)} FROM prestaciones"
-            ))
-            
-            db.session.execute(text("DROP TABLE prestaciones"))
-            db.session.execute(text("ALTER TABLE prestaciones_tmp RENAME TO prestaciones"))
-            db.session.execute(text("COMMIT"))
-            print("[OK] prestaciones.codigo_id eliminada")
-
-    # 6) Rebuild prestaciones table to ensure AUTOINCREMENT is configured
-    if 'prestaciones' in table_names:
-        print("[TOOLS] Verificando AUTOINCREMENT en prestaciones...")
-        prestaciones_sql = db.session.execute(text(
-            "SELECT sql FROM sqlite_master WHERE type='table' AND name='prestaciones'"
-        )).fetchone()
-        
-        if prestaciones_sql and 'AUTOINCREMENT' not in (prestaciones_sql[0] or ''):
-            print("[TOOLS] Reconstruyendo tabla prestaciones con AUTOINCREMENT...")
-            db.session.execute(text("BEGIN TRANSACTION"))
-            
-            db.session.execute(text("""
-                CREATE TABLE prestaciones_tmp (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    paciente_id INTEGER NOT NULL,
-                    descripcion TEXT NOT NULL,
-                    monto REAL NOT NULL,
-                    fecha DATETIME NOT NULL,
-                    observaciones TEXT,
-                    FOREIGN KEY(paciente_id) REFERENCES pacientes(id)
-                )
-            """))
-            
-            db.session.execute(text("""
-                INSERT INTO prestaciones_tmp (id, paciente_id, descripcion, monto, fecha, observaciones)
-                SELECT id, paciente_id, descripcion, monto, fecha, observaciones FROM prestaciones
-            """))
-            
-            db.session.execute(text("DROP TABLE prestaciones"))
-            db.session.execute(text("ALTER TABLE prestaciones_tmp RENAME TO prestaciones"))
-            db.session.execute(text("COMMIT"))
-            print("[OK] prestaciones AUTOINCREMENT configurada")
-    
-    # 7) Agregar columna duracion a tabla turnos si no existe
-    if 'turnos' in table_names:
-        print("[TOOLS] Verificando columna duracion en turnos...")
-        turnos_cols = db.session.execute(text(
-            "PRAGMA table_info(turnos)"
-        )).fetchall()
-        
-        col_names = [c[1] for c in turnos_cols]
-        if 'duracion' not in col_names:
-            print("[TOOLS] Agregando columna duracion a turnos...")
-            try:
-                db.session.execute(text("ALTER TABLE turnos ADD COLUMN duracion INTEGER DEFAULT 30"))
-                db.session.commit()
-                print("[OK] Columna duracion agregada a turnos")
-            except Exception as e:
-                print(f"[ERROR] No se pudo agregar duracion: {e}")
-                db.session.rollback()
-
-    # 8) Agregar campos IPSS a prestaciones
-    if 'prestaciones' in table_names:
-        print("[TOOLS] Verificando campos IPSS en prestaciones...")
-        prestaciones_cols = db.session.execute(text("PRAGMA table_info('prestaciones')")).fetchall()
-        prestaciones_col_names = {c[1] for c in prestaciones_cols}
-        
-        campos_ipss = {
-            'estado': "VARCHAR(20) NOT NULL DEFAULT 'borrador'",
-            'fecha_solicitud': "DATE",
-            'fecha_autorizacion': "DATE",
-            'fecha_realizacion': "DATE",
-            'importe_afiliado_autorizado': "FLOAT",
-            'importe_coseguro_autorizado': "FLOAT",
-            'importe_profesional_autorizado': "FLOAT",
-            'autorizacion_adjunta_path': "VARCHAR(255)",
-            'observaciones_autorizacion': "TEXT"
-        }
-        
-        for campo, tipo in campos_ipss.items():
-            if campo not in prestaciones_col_names:
-                print(f"[TOOLS] Agregando columna {campo} a prestaciones...")
-                try:
-                    db.session.execute(text(f"ALTER TABLE prestaciones ADD COLUMN {campo} {tipo}"))
-                    db.session.commit()
-                    print(f"[OK] Columna {campo} agregada")
-                except Exception as e:
-                    print(f"[ERROR] No se pudo agregar {campo}: {e}")
-                    db.session.rollback()
-
-    # 9) Agregar campos IPSS a prestacion_practica
-    if 'prestacion_practica' in table_names:
-        print("[TOOLS] Verificando campos IPSS en prestacion_practica...")
-        pp_cols = db.session.execute(text("PRAGMA table_info('prestacion_practica')")).fetchall()
-        pp_col_names = {c[1] for c in pp_cols}
-        
-        campos_pp_ipss = {
-            'tipo_concepto': "VARCHAR(20) NOT NULL DEFAULT 'acto'",
-            'estado_item': "VARCHAR(20) NOT NULL DEFAULT 'pendiente'",
-            'monto_autorizado': "FLOAT",
-            'fecha_realizacion_item': "DATE",
-            'fecha_anulacion': "DATE",
-            'razon_anulacion': "VARCHAR(255)"
-        }
-        
-        for campo, tipo in campos_pp_ipss.items():
-            if campo not in pp_col_names:
-                print(f"[TOOLS] Agregando columna {campo} a prestacion_practica...")
-                try:
-                    db.session.execute(text(f"ALTER TABLE prestacion_practica ADD COLUMN {campo} {tipo}"))
-                    db.session.commit()
-                    print(f"[OK] Columna {campo} agregada")
-                except Exception as e:
-                    print(f"[ERROR] No se pudo agregar {campo}: {e}")
-                    db.session.rollback()
-
-    # 10) Agregar campos de baja lógica a practicas
-    if 'practicas' in table_names:
-        print("[TOOLS] Verificando campos de baja lógica en practicas...")
-        practicas_cols = db.session.execute(text("PRAGMA table_info('practicas')")).fetchall()
-        practicas_col_names = {c[1] for c in practicas_cols}
-        
-        campos_practicas = {
-            'activa': "BOOLEAN NOT NULL DEFAULT 1",
-            'fecha_baja': "DATE",
-            'razon_baja': "VARCHAR(255)"
-        }
-        
-        for campo, tipo in campos_practicas.items():
-            if campo not in practicas_col_names:
-                print(f"[TOOLS] Agregando columna {campo} a practicas...")
-                try:
-                    db.session.execute(text(f"ALTER TABLE practicas ADD COLUMN {campo} {tipo}"))
-                    db.session.commit()
-                    print(f"[OK] Columna {campo} agregada")
-                except Exception as e:
-                    print(f"[ERROR] No se pudo agregar {campo}: {e}")
-                    db.session.rollback()
-
-    # 11) Crear tabla prestacion_cobro si no existe
-    prestacion_cobro_exists = db.session.execute(text(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='prestacion_cobro'"
-    )).fetchone()
-    if not prestacion_cobro_exists:
-        print("[TOOLS] Creando tabla prestacion_cobro...")
-        try:
-            db.session.execute(text(
-                """
-                CREATE TABLE prestacion_cobro (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    prestacion_id INTEGER NOT NULL,
-                    fecha_cobro DATE NOT NULL,
-                    tipo_cobro VARCHAR(30) NOT NULL,
-                    monto FLOAT NOT NULL DEFAULT 0.0,
-                    razon VARCHAR(255),
-                    usuario_id INTEGER,
-                    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(prestacion_id) REFERENCES prestaciones(id),
-                    FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
-                )
-                """
-            ))
-            db.session.commit()
-            print("[OK] Tabla prestacion_cobro creada")
-        except Exception as e:
-            print(f"[ERROR] No se pudo crear prestacion_cobro: {e}")
-            db.session.rollback()
-
-    # 12) Crear tabla prestacion_audit si no existe
-    prestacion_audit_exists = db.session.execute(text(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='prestacion_audit'"
-    )).fetchone()
-    if not prestacion_audit_exists:
-        print("[TOOLS] Creando tabla prestacion_audit...")
-        try:
-            db.session.execute(text(
-                """
-                CREATE TABLE prestacion_audit (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    prestacion_id INTEGER NOT NULL,
-                    campo VARCHAR(50) NOT NULL,
-                    valor_anterior TEXT,
-                    valor_nuevo TEXT,
-                    fecha_cambio DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    razon VARCHAR(255),
-                    usuario_id INTEGER,
-                    FOREIGN KEY(prestacion_id) REFERENCES prestaciones(id),
-                    FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
-                )
-                """
-            ))
-            db.session.commit()
-            print("[OK] Tabla prestacion_audit creada")
-        except Exception as e:
-            print(f"[ERROR] No se pudo crear prestacion_audit: {e}")
-            db.session.rollback()
-
-    # 13) Crear tabla odontogramas si no existe
-    if 'odontogramas' not in table_names:
-        print("[TOOLS] Creando tabla odontogramas...")
-        db.session.execute(text(
-            """
-            CREATE TABLE odontogramas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                paciente_id INTEGER NOT NULL,
-                version_seq INTEGER NOT NULL DEFAULT 1,
-                es_actual BOOLEAN NOT NULL DEFAULT 1,
-                nota_general TEXT,
-                ultima_prestacion_registrada_en DATETIME,
-                creado_en DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
-                actualizado_en DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
-                UNIQUE(paciente_id, version_seq),
-                FOREIGN KEY(paciente_id) REFERENCES pacientes(id)
-            )
-            """
-        ))
-        db.session.commit()
-        print("[OK] Tabla odontogramas creada")
-
-    # 14) Crear tabla odontograma_caras si no existe
-    # Nota: usar PRAGMA table_info porque table_names se tomó al inicio
-    odontograma_caras_exists = db.session.execute(text(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='odontograma_caras'"
-    )).fetchone()
-    if not odontograma_caras_exists:
-        print("[TOOLS] Creando tabla odontograma_caras...")
-        db.session.execute(text(
-            """
-            CREATE TABLE odontograma_caras (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                odontograma_id INTEGER NOT NULL,
-                diente TEXT NOT NULL,
-                cara TEXT NOT NULL,
-                marca_codigo TEXT,
-                marca_texto TEXT,
-                comentario TEXT,
-                UNIQUE(odontograma_id, diente, cara),
-                FOREIGN KEY(odontograma_id) REFERENCES odontogramas(id)
-            )
-            """
-        ))
-        db.session.commit()
-        print("[OK] Tabla odontograma_caras creada")
+    Cada migración se aplica una sola vez y queda registrada en schema_version;
+    con el esquema al día el costo es una única consulta.
+    """
+    from app.database.migrations import MigrationRunner
 
-    # 15) Agregar columna estado_id a turnos si no existe y backfill desde nombre
-    turnos_cols = db.session.execute(text("PRAGMA table_info('turnos')")).fetchall()
-    turnos_col_names = {c[1] for c in turnos_cols}
-    if 'estado_id' not in turnos_col_names:
-        print("[TOOLS] Agregando columna estado_id a turnos...")
-        try:
-            db.session.execute(text("ALTER TABLE turnos ADD COLUMN estado_id INTEGER"))
-            db.session.commit()
-            print("[OK] Columna estado_id agregada")
-        except Exception as e:
-            print(f"[ERROR] No se pudo agregar estado_id a turnos: {e}")
-            db.session.rollback()
-
-    # Backfill siempre que haya estado_id y existan nombres
     try:
-        print("[TOOLS] Backfill de turnos.estado_id desde estados.nombre...")
-        db.session.execute(text(
-            "UPDATE turnos SET estado_id = (SELECT id FROM estados e WHERE e.nombre = turnos.estado) "
-            "WHERE estado IS NOT NULL AND (estado_id IS NULL OR estado_id = 0)"
-        ))
-        db.session.commit()
-        print("[OK] Backfill de estado_id completado")
+        aplicadas = MigrationRunner.run(db.engine)
     except Exception as e:
-        print(f"[ERROR] Backfill estado_id en turnos: {e}")
-        db.session.rollback()
-
-    # 16) Agregar columnas estado_anterior_id / estado_nuevo_id a cambios_estado y backfill
-    cambios_cols = db.session.execute(text("PRAGMA table_info('cambios_estado')")).fetchall()
-    cambios_col_names = {c[1] for c in cambios_cols}
-    need_commit = False
-    if 'estado_anterior_id' not in cambios_col_names:
-        print("[TOOLS] Agregando columna estado_anterior_id a cambios_estado...")
-        try:
-            db.session.execute(text("ALTER TABLE cambios_estado ADD COLUMN estado_anterior_id INTEGER"))
-            need_commit = True
-        except Exception as e:
-            print(f"[ERROR] No se pudo agregar estado_anterior_id: {e}")
-    if 'estado_nuevo_id' not in cambios_col_names:
-        print("[TOOLS] Agregando columna estado_nuevo_id a cambios_estado...")
-        try:
-            db.session.execute(text("ALTER TABLE cambios_estado ADD COLUMN estado_nuevo_id INTEGER"))
-            need_commit = True
-        except Exception as e:
-            print(f"[ERROR] No se pudo agregar estado_nuevo_id: {e}")
-    if need_commit:
-        try:
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
+        # La migración fallida se revirtió completa y se reintenta en el próximo
+        # arranque. No se sigue: los modelos esperan las columnas nuevas y el
+        # servidor fallaría en cada consulta.
+        print(f"[ERROR] Migraciones detenidas, se aborta el arranque: {e}")
+        raise
+    if aplicadas:
+        print(f"[OK] Esquema actualizado a la versión {MigrationRunner.latest_version()}")
 
-    # Backfill de cambios_estado
-    if ('estado_anterior_id' in db.session.execute(text("PRAGMA table_info('cambios_estado')")).fetchall()[0] or True):
-        try:
-            print("[TOOLS] Backfill de cambios_estado.*_id desde estados.nombre...")
-            # estado_nuevo_id
-            db.session.execute(text(
-                "UPDATE cambios_estado SET estado_nuevo_id = (SELECT id FROM estados e WHERE e.nombre = cambios_estado.estado_nuevo) "
-                "WHERE estado_nuevo IS NOT NULL AND (estado_nuevo_id IS NULL OR estado_nuevo_id = 0)"
-            ))
-            # estado_anterior_id
-            db.session.execute(text(
-                "UPDATE cambios_estado SET estado_anterior_id = (SELECT id FROM estados e WHERE e.nombre = cambios_estado.estado_anterior) "
-                "WHERE estado_anterior IS NOT NULL AND (estado_anterior_id IS NULL OR estado_anterior_id = 0)"
-            ))
-            db.session.commit()
-            print("[OK] Backfill de cambios_estado completado")
-        except Exception as e:
-            print(f"[ERROR] Backfill en cambios_estado: {e}")
-            db.session.rollback()
+
+def serve_production(app, host: str, port: int) -> bool:
+    """Sirve la app con waitress (servidor WSGI multi-hilo en Python puro).
+
+    Parámetros configurables en settings.ini, sección [server]:
+    - threads: hilos que atienden requests en paralelo
+    - connection_limit: conexiones simultáneas aceptadas
+    - channel_timeout: segundos de inactividad antes de cerrar una conexión
+
+    Returns:
+        bool: False si waitress no está instalado (el caller usa el servidor de desarrollo)
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        print("[WARN] waitress no instalado (pip install waitress). Usando servidor de desarrollo.")
+        return False
+
+    threads = max(1, SettingsLoader.get_int('server', 'threads', 8))
+    connection_limit = max(1, SettingsLoader.get_int('server', 'connection_limit', 100))
+    channel_timeout = max(1, SettingsLoader.get_int('server', 'channel_timeout', 120))
+
+    print(
+        f"[SERVER] Modo producción (waitress): threads={threads}, "
+        f"connection_limit={connection_limit}, channel_timeout={channel_timeout}s"
+    )
+    serve(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        connection_limit=connection_limit,
+        channel_timeout=channel_timeout,
+        ident='Florens',
+    )
+    return True
 
 
 def main():
@@ -628,7 +262,6 @@ def main():
         
         # === LÓGICA DE BASE DE DATOS ===
         reset_and_seed = os.environ.get('FLASK_RESET_AND_SEED', '').lower() in ('1', 'true', 'yes')
-        run_migrations = os.environ.get('FLASK_RUN_MIGRATIONS', '').lower() in ('1', 'true', 'yes')
         seed_defaults = os.environ.get('FLASK_SEED_DEFAULTS', '').lower() in ('1', 'true', 'yes')
         
         if reset_and_seed:
@@ -644,10 +277,9 @@ def main():
             print("[DB] MODO SEGURO: solo verificando/creando tablas (NO se borran datos)\n")
             db.create_all()
             
-            if run_migrations:
-                print("[DB] Ejecutando migraciones...")
-                run_migrations_sqlite()
-                print()
+            # Migraciones versionadas: con el esquema al día es una sola consulta
+            # (FLASK_RUN_MIGRATIONS ya no es necesario, se mantiene por compatibilidad)
+            run_migrations_sqlite()
             
             if seed_defaults:
                 print("[DB] Cargando datos por defecto...")
@@ -708,6 +340,12 @@ def main():
             # Pequeño delay para asegurar que el servidor esté levantado
             Timer(1.0, lambda: webbrowser.open_new(url)).start()
     
+    # Servidor: 'production' (waitress) salvo en debug, donde se necesita el reloader de Werkzeug
+    server_mode = (SettingsLoader.get('server', 'mode', 'development') or 'development').strip().lower()
+    if server_mode == 'production' and not debug:
+        if serve_production(app, host, port):
+            return
+    
     app.run(host=host, port=port, debug=debug, use_reloader=use_reloader)
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+"""
+Inicializador de tests.
+"""
+
+__all__ = []
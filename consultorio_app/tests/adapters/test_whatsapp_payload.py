@@ -0,0 +1,69 @@
+"""
+Tests del parseo único del webhook de WhatsApp y de la firma sobre bytes crudos.
+"""
+
+import hashlib
+import hmac
+import json
+
+from app.adapters.whatsapp.webhook_handler import (
+    WhatsAppPayloadParser,
+    WhatsAppWebhookHandler,
+    WhatsAppWebhookPayload,
+)
+
+
+class EchoConversationService:
+    """Responde con el mismo texto recibido."""
+
+    def handle_message(self, channel_user_id, text):
+        from app.services.conversacion import ConversationReply
+        return ConversationReply(message=f"Echo: {text}", step="test", done=False)
+
+
+def test_parse_bytes_returns_typed_payload():
+    """Debe parsear bytes crudos (UTF-8) una sola vez a un payload tipado."""
+    payload = {
+        "entry": [{"changes": [{"value": {"messages": [
+            {"from": "5493871234567", "type": "text", "text": {"body": "Año ñandú"}}
+        ]}}]}]
+    }
+    raw = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+    result = WhatsAppPayloadParser.parse(raw)
+    assert isinstance(result, WhatsAppWebhookPayload)
+    assert result.has_message is True
+    assert result.is_status_update is False
+    assert result.channel_user_id == "5493871234567"
+    assert result.text == "Año ñandú"
+
+
+def test_parse_status_update_has_no_message():
+    """Un update de estado no expone mensaje."""
+    raw = b'{"entry":[{"changes":[{"value":{"statuses":[{"status":"read"}]}}]}]}'
+
+    result = WhatsAppPayloadParser.parse(raw)
+    assert result.is_status_update is True
+    assert result.has_message is False
+
+
+def test_handle_webhook_raw_bytes_signature(monkeypatch):
+    """Debe validar la firma sobre los bytes crudos y exponer el payload parseado."""
+    monkeypatch.setenv("META_APP_SECRET", "app-secret")
+    handler = WhatsAppWebhookHandler("test-secret")
+    body = json.dumps({
+        "entry": [{"changes": [{"value": {"messages": [
+            {"from": "5493871234567", "type": "text", "text": {"body": "Hola áé"}}
+        ]}}]}]
+    }, ensure_ascii=False).encode('utf-8')
+    signature = "sha256=" + hmac.new(b"app-secret", body, hashlib.sha256).hexdigest()
+
+    response, status = handler.handle_webhook(body, signature, EchoConversationService())
+
+    assert status == 200
+    assert handler.last_payload.channel_user_id == "5493871234567"
+    assert handler.last_reply_message == "Echo: Hola áé"
+
+    response, status = handler.handle_webhook(body + b" ", signature, EchoConversationService())
+    assert status == 401
+    assert handler.last_payload is None
@@ -0,0 +1,94 @@
+"""Fixtures base para pytest."""
+
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.database import db
+from app.instrumentation import stop_tracking_lazy_loads, track_lazy_loads
+from app.services.practica.catalogo_practicas import invalidar_catalogo
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Crea una app Flask para tests con SQLite en memoria y sin scheduler."""
+    os.environ.setdefault("TESTING", "1")
+    os.environ.setdefault("DISABLE_SCHEDULER", "1")
+    os.environ.setdefault("FLASK_LOGIN_DISABLED", "1")  # se puede habilitar por test si se requiere
+
+    flask_app = create_app()
+    flask_app.config.update(
+        TESTING=True,
+        WTF_CSRF_ENABLED=False,
+    )
+
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """Cliente de pruebas de Flask."""
+    return app.test_client()
+
+
+@pytest.fixture(scope="function")
+def db_session(app):
+    """Sesión de DB aislada por test (rollback + cleanup)."""
+    with app.app_context():
+        try:
+            yield db.session
+            db.session.commit()
+        finally:
+            db.session.rollback()
+            # Limpiar todas las tablas para el siguiente test
+            for table in reversed(db.metadata.sorted_tables):
+                db.session.execute(table.delete())
+            db.session.commit()
+            invalidar_catalogo()
+
+
+@pytest.fixture(scope="function")
+def query_budget(app):
+    """
+    Presupuesto de consultas SQL para un bloque (típicamente un request).
+
+    Falla el test si el bloque ejecuta más de `max_queries` consultas, y
+    lanza NPlusOneError si una relación se carga lazy más de
+    `nplus1_threshold` veces (dentro o fuera de un request).
+
+    Uso:
+        def test_agenda(client, db_session, query_budget):
+            with query_budget(10):
+                client.get('/turnos')
+    """
+    @contextmanager
+    def _budget(max_queries, nplus1_threshold=3):
+        statements = []
+
+        def _contar(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        previo = (app.config.get('NPLUS1_MODE'), app.config.get('NPLUS1_THRESHOLD'))
+        app.config['NPLUS1_MODE'] = 'raise'
+        app.config['NPLUS1_THRESHOLD'] = nplus1_threshold
+        token = track_lazy_loads('raise', nplus1_threshold, 'query_budget')
+        event.listen(db.engine, 'before_cursor_execute', _contar)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', _contar)
+            stop_tracking_lazy_loads(token)
+            app.config['NPLUS1_MODE'], app.config['NPLUS1_THRESHOLD'] = previo
+
+        if len(statements) > max_queries:
+            detalle = "\n".join(f"  {i + 1}. {' '.join(sql.split())[:200]}" for i, sql in enumerate(statements))
+            pytest.fail(f"Se ejecutaron {len(statements)} consultas (presupuesto: {max_queries}):\n{detalle}")
+
+    return _budget
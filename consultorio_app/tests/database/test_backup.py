@@ -0,0 +1,136 @@
+import sqlite3
+
+import pytest
+
+from app.database import backup
+
+
+def _crear_base(path, filas=200):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE pacientes (id INTEGER PRIMARY KEY, nombre TEXT)")
+    conn.executemany("INSERT INTO pacientes (nombre) VALUES (?)", [(f"Paciente {i}",) for i in range(filas)])
+    conn.commit()
+    conn.close()
+
+
+def _contar(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM pacientes").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("compression, sufijo", [("none", ".db"), ("gzip", ".db.gz")])
+def test_create_backup_y_restore(tmp_path, compression, sufijo):
+    db_path = tmp_path / "consultorio.db"
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    _crear_base(db_path)
+
+    # Escritura pendiente en otra conexión: el backup igual debe ser consistente
+    escritor = sqlite3.connect(db_path)
+    escritor.execute("INSERT INTO pacientes (nombre) VALUES ('sin commit')")
+    try:
+        result = backup.create_backup(db_path, backup_dir, compression=compression, retention=5)
+    finally:
+        escritor.rollback()
+        escritor.close()
+
+    assert result.filename.endswith(sufijo)
+    # Incluye el manifiesto de páginas que acompaña a cada backup completo
+    assert result.bytes_written > result.path.stat().st_size > 0
+    assert [f.name for f in backup.backup_files(backup_dir)] == [result.filename]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM pacientes")
+    conn.commit()
+    conn.close()
+
+    backup.restore_backup(result.path, db_path)
+    assert _contar(db_path) == 200
+
+
+def test_retencion_borra_los_backups_mas_viejos(tmp_path):
+    db_path = tmp_path / "consultorio.db"
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    _crear_base(db_path, filas=5)
+    viejos = [backup_dir / f"consultorio_2024010{i}_000000.db" for i in range(1, 4)]
+    for path in viejos:
+        path.write_bytes(b"x")
+    (backup_dir / "consultorio_20240109_000000.db.gz.partial").write_bytes(b"x")
+
+    result = backup.create_backup(db_path, backup_dir, compression="gzip", retention=2)
+
+    nombres = [f.name for f in backup.backup_files(backup_dir)]
+    assert nombres == [result.filename, "consultorio_20240103_000000.db"]
+
+
+def _modificar(path, sql):
+    conn = sqlite3.connect(path)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def test_backup_diferencial_guarda_solo_paginas_cambiadas(tmp_path):
+    db_path = tmp_path / "consultorio.db"
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    _crear_base(db_path, filas=5000)
+
+    completo = backup.create_backup(db_path, backup_dir, compression="gzip", retention=5, mode="differential")
+    assert completo.kind == "full"  # sin manifiesto previo no hay base para diferenciar
+
+    _modificar(db_path, "UPDATE pacientes SET nombre = 'Modificado' WHERE id = 10")
+    diff = backup.create_backup(db_path, backup_dir, compression="gzip", retention=5, mode="differential")
+
+    assert diff.kind == "diff"
+    assert diff.base == completo.filename
+    assert diff.filename.endswith(".diff.gz")
+    assert 0 < diff.changed_pages < diff.pages / 10
+    assert diff.bytes_written < completo.bytes_written
+
+    # Reconstrucción punto en el tiempo y restauración de la cadena completo + diff
+    copia = tmp_path / "copia.db"
+    assert backup.reconstruct_backup(diff.path, copia) == [completo.filename, diff.filename]
+    conn = sqlite3.connect(copia)
+    assert conn.execute("SELECT nombre FROM pacientes WHERE id = 10").fetchone()[0] == "Modificado"
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    conn.close()
+
+    _modificar(db_path, "DELETE FROM pacientes")
+    assert backup.restore_backup(diff.path, db_path) == [completo.filename, diff.filename]
+    assert _contar(db_path) == 5000
+
+
+def test_diferencial_pasa_a_completo_si_cambia_mas_de_la_mitad(tmp_path):
+    db_path = tmp_path / "consultorio.db"
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    _crear_base(db_path, filas=500)
+    backup.create_backup(db_path, backup_dir, compression="gzip", retention=5, mode="differential")
+
+    _modificar(db_path, "UPDATE pacientes SET nombre = nombre || ' actualizado'")
+    result = backup.create_backup(db_path, backup_dir, compression="gzip", retention=5, mode="differential")
+
+    assert result.kind == "full"
+
+
+def test_retencion_borra_diferenciales_de_completos_eliminados(tmp_path):
+    db_path = tmp_path / "consultorio.db"
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    _crear_base(db_path, filas=5)
+    for nombre in ("consultorio_20240101_000000.db.gz", "consultorio_20240101_000000.db.gz.pages",
+                   "consultorio_20240102_000000.diff.gz", "consultorio_20240103_000000.db.gz"):
+        (backup_dir / nombre).write_bytes(b"x")
+
+    result = backup.create_backup(db_path, backup_dir, compression="gzip", retention=2, mode="full")
+
+    assert sorted(f.name for f in backup_dir.iterdir()) == sorted([
+        "consultorio_20240103_000000.db.gz",
+        result.filename,
+        result.filename + ".pages",
+    ])
@@ -0,0 +1,158 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.database import migrations
+from app.database.migrations import MigrationRunner
+
+
+def _crear_base_legacy(path, filas=25):
+    """Esquema previo a las migraciones: operaciones con codigo_id, carnet, operacion_id."""
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE estados (id INTEGER PRIMARY KEY, nombre VARCHAR(50) NOT NULL UNIQUE);
+        CREATE TABLE pacientes (
+            id INTEGER PRIMARY KEY, nombre STRING NOT NULL, apellido STRING NOT NULL,
+            dni STRING NOT NULL, fecha_nac DATE NOT NULL, carnet STRING
+        );
+        CREATE TABLE operaciones (
+            id INTEGER NOT NULL, paciente_id INTEGER NOT NULL, descripcion TEXT NOT NULL,
+            monto REAL NOT NULL, fecha DATETIME NOT NULL, observaciones TEXT, codigo_id INTEGER,
+            PRIMARY KEY (id),
+            FOREIGN KEY(paciente_id) REFERENCES pacientes(id)
+        );
+        CREATE INDEX ix_operaciones_paciente ON operaciones (paciente_id);
+        CREATE TABLE turnos (
+            id INTEGER PRIMARY KEY, paciente_id INTEGER NOT NULL, fecha DATE NOT NULL,
+            hora TIME NOT NULL, detalle STRING, estado STRING, operacion_id INTEGER
+        );
+        CREATE TABLE cambios_estado (
+            id INTEGER PRIMARY KEY, turno_id INTEGER, estado_anterior STRING, estado_nuevo STRING
+        );
+        INSERT INTO estados (id, nombre) VALUES (1, 'Pendiente'), (2, 'Atendido');
+        INSERT INTO pacientes VALUES (1, 'Ana', 'Perez', '1', '1990-01-01', 'C-1');
+        INSERT INTO turnos VALUES (1, 1, '2025-01-01', '10:00', NULL, 'Atendido', 3);
+        """
+    )
+    # ids con huecos para ejercitar los lotes por rowid
+    conn.executemany(
+        "INSERT INTO operaciones VALUES (?, 1, ?, 100.0, '2025-01-01', NULL, 7)",
+        [(i * 10, f"op {i}") for i in range(1, filas + 1)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_migra_base_legacy_en_lotes_y_registra_version(tmp_path, monkeypatch):
+    db_path = tmp_path / "legacy.db"
+    _crear_base_legacy(db_path)
+    monkeypatch.setattr(migrations, "REBUILD_BATCH_SIZE", 10)
+    engine = create_engine(f"sqlite:///{db_path}")
+    mensajes = []
+
+    aplicadas = MigrationRunner.run(engine, progreso=mensajes.append)
+
+    assert aplicadas == MigrationRunner.latest_version()
+    assert any("20/25 filas copiadas" in m for m in mensajes)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] == MigrationRunner.latest_version()
+    columnas = {row[1] for row in conn.execute("PRAGMA table_info('prestaciones')")}
+    assert 'codigo_id' not in columnas and 'estado' in columnas
+    assert conn.execute("SELECT COUNT(*), MIN(id), MAX(id) FROM prestaciones").fetchone() == (25, 10, 250)
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name='prestaciones'").fetchone()[0]
+    assert 'AUTOINCREMENT' in ddl
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name='ix_operaciones_paciente'").fetchone()
+    assert conn.execute("SELECT nro_afiliado FROM pacientes").fetchone() == ('C-1',)
+    assert conn.execute("SELECT prestacion_id, estado_id FROM turnos").fetchone() == (3, 2)
+    conn.close()
+
+    # Segundo arranque: nada pendiente
+    assert MigrationRunner.run(engine, progreso=mensajes.append) == 0
+
+
+def test_migracion_fallida_se_revierte_completa(tmp_path, monkeypatch):
+    db_path = tmp_path / "falla.db"
+    _crear_base_legacy(db_path, filas=1)
+    engine = create_engine(f"sqlite:///{db_path}")
+    MigrationRunner.run(engine, progreso=lambda _: None)
+    version = MigrationRunner.latest_version()
+
+    def _falla(conn, progreso):
+        conn.execute("ALTER TABLE pacientes ADD COLUMN temporal INTEGER")
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(migrations._MIGRACIONES, version + 1, migrations.Migracion(version + 1, "falla", _falla))
+
+    with pytest.raises(RuntimeError):
+        MigrationRunner.run(engine, progreso=lambda _: None)
+
+    conn = sqlite3.connect(db_path)
+    assert 'temporal' not in {row[1] for row in conn.execute("PRAGMA table_info('pacientes')")}
+    assert conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] == version
+    conn.close()
+
+
+def test_migracion_19_convierte_odontogramas_a_delta(tmp_path):
+    db_path = tmp_path / "odonto.db"
+    conn = sqlite3.connect(db_path)
+    migrations._m014_odontogramas(conn, print)
+    migrations._m015_odontograma_caras(conn, print)
+    # Tres versiones completas: la 2 cambia una cara, la 3 pierde una (queda snapshot)
+    versiones = {
+        1: {("11", "oclusal"): "sano", ("12", "oclusal"): "sano"},
+        2: {("11", "oclusal"): "caries", ("12", "oclusal"): "sano"},
+        3: {("11", "oclusal"): "caries"},
+    }
+    for seq, caras in versiones.items():
+        conn.execute("INSERT INTO odontogramas (id, paciente_id, version_seq) VALUES (?, 1, ?)", (seq, seq))
+        conn.executemany(
+            "INSERT INTO odontograma_caras (odontograma_id, diente, cara, marca_codigo) VALUES (?, ?, ?, ?)",
+            [(seq, d, c, m) for (d, c), m in caras.items()],
+        )
+    conn.commit()
+
+    migrations._m019_odontogramas_delta(conn, print)
+
+    filas = conn.execute("SELECT id, base_id, profundidad_delta FROM odontogramas ORDER BY id").fetchall()
+    assert filas == [(1, None, 0), (2, 1, 1), (3, None, 0)]
+    assert conn.execute(
+        "SELECT diente, marca_codigo FROM odontograma_caras WHERE odontograma_id = 2"
+    ).fetchall() == [("11", "caries")]
+    conn.close()
+
+
+def test_migracion_21_calcula_saldos_de_prestaciones(tmp_path):
+    db_path = tmp_path / "odonto.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE practicas (id INTEGER PRIMARY KEY, codigo VARCHAR, es_plus BOOLEAN NOT NULL DEFAULT 0);
+        CREATE TABLE prestaciones (
+            id INTEGER PRIMARY KEY, importe_afiliado_autorizado FLOAT, importe_coseguro_autorizado FLOAT
+        );
+        CREATE TABLE prestacion_practica (
+            id INTEGER PRIMARY KEY, prestacion_id INTEGER, practica_id INTEGER, cantidad INTEGER,
+            monto_unitario FLOAT, fecha_anulacion DATE
+        );
+        CREATE TABLE prestacion_cobro (id INTEGER PRIMARY KEY, prestacion_id INTEGER, monto FLOAT);
+        INSERT INTO practicas VALUES (1, '101', 0), (2, 'plus_101', 1);
+        INSERT INTO prestaciones VALUES (1, 1000, 200), (2, NULL, NULL);
+        INSERT INTO prestacion_practica VALUES
+            (1, 1, 1, 1, 5000, NULL), (2, 1, 2, 2, 300, NULL), (3, 1, 2, 1, 300, '2026-01-01'),
+            (4, 2, 1, 1, 5000, NULL);
+        INSERT INTO prestacion_cobro VALUES (1, 1, 500), (2, 1, 250);
+        """
+    )
+
+    migrations._m021_prestaciones_saldos(conn, print)
+
+    filas = conn.execute("SELECT id, total_cobrado, saldo_pendiente FROM prestaciones ORDER BY id").fetchall()
+    # 1000 + 200 + 2*300 (el plus anulado no cuenta) - 750
+    assert filas == [(1, 750.0, 1050.0), (2, 0.0, 0.0)]
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'ix_prestaciones_saldo_pendiente'"
+    ).fetchone()
+    conn.close()
@@ -0,0 +1,19 @@
+def test_apispec_se_genera_en_el_primer_request(app, client):
+    app.extensions.pop('swagger', None)
+
+    resp = client.get('/apispec.json')
+
+    assert resp.status_code == 200
+    spec = resp.get_json()
+    assert spec['info']['title'] == 'API - Sistema de Gestión Odontológico'
+    assert spec['paths']
+    assert all(path.startswith('/api/') for path in spec['paths'])
+    assert 'swagger' in app.extensions
+
+
+def test_swagger_ui_y_estaticos_disponibles(client):
+    resp = client.get('/api/docs')
+    assert resp.status_code == 200
+    assert b'/apispec.json' in resp.data
+
+    assert client.get('/flasgger_static/swagger-ui.css').status_code == 200
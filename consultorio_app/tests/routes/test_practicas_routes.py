@@ -0,0 +1,66 @@
+from app.models import Practica, ObraSocial
+from tests.factories.data import make_usuario, make_obra_social
+
+
+def login(client, username, password):
+    return client.post('/login', data={'username': username, 'password': password}, follow_redirects=True)
+
+
+def test_listar_practicas(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo7', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo7', 'secret')
+
+    resp = client.get('/practicas')
+    assert resp.status_code == 200
+
+
+def test_crear_practica_con_obra_social(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo8', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo8', 'secret')
+    os = make_obra_social(nombre='IPSS')
+
+    form_data = {
+        'codigo': 'P001',
+        'descripcion': 'Limpieza',
+        'obra_social_id': os.id,
+        'monto_unitario': '1500.00',
+    }
+    resp = client.post('/practicas/nueva', data=form_data, follow_redirects=False)
+    assert resp.status_code in (302, 303)
+    assert '/practicas' in resp.headers.get('Location', '')
+
+    assert Practica.query.count() == 1
+    pr = Practica.query.first()
+    assert pr.codigo == 'P001'
+    assert pr.obra_social_id == os.id
+
+
+def test_importar_precios_preview_y_confirmacion(app, client, db_session):
+    import io
+    import re
+    from html import unescape
+
+    app.config['LOGIN_DISABLED'] = False
+    make_usuario(username='odo_imp', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo_imp', 'secret')
+    os = make_obra_social(nombre='SANCOR')
+
+    resp = client.post('/practicas/importar', data={
+        'obra_social_id': os.id,
+        'archivo': (io.BytesIO(b'codigo,descripcion,monto\nA1,Consulta,5000\n'), 'sancor.csv'),
+    }, content_type='multipart/form-data')
+    assert resp.status_code == 200
+    assert 'Vista previa' in resp.get_data(as_text=True)
+    assert Practica.query.count() == 0
+
+    filas_json = unescape(re.search(r'name="filas_json" value="([^"]*)"', resp.get_data(as_text=True)).group(1))
+    resp = client.post('/practicas/importar', data={
+        'obra_social_id': os.id,
+        'filas_json': filas_json,
+        'confirmar': '1',
+    })
+    assert resp.status_code in (302, 303)
+    practica = Practica.query.one()
+    assert (practica.codigo, practica.obra_social_id, practica.monto_unitario) == ('A1', os.id, 5000)
@@ -0,0 +1,121 @@
+from app.models import Prestacion
+from tests.factories.data import make_usuario, make_paciente, make_practica
+
+
+def login(client, username, password):
+    return client.post('/login', data={'username': username, 'password': password}, follow_redirects=True)
+
+
+def test_listar_prestaciones_por_paciente(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo9', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo9', 'secret')
+    p = make_paciente(dni='11220033')
+
+    resp = client.get(f'/pacientes/{p.id}/prestaciones')
+    assert resp.status_code == 200
+
+
+def test_nueva_prestacion_flow(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo10', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo10', 'secret')
+    p = make_paciente(dni='99887766')
+    practica = make_practica(codigo='PR-100', descripcion='Consulta', monto=500)
+
+    form_data = {
+        'paciente_id': p.id,
+        'descripcion': 'Prestación de prueba',
+        'monto': '500.00',
+        'descuento_porcentaje': '0',
+        'descuento_fijo': '0',
+        'observaciones': 'Observaciones',
+        'practica_ids[]': [practica.id],
+        'practica_cantidades[]': [1],
+    }
+    resp = client.post('/prestaciones/nueva', data=form_data, follow_redirects=False)
+    assert resp.status_code in (302, 303)
+    assert f'/pacientes/{p.id}' in resp.headers.get('Location', '')
+
+    assert Prestacion.query.count() == 1
+    pr = Prestacion.query.first()
+    assert pr.paciente_id == p.id
+    assert pr.descripcion == 'Prestación de prueba'
+
+
+def test_api_crear_prestaciones_lote(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    make_usuario(username='odo11', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo11', 'secret')
+    p = make_paciente(dni='40111222')
+    practica = make_practica(codigo='0201', descripcion='Limpieza', monto=800)
+
+    resp = client.post('/api/prestaciones/lote', json={'prestaciones': [
+        {'dni': '40111222', 'practicas': [practica.id]},
+        {'paciente_id': 999999, 'practicas': [practica.id]},
+    ]})
+    assert resp.status_code == 400
+    assert resp.get_json()['errores'] == [{'fila': 2, 'error': 'paciente no encontrado (ID: 999999)'}]
+    assert Prestacion.query.count() == 0
+
+    resp = client.post('/api/prestaciones/lote', json={'prestaciones': [
+        {'dni': '40111222', 'practicas': '0201x3'},
+    ]})
+    assert resp.status_code == 201
+    assert resp.get_json()['cantidad'] == 1
+    assert Prestacion.query.filter_by(paciente_id=p.id).one().monto == 2400
+
+
+def test_importar_prestaciones_upload(app, client, db_session):
+    import io
+
+    app.config['LOGIN_DISABLED'] = False
+    make_usuario(username='odo12', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo12', 'secret')
+    make_paciente(dni='40333444')
+    make_practica(codigo='0201', descripcion='Limpieza', monto=800)
+
+    assert client.get('/prestaciones/importar').status_code == 200
+
+    csv_bytes = b"dni,practicas\n40333444,0201\n40333444,9999\n"
+    resp = client.post('/prestaciones/importar', data={'archivo': (io.BytesIO(csv_bytes), 'lote.csv')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 200
+    assert 'Fila 3: no hay una práctica con código 9999' in resp.get_data(as_text=True)
+    assert Prestacion.query.count() == 0
+
+    csv_bytes = b"dni,practicas\n40333444,0201\n"
+    resp = client.post('/prestaciones/importar', data={'archivo': (io.BytesIO(csv_bytes), 'lote.csv')},
+                       content_type='multipart/form-data')
+    assert resp.status_code in (302, 303)
+    assert Prestacion.query.count() == 1
+
+
+def test_detalle_prestacion_con_consultas_fijas(app, client, db_session, query_budget):
+    from datetime import date
+    from app.models import PrestacionCobro
+    from tests.factories.data import make_obra_social, make_prestacion, make_prestacion_practica
+
+    app.config['LOGIN_DISABLED'] = False
+    make_usuario(username='odo13', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo13', 'secret')
+    paciente = make_paciente(dni='40555666', obra_social=make_obra_social(nombre='IPSS'))
+    prestacion = make_prestacion(paciente)
+    prestacion.estado = 'autorizada'
+    prestacion.fecha_autorizacion = date.today()
+    # Una práctica distinta por ítem: si Practica se cargara lazy serían N consultas
+    for i in range(5):
+        practica = make_practica(codigo=f'D{i}', descripcion=f'Práctica {i}', monto=100 * (i + 1))
+        make_prestacion_practica(prestacion, practica)
+    for monto in (100, 200):
+        db_session.add(PrestacionCobro(prestacion_id=prestacion.id, fecha_cobro=date.today(), tipo_cobro='otro', monto=monto))
+    db_session.commit()
+    url = f'/prestaciones/{prestacion.id}'
+    db_session.expire_all()
+
+    # usuario de la sesión + 4 del perfil de detalle, sin importar la cantidad de ítems
+    with query_budget(5, nplus1_threshold=1) as statements:
+        resp = client.get(url)
+    assert resp.status_code == 200
+    assert len([s for s in statements if 'prestacion' in s.split('FROM', 1)[1].split()[0]]) == 4
+    assert 'Práctica 4' in resp.get_data(as_text=True)
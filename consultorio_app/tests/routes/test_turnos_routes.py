@@ -0,0 +1,60 @@
+from datetime import date, time, timedelta
+
+from app.models import Turno, Paciente
+from tests.factories.data import make_usuario, make_paciente, make_turno
+
+
+def login(client, username, password):
+    return client.post('/login', data={'username': username, 'password': password}, follow_redirects=True)
+
+
+def test_listar_turnos_agenda(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo4', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo4', 'secret')
+
+    resp = client.get('/turnos')
+    assert resp.status_code == 200
+
+
+def test_crear_turno_form_view(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo5', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo5', 'secret')
+    resp = client.get('/turnos/nuevo')
+    assert resp.status_code == 200
+
+
+def test_cambiar_estado_turno(app, client, db_session):
+    app.config['LOGIN_DISABLED'] = False
+    user = make_usuario(username='odo6', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo6', 'secret')
+    p = make_paciente(dni='66778899')
+
+    # Crear turno directamente en DB (el service resuelve los estados contra la tabla)
+    from app.database import db
+    from app.models import Estado, Turno
+    db.session.add_all([Estado(nombre='Pendiente'), Estado(nombre='Confirmado')])
+    t = Turno(paciente_id=p.id, fecha=(date.today() + timedelta(days=2)), hora=time(9, 0), duracion=60, estado='Pendiente')
+    db.session.add(t)
+    db.session.commit()
+
+    # Cambiar estado a Confirmado
+    resp = client.post(f'/turnos/{t.id}/estado', data={'estado': 'Confirmado'}, follow_redirects=False)
+    assert resp.status_code in (302, 303)
+    t2 = Turno.query.get(t.id)
+    assert t2.estado == 'Confirmado'
+
+
+def test_agenda_sin_n_mas_1(app, client, db_session, query_budget):
+    app.config['LOGIN_DISABLED'] = False
+    make_usuario(username='odo7', rol='ODONTOLOGA', password='secret')
+    login(client, 'odo7', 'secret')
+    # Un turno por paciente: si la agenda cargara Turno.paciente lazy, serían N consultas
+    for i in range(6):
+        paciente = make_paciente(dni=f"4000000{i}")
+        make_turno(paciente, hora=time(9 + i, 0))
+
+    with query_budget(10):
+        resp = client.get('/turnos')
+    assert resp.status_code == 200
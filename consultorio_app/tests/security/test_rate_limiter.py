@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.database.migrations import MigrationRunner
+from app.adapters.whatsapp.webhook_handler import WhatsAppWebhookHandler
+
+from app.security import rate_limit_backends as backends
+from app.security import RateLimiter, MemoryRateLimitBackend, SQLiteRateLimitBackend
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj controlable (monotónico y de pared) para no depender de sleeps."""
+    state = {"now": 1_000_020.0}
+    monkeypatch.setattr(backends.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(backends.time, "time", lambda: state["now"])
+    return state
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(reloj):
+    RateLimiter.configure(MemoryRateLimitBackend(RateLimiter.REQUESTS_PER_MINUTE, RateLimiter.WINDOW_SECONDS))
+    yield
+    RateLimiter.configure(None)
+
+
+@pytest.fixture
+def rate_db(tmp_path):
+    """Base SQLite con las migraciones aplicadas (crean rate_limit_counters)."""
+    db_path = tmp_path / "rate.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    MigrationRunner.run(engine, progreso=lambda _: None)
+    engine.dispose()
+    return db_path
+
+
+def test_permite_hasta_el_limite_y_luego_bloquea(reloj):
+    for _ in range(RateLimiter.REQUESTS_PER_MINUTE):
+        allowed, _ = RateLimiter.check_rate_limit("5493870000001")
+        assert allowed is True
+
+    allowed, message = RateLimiter.check_rate_limit("5493870000001")
+    assert allowed is False
+    assert "Rate limit exceeded" in message
+
+    # Otro usuario no se ve afectado
+    assert RateLimiter.check_rate_limit("5493870000002")[0] is True
+
+
+def test_ventana_deslizante_libera_cupo(reloj):
+    for _ in range(RateLimiter.REQUESTS_PER_MINUTE):
+        RateLimiter.check_rate_limit("5493870000001")
+        reloj["now"] += 10
+
+    # El primer mensaje fue hace 50s: sigue bloqueado
+    assert RateLimiter.check_rate_limit("5493870000001")[0] is False
+
+    # Pasado el minuto del primer mensaje se libera un lugar
+    reloj["now"] += 11
+    assert RateLimiter.check_rate_limit("5493870000001")[0] is True
+    assert RateLimiter.check_rate_limit("5493870000001")[0] is False
+
+
+def test_cleanup_elimina_usuarios_inactivos(reloj):
+    for i in range(200):
+        RateLimiter.check_rate_limit(f"54938700{i:05d}")
+    assert RateLimiter.tracked_users() == 200
+
+    reloj["now"] += RateLimiter.WINDOW_SECONDS - 1
+    RateLimiter.check_rate_limit("5493879999999")
+    assert RateLimiter.cleanup_old_entries() == 0
+
+    reloj["now"] += 2
+    assert RateLimiter.cleanup_old_entries() == 200
+    assert RateLimiter.tracked_users() == 1
+
+
+def test_sqlite_backend_comparte_contadores_entre_instancias(reloj, rate_db):
+    db_path = rate_db
+    # Dos instancias sobre el mismo archivo simulan dos workers
+    worker_a = SQLiteRateLimitBackend(3, 60, db_path)
+    worker_b = SQLiteRateLimitBackend(3, 60, db_path)
+
+    assert worker_a.hit("5493870000001") is True
+    assert worker_b.hit("5493870000001") is True
+    assert worker_a.hit("5493870000001") is True
+    assert worker_b.hit("5493870000001") is False
+    assert worker_a.hit("5493870000002") is True
+
+    # Nueva ventana: el contador arranca de cero y la anterior se puede limpiar
+    reloj["now"] += 60
+    assert worker_b.hit("5493870000001") is True
+    assert worker_a.cleanup() == 2
+    assert worker_a.tracked_keys() == 1
+
+
+def test_sqlite_backend_upsert_atomico_con_hilos(reloj, rate_db):
+    backend = SQLiteRateLimitBackend(1000, 60, rate_db)
+    resultados = []
+
+    def enviar():
+        for _ in range(25):
+            resultados.append(backend.hit("5493870000001"))
+
+    hilos = [threading.Thread(target=enviar) for _ in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    conn = sqlite3.connect(rate_db)
+    count = conn.execute("SELECT count FROM rate_limit_counters").fetchone()[0]
+    conn.close()
+    assert count == 100
+    assert all(resultados)
+
+
+def test_create_backend_nombre_desconocido_usa_memoria():
+    backend = backends.create_backend("redis", 5, 60)
+    assert isinstance(backend, MemoryRateLimitBackend)
+
+
+def test_webhook_rate_limited_no_procesa_el_mensaje():
+    """Con rate limit excedido el handler no delega al ConversationService."""
+    class LimiterQueBloquea:
+        def check_rate_limit(self, channel_user_id):
+            return False, "Rate limit exceeded"
+
+    class ServiceQueFalla:
+        def handle_message(self, channel_user_id, text):
+            raise AssertionError("No debería procesarse")
+
+    handler = WhatsAppWebhookHandler("test-secret")
+    body = json.dumps({
+        "entry": [{"changes": [{"value": {"messages": [
+            {"from": "5493871234567", "type": "text", "text": {"body": "Hola"}}
+        ]}}]}]
+    })
+
+    response, status = handler.handle_webhook(body, "", ServiceQueFalla(), rate_limiter=LimiterQueBloquea())
+
+    assert status == 200
+    assert response.get("status") == "rate_limited"
+    assert handler.rate_limited is True
+    assert handler.last_reply_message is None
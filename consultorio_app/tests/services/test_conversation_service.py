@@ -0,0 +1,132 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event
+
+from app.database import db
+from app.models import Conversation, Estado, Paciente, Turno
+from app.services.conversacion import ConversationService
+
+
+@pytest.fixture
+def conversaciones(db_session):
+    ConversationService._get_cache().clear()
+    yield db_session
+    ConversationService._get_cache().clear()
+
+
+@pytest.fixture
+def escrituras(app):
+    """Cuenta INSERT/UPDATE sobre la tabla conversations."""
+    sentencias = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        sql = statement.lstrip().upper()
+        if sql.startswith(("INSERT INTO CONVERSATIONS", "UPDATE CONVERSATIONS")):
+            sentencias.append(sql.split()[0])
+
+    event.listen(db.engine, "before_cursor_execute", _registrar)
+    yield sentencias
+    event.remove(db.engine, "before_cursor_execute", _registrar)
+
+
+def test_flujo_completo_registra_paciente_y_turno(conversaciones):
+    db.session.add(Estado(nombre="Pendiente"))
+    db.session.commit()
+    fecha = (date.today() + timedelta(days=7)).strftime("%Y-%m-%d")
+
+    assert ConversationService.handle_message("5493871111111", "30123456").step == "solicitar_nombre"
+    assert ConversationService.handle_message("5493871111111", "Ana").step == "solicitar_apellido"
+    assert ConversationService.handle_message("5493871111111", "Perez").step == "solicitar_fecha"
+    assert ConversationService.handle_message("5493871111111", fecha).step == "solicitar_hora"
+    reply = ConversationService.handle_message("5493871111111", "10:00")
+
+    assert reply.done is True
+    paciente = Paciente.query.filter_by(dni="30123456").one()
+    assert Turno.query.filter_by(paciente_id=paciente.id).count() == 1
+    convo = Conversation.query.filter_by(channel_user_id="5493871111111").one()
+    assert convo.paso_actual == "completado"
+    assert convo.nombre_tmp == "Ana"
+
+
+def test_conversacion_nueva_se_inserta_una_sola_vez(conversaciones, escrituras):
+    ConversationService.handle_message("5493872222222", "12")
+
+    assert escrituras == ["INSERT"]
+    assert Conversation.query.filter_by(channel_user_id="5493872222222").count() == 1
+
+
+def test_rafaga_sin_transicion_no_escribe(conversaciones, escrituras):
+    ConversationService.handle_message("5493873333333", "hola")
+    for _ in range(5):
+        reply = ConversationService.handle_message("5493873333333", "no sé mi dni")
+        assert reply.step == "solicitar_dni"
+
+    # Solo el INSERT inicial: los bumps de timestamp se coalescen
+    assert escrituras == ["INSERT"]
+
+    ConversationService.handle_message("5493873333333", "30999888")
+    assert escrituras == ["INSERT", "UPDATE"]
+    convo = Conversation.query.filter_by(channel_user_id="5493873333333").one()
+    assert convo.paso_actual == "solicitar_nombre"
+    assert convo.dni_propuesto == "30999888"
+
+
+def test_estado_se_toma_del_cache_sin_select(conversaciones, app):
+    ConversationService.handle_message("5493874444444", "30555444")
+
+    selects = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        if "FROM conversations" in statement:
+            selects.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _registrar)
+    try:
+        reply = ConversationService.handle_message("5493874444444", "Juan")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _registrar)
+
+    assert reply.step == "solicitar_apellido"
+    assert selects == []
+
+
+def test_fila_eliminada_se_recrea_desde_cache(conversaciones):
+    ConversationService.handle_message("5493875555555", "30111222")
+    Conversation.query.filter_by(channel_user_id="5493875555555").delete()
+    db.session.commit()
+
+    reply = ConversationService.handle_message("5493875555555", "Lucia")
+
+    assert reply.step == "solicitar_apellido"
+    convo = Conversation.query.filter_by(channel_user_id="5493875555555").one()
+    assert convo.nombre_tmp == "Lucia"
+    assert convo.dni_propuesto == "30111222"
+
+
+def test_cleanup_borra_expiradas_en_lotes(conversaciones):
+    from datetime import datetime
+    from app.scheduler import cleanup_expired_conversations, get_cleanup_metrics
+
+    ahora = datetime.utcnow()
+    for i in range(25):
+        db.session.add(Conversation(
+            channel_user_id=f"54938760{i:05d}",
+            paso_actual="solicitar_dni",
+            expira_en=ahora - timedelta(minutes=1),
+        ))
+    db.session.add(Conversation(
+        channel_user_id="5493876999999",
+        paso_actual="solicitar_dni",
+        expira_en=ahora + timedelta(minutes=30),
+    ))
+    db.session.commit()
+    antes = get_cleanup_metrics()
+
+    eliminadas = cleanup_expired_conversations(batch_size=10)
+
+    assert eliminadas == 25
+    assert Conversation.query.count() == 1
+    metricas = get_cleanup_metrics()
+    assert metricas['ejecuciones'] == antes['ejecuciones'] + 1
+    assert metricas['conversaciones_eliminadas'] == antes['conversaciones_eliminadas'] + 25
+    assert metricas['ultima_eliminadas'] == 25
@@ -0,0 +1,45 @@
+from sqlalchemy import event
+
+import run
+from app.database import db
+from app.models import AppMetadata, Estado, Localidad, ObraSocial
+from tests.factories.data import make_obra_social, make_paciente
+
+
+def _contar_consultas(engine):
+    sentencias = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return sentencias, lambda: event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_init_default_data_inserta_faltantes_y_limpia_obras_extra(db_session):
+    db_session.add(Estado(nombre="Pendiente"))
+    db_session.commit()
+    en_uso = make_obra_social("OSDE")
+    make_paciente(obra_social=en_uso)
+    make_obra_social("SIN USO")
+
+    run.init_default_data()
+
+    assert Estado.query.count() == len(run.ESTADOS_PREDEFINIDOS)
+    assert Localidad.query.count() == len(run.PROVINCIAS_CAPITALES)
+    nombres = {os.nombre for os in ObraSocial.query.all()}
+    assert nombres == set(run.OBRAS_OPERATIVAS) | {"OSDE"}
+    assert AppMetadata.obtener(run.SEED_VERSION_KEY) == run._seed_version()
+
+
+def test_init_default_data_saltea_si_la_version_no_cambio(db_session):
+    run.init_default_data()
+
+    sentencias, detener = _contar_consultas(db.engine)
+    try:
+        run.init_default_data()
+    finally:
+        detener()
+
+    assert len(sentencias) == 1
+    assert "app_metadata" in sentencias[0]
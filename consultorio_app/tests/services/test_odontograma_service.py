@@ -0,0 +1,116 @@
+import pytest
+
+from app.database import db
+from app.models import Odontograma, OdontogramaCara
+from app.services.common import OdontogramaNoEncontradoError
+from app.services.odontograma import (
+    CompararOdontogramaService,
+    CrearVersionOdontogramaService,
+    ObtenerOdontogramaService,
+    ReconstruirOdontogramaService,
+)
+from tests.factories.data import make_paciente
+
+
+def _estado(odontograma_id):
+    return {
+        clave: cara.marca_codigo
+        for clave, cara in ReconstruirOdontogramaService.caras_por_clave(odontograma_id).items()
+    }
+
+
+def _filas(odontograma_id):
+    return OdontogramaCara.query.filter_by(odontograma_id=odontograma_id).count()
+
+
+@pytest.fixture
+def snapshot_cada_3(monkeypatch):
+    monkeypatch.setattr(CrearVersionOdontogramaService, "_modo_delta", staticmethod(lambda: True))
+    monkeypatch.setattr(CrearVersionOdontogramaService, "_snapshot_interval", staticmethod(lambda: 3))
+
+
+def test_versiones_delta_guardan_solo_caras_cambiadas(db_session, snapshot_cada_3):
+    paciente = make_paciente(dni="70000001")
+
+    completo = [{"diente": str(d), "cara": "oclusal", "marca_codigo": "sano"} for d in range(11, 19)]
+    v1, _ = CrearVersionOdontogramaService.execute(paciente.id, completo)
+    v2, _ = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "11", "cara": "oclusal", "marca_codigo": "caries"}])
+    v3, _ = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "12", "cara": "mesial", "marca_codigo": "resina"}])
+    v4, _ = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "13", "cara": "oclusal", "marca_codigo": "corona"}])
+
+    assert v1.es_snapshot and _filas(v1.id) == 8
+    assert (v2.base_id, v2.profundidad_delta, _filas(v2.id)) == (v1.id, 1, 1)
+    assert (v3.base_id, v3.profundidad_delta, _filas(v3.id)) == (v2.id, 2, 1)
+    # profundidad 3 == snapshot_interval: snapshot completo
+    assert v4.es_snapshot and _filas(v4.id) == 9
+
+    esperado = {(str(d), "oclusal"): "sano" for d in range(11, 19)}
+    esperado[("11", "oclusal")] = "caries"
+    assert _estado(v2.id) == esperado
+    esperado[("12", "mesial")] = "resina"
+    assert _estado(v3.id) == esperado
+    esperado[("13", "oclusal")] = "corona"
+    assert _estado(v4.id) == esperado
+    # Las versiones anteriores siguen reconstruyéndose igual
+    assert _estado(v1.id)[("11", "oclusal")] == "sano"
+
+
+def test_retencion_convierte_en_snapshot_las_versiones_huerfanas(db_session, snapshot_cada_3, monkeypatch):
+    monkeypatch.setattr(CrearVersionOdontogramaService, "RETENCION_MAX_VERSIONES", 2)
+    paciente = make_paciente(dni="70000002")
+
+    v2, _ = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "21", "cara": "distal", "marca_codigo": "caries"}])
+    v3, _ = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "22", "cara": "distal", "marca_codigo": "corona"}])
+    v4, versiones = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "21", "cara": "distal", "comentario": "control"}])
+
+    assert [v.id for v in versiones] == [v4.id, v3.id]
+    assert db.session.get(Odontograma, v2.id) is None
+    db.session.refresh(v3)
+    assert v3.es_snapshot
+    estado = ReconstruirOdontogramaService.caras_por_clave(v4.id)
+    assert estado[("21", "distal")].marca_codigo == "caries"
+    assert estado[("21", "distal")].comentario == "control"
+    assert estado[("22", "distal")].marca_codigo == "corona"
+
+
+def test_comparar_devuelve_solo_caras_cambiadas(db_session, snapshot_cada_3):
+    paciente = make_paciente(dni="70000003")
+    otro = make_paciente(dni="70000004")
+
+    completo = [{"diente": str(d), "cara": "oclusal", "marca_codigo": "sano"} for d in range(11, 19)]
+    v2, _ = CrearVersionOdontogramaService.execute(paciente.id, completo)
+    CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "11", "cara": "oclusal", "marca_codigo": "caries"}])
+    CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "12", "cara": "mesial", "marca_codigo": "resina"}])
+
+    resultado = CompararOdontogramaService.execute(paciente.id, v2.id)
+
+    assert resultado["desde"]["id"] == v2.id
+    assert [(c["diente"], c["cara"], c["tipo"]) for c in resultado["cambios"]] == [
+        ("11", "oclusal", "modificada"),
+        ("12", "mesial", "agregada"),
+    ]
+    assert resultado["cambios"][0]["antes"]["marca_codigo"] == "sano"
+    assert resultado["cambios"][0]["despues"]["marca_codigo"] == "caries"
+
+    # Al revés, la cara agregada figura como eliminada
+    inverso = CompararOdontogramaService.execute(paciente.id, resultado["hasta"]["id"], v2.id)
+    assert inverso["cambios"][1]["tipo"] == "eliminada"
+
+    with pytest.raises(OdontogramaNoEncontradoError):
+        CompararOdontogramaService.execute(otro.id, v2.id)
+
+
+def test_obtener_actual_sin_odontograma_no_escribe(db_session):
+    paciente = make_paciente(dni="70000005")
+
+    odontograma, versiones, desactualizado, _ = ObtenerOdontogramaService.obtener_actual(paciente.id)
+
+    assert odontograma.id is None and odontograma.paciente is paciente
+    assert versiones == [] and desactualizado is False
+    assert odontograma not in db.session
+    db.session.commit()
+    assert Odontograma.query.count() == 0
+
+    # La primera versión real se crea al guardar, sin base
+    v1, _ = CrearVersionOdontogramaService.execute(paciente.id, [{"diente": "11", "cara": "oclusal", "marca_codigo": "caries"}])
+    assert v1.version_seq == 1 and v1.es_snapshot
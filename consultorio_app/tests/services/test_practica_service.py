@@ -0,0 +1,126 @@
+from app.services.practica import (
+    CrearPracticaService,
+    EditarPracticaService,
+    EliminarPracticaService,
+    ListarPracticasService,
+)
+from tests.factories.data import make_obra_social, make_paciente, make_practica
+
+
+def test_catalogo_por_obra_social_sin_consultas(db_session, query_budget):
+    ipss = make_obra_social("IPSS")
+    particular_os = make_obra_social("PARTICULAR")
+    make_practica(codigo="101", descripcion="Consulta", proveedor_tipo="PARTICULAR")
+    make_practica(codigo="L1", descripcion="Limpieza", proveedor_tipo="OBRA_SOCIAL", obra_social=ipss)
+    make_practica(codigo="E1", descripcion="Extracción", proveedor_tipo="OBRA_SOCIAL", obra_social=ipss)
+    # Legacy: particular guardada como OBRA_SOCIAL de la obra social PARTICULAR
+    make_practica(codigo="R1", descripcion="Radiografía", proveedor_tipo="OBRA_SOCIAL", obra_social=particular_os)
+
+    ListarPracticasService.listar_por_proveedor()  # arma el catálogo
+
+    with query_budget(0):
+        assert [p.codigo for p in ListarPracticasService.listar_por_proveedor(ipss.id)] == ["E1", "L1"]
+        assert [p.codigo for p in ListarPracticasService.listar_por_proveedor()] == ["101", "R1"]
+        # Sin tildes ni mayúsculas, por código o descripción
+        assert [p.codigo for p in ListarPracticasService.buscar("extraccion", ipss.id)] == ["E1"]
+        assert [p.codigo for p in ListarPracticasService.buscar("r1")] == ["R1"]
+        assert ListarPracticasService.listar_por_proveedor(ipss.id)[0].obra_social.nombre == "IPSS"
+
+
+def test_services_de_practica_invalidan_el_catalogo(db_session):
+    ipss = make_obra_social("IPSS")
+    assert ListarPracticasService.listar_por_proveedor(ipss.id) == []
+
+    practica = CrearPracticaService.execute({
+        'codigo': 'C1',
+        'descripcion': 'Conducto',
+        'monto_unitario': 5000,
+        'proveedor_tipo': 'OBRA_SOCIAL',
+        'obra_social_id': ipss.id,
+    })
+    [item] = ListarPracticasService.listar_por_proveedor(ipss.id)
+    assert item.monto_unitario == 5000
+
+    EditarPracticaService.execute(practica.id, {'monto_unitario': 6500})
+    assert ListarPracticasService.listar_por_proveedor(ipss.id)[0].monto_unitario == 6500
+
+    EliminarPracticaService.execute(practica.id)
+    assert ListarPracticasService.listar_por_proveedor(ipss.id) == []
+    assert [p.id for p in ListarPracticasService.listar_por_proveedor(ipss.id, incluir_bajas=True)] == [practica.id]
+
+
+def test_importar_lista_de_precios_dry_run_y_aplicar(db_session):
+    from app.models import Practica
+    from app.services.practica import ImportarPreciosService
+
+    ipss = make_obra_social("IPSS")
+    limpieza = make_practica(codigo="L1", descripcion="Limpieza", monto=1000, proveedor_tipo="OBRA_SOCIAL", obra_social=ipss)
+    make_practica(codigo="E1", descripcion="Extracción", monto=2000, proveedor_tipo="OBRA_SOCIAL", obra_social=ipss)
+    make_practica(codigo="X9", descripcion="Vieja", monto=10, proveedor_tipo="OBRA_SOCIAL", obra_social=ipss)
+
+    csv_bytes = (
+        "Código;Descripción;Precio;Plus\n"
+        "L1;Limpieza;1.250,50;\n"
+        "e1;;2000;\n"
+        "C1;Conducto;$ 15.000;\n"
+        "C2;Corona;;\n"
+        "P1;Plus material;300;si\n"
+    ).encode("latin-1")
+    filas = ImportarPreciosService.leer_archivo(csv_bytes, "ipss.csv")
+    plan = ImportarPreciosService.planificar(filas, ipss.id, dar_de_baja_faltantes=True)
+
+    assert plan.resumen() == {"altas": 2, "modificaciones": 1, "bajas": 1, "sin_cambios": 1, "errores": 1}
+    assert [a["codigo"] for a in plan.altas] == ["C1", "plus_P1"]
+    assert plan.altas[0]["monto_unitario"] == 15000
+    assert plan.modificaciones[0]["monto_anterior"] == 1000 and plan.modificaciones[0]["monto_unitario"] == 1250.5
+    assert plan.errores[0].startswith("Fila 5:")
+    # El dry-run no escribe
+    assert Practica.query.count() == 3
+
+    assert ImportarPreciosService.aplicar(plan) == {"altas": 2, "modificaciones": 1, "bajas": 1}
+    db_session.expire_all()
+    assert db_session.get(Practica, limpieza.id).monto_unitario == 1250.5
+    assert Practica.query.filter_by(codigo="X9").one().fecha_baja is not None
+    assert [p.codigo for p in ListarPracticasService.listar_por_proveedor(ipss.id)] == ["C1", "E1", "L1", "plus_P1"]
+
+
+def test_importar_lista_particular_actualiza_practicas_legacy(db_session):
+    from app.models import Practica
+    from app.services.practica import ImportarPreciosService
+
+    particular_os = make_obra_social("PARTICULAR")
+    make_practica(codigo="101", descripcion="Consulta", monto=500, proveedor_tipo="PARTICULAR")
+    # Legacy: particular guardada como OBRA_SOCIAL de la obra social PARTICULAR
+    legacy = make_practica(codigo="R1", descripcion="Radiografía", monto=800, proveedor_tipo="OBRA_SOCIAL", obra_social=particular_os)
+
+    filas = ImportarPreciosService.leer_archivo(b"codigo;monto\n101;500\nR1;950\n", "particular.csv")
+    plan = ImportarPreciosService.planificar(filas)
+
+    assert plan.resumen() == {"altas": 0, "modificaciones": 1, "bajas": 0, "sin_cambios": 1, "errores": 0}
+    assert plan.modificaciones[0]["id"] == legacy.id
+
+    ImportarPreciosService.aplicar(plan)
+    db_session.expire_all()
+    assert Practica.query.filter_by(codigo="R1").count() == 1
+    assert db_session.get(Practica, legacy.id).monto_unitario == 950
+
+
+def test_editar_es_plus_recalcula_saldos_de_prestaciones(db_session):
+    from app.models import Prestacion
+    from app.services.prestacion import CrearPrestacionService, SaldoPrestacionService
+
+    paciente = make_paciente(dni="31222333")
+    practica = make_practica(codigo="P030", monto=400)
+    prestacion = CrearPrestacionService.execute({
+        'paciente_id': paciente.id,
+        'descripcion': 'Con práctica que pasa a plus',
+        'practicas': [{'id': practica.id, 'cantidad': 2}],
+    })
+    assert prestacion.saldo_pendiente == 0
+
+    EditarPracticaService.execute(practica.id, {'es_plus': True})
+    assert SaldoPrestacionService.verificar() == []
+    assert db_session.get(Prestacion, prestacion.id).saldo_pendiente == 800
+
+    EditarPracticaService.execute(practica.id, {'es_plus': False})
+    assert SaldoPrestacionService.verificar() == []
@@ -0,0 +1,214 @@
+import pytest
+from app.services.prestacion.crear_prestacion_service import CrearPrestacionService
+from app.services.common import DatosInvalidosError, PracticaNoEncontradaError
+from tests.factories.data import make_paciente, make_practica
+
+
+def test_crear_prestacion_con_descuentos(db_session):
+    paciente = make_paciente(dni="77777777")
+    p1 = make_practica(codigo="P001", monto=1000)
+    p2 = make_practica(codigo="P002", monto=500)
+
+    prestacion = CrearPrestacionService.execute({
+        'paciente_id': paciente.id,
+        'descripcion': 'Test prestacion',
+        'practicas': [p1.id, p2.id],
+        'descuento_porcentaje': 10,
+        'descuento_fijo': 100,
+    })
+
+    # subtotal = 1000 + 500 = 1500
+    # 10% desc -> 1350
+    # -100 -> 1250
+    assert abs(prestacion.monto - 1250) < 0.01
+    assert len(prestacion.practicas_assoc) == 2
+
+
+def test_crear_prestacion_falta_practicas(db_session):
+    paciente = make_paciente(dni="88888888")
+    with pytest.raises(DatosInvalidosError):
+        CrearPrestacionService.execute({
+            'paciente_id': paciente.id,
+            'descripcion': 'Sin practicas',
+            'practicas': [],
+        })
+
+
+def test_crear_prestacion_practica_no_encontrada(db_session):
+    paciente = make_paciente(dni="99999999")
+    with pytest.raises(PracticaNoEncontradaError):
+        CrearPrestacionService.execute({
+            'paciente_id': paciente.id,
+            'descripcion': 'Practica missing',
+            'practicas': [12345],
+        })
+
+
+def test_ultima_prestacion_en_se_mantiene_en_alta_y_baja(db_session):
+    from app.services.odontograma import CrearVersionOdontogramaService, ObtenerOdontogramaService
+    from app.services.prestacion.eliminar_prestacion_service import EliminarPrestacionService
+
+    paciente = make_paciente(dni="66666666")
+    practica = make_practica(codigo="P010", monto=100)
+    CrearVersionOdontogramaService.execute(paciente.id, [{'diente': '11', 'cara': 'oclusal', 'marca_codigo': 'sano'}])
+    assert paciente.ultima_prestacion_en is None
+
+    prestacion = CrearPrestacionService.execute({
+        'paciente_id': paciente.id,
+        'descripcion': 'Control',
+        'practicas': [practica.id],
+    })
+    assert paciente.ultima_prestacion_en == prestacion.fecha
+    _, _, desactualizado, ultima = ObtenerOdontogramaService.obtener_actual(paciente.id)
+    assert desactualizado and ultima == prestacion.fecha
+
+    EliminarPrestacionService.execute(prestacion.id)
+    assert paciente.ultima_prestacion_en is None
+    _, _, desactualizado, _ = ObtenerOdontogramaService.obtener_actual(paciente.id)
+    assert not desactualizado
+
+
+def _filas_lote():
+    from tests.factories.data import make_obra_social
+
+    ipss = make_obra_social(nombre="IPSS")
+    p1 = make_paciente(dni="30111222", obra_social=ipss)
+    p2 = make_paciente(dni="30333444")
+    consulta = make_practica(codigo="101", descripcion="Consulta", monto=1000, proveedor_tipo="OBRA_SOCIAL", obra_social=ipss)
+    make_practica(codigo="101", descripcion="Consulta particular", monto=5000)
+    limpieza = make_practica(codigo="0201", descripcion="Limpieza", monto=2000)
+    filas = [
+        {'dni': '30111222', 'practicas': '101'},
+        {'paciente_id': p2.id, 'practicas': [{'id': limpieza.id, 'cantidad': 2}, {'codigo': '101'}],
+         'descuento_porcentaje': 10, 'descuento_fijo': 100, 'descripcion': 'Lote'},
+    ]
+    return filas, p1, p2, consulta
+
+
+def test_crear_prestaciones_lote_resuelve_con_dos_consultas(db_session, query_budget):
+    from app.models import Prestacion, PrestacionPractica
+    from app.services.prestacion import CrearPrestacionesLoteService
+
+    filas, p1, p2, consulta = _filas_lote()
+    db_session.expire_all()
+
+    with query_budget(12) as statements:
+        ids = CrearPrestacionesLoteService.execute(filas)
+
+    selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+    assert len(selects) == 2  # pacientes + prácticas
+    assert len(ids) == 2
+
+    primera, segunda = (db_session.get(Prestacion, i) for i in ids)
+    assert primera.paciente_id == p1.id
+    assert primera.monto == 1000  # práctica 101 de la obra social del paciente
+    assert primera.descripcion == 'Consulta'
+    assert primera.practicas_assoc[0].estado_item == 'realizado'
+    # particular: (2000*2 + 5000) * 0.9 - 100
+    assert abs(segunda.monto - 8000) < 0.01
+    assert PrestacionPractica.query.filter_by(prestacion_id=segunda.id).count() == 2
+    assert p1.ultima_prestacion_en == primera.fecha
+
+
+def test_crear_prestaciones_lote_con_errores_no_guarda_nada(db_session):
+    from app.models import Prestacion
+    from app.services.common import LotePrestacionesInvalidoError
+    from app.services.prestacion import CrearPrestacionesLoteService
+
+    filas, *_ = _filas_lote()
+    filas += [
+        {'dni': '99999999', 'practicas': '101'},
+        {'dni': '30333444', 'practicas': 'NOEXISTE'},
+        {'dni': '30333444'},
+    ]
+
+    with pytest.raises(LotePrestacionesInvalidoError) as exc:
+        CrearPrestacionesLoteService.execute(filas)
+
+    assert [e['fila'] for e in exc.value.errores] == [3, 4, 5]
+    assert 'DNI 99999999' in exc.value.errores[0]['error']
+    assert Prestacion.query.count() == 0
+
+
+def test_crear_prestaciones_lote_practica_particular_legacy(db_session):
+    from app.models import Prestacion
+    from app.services.practica import ListarPracticasService
+    from app.services.prestacion import CrearPrestacionesLoteService
+    from tests.factories.data import make_obra_social
+
+    paciente = make_paciente(dni="30777888")
+    particular_os = make_obra_social(nombre="PARTICULAR")
+    # Legacy: particular guardada como OBRA_SOCIAL de la obra social PARTICULAR
+    legacy = make_practica(codigo="101", descripcion="Consulta", monto=5000, proveedor_tipo="OBRA_SOCIAL", obra_social=particular_os)
+    assert [p.id for p in ListarPracticasService.listar_por_proveedor()] == [legacy.id]
+
+    [prestacion_id] = CrearPrestacionesLoteService.execute([{'paciente_id': paciente.id, 'practicas': '101'}])
+
+    prestacion = db_session.get(Prestacion, prestacion_id)
+    assert prestacion.practicas_assoc[0].practica_id == legacy.id
+    assert prestacion.monto == 5000
+
+
+def test_crear_prestaciones_lote_desde_csv(db_session):
+    from app.models import Prestacion
+    from app.services.prestacion import CrearPrestacionesLoteService
+
+    make_paciente(dni="30555666")
+    make_practica(codigo="0201", descripcion="Limpieza", monto=2000)
+    contenido = "DNI;Prácticas;Observaciones\n30.555.666;0201x2, 0201;urgente\n;;\n".encode('utf-8')
+
+    filas = CrearPrestacionesLoteService.leer_archivo(contenido, "lote.csv")
+    assert filas == [{'fila': 2, 'dni': '30.555.666', 'practicas': '0201x2, 0201', 'observaciones': 'urgente'}]
+
+    ids = CrearPrestacionesLoteService.execute(filas)
+    prestacion = db_session.get(Prestacion, ids[0])
+    assert prestacion.monto == 6000
+    assert prestacion.observaciones == 'urgente'
+
+
+def test_saldos_se_mantienen_con_autorizacion_y_cobros(db_session):
+    from sqlalchemy import update
+    from app.models import Prestacion
+    from app.services.prestacion import (
+        ListarPrestacionesService,
+        RegistrarAutorizacionPrestacionService,
+        RegistrarCobroPrestacionService,
+        SaldoPrestacionService,
+    )
+
+    paciente = make_paciente(dni="55555555")
+    consulta = make_practica(codigo="P020", monto=1000)
+    plus = make_practica(codigo="plus_P020", monto=300)
+    plus.es_plus = True
+    db_session.commit()
+
+    prestacion = CrearPrestacionService.execute({
+        'paciente_id': paciente.id,
+        'descripcion': 'Con plus',
+        'practicas': [consulta.id, {'id': plus.id, 'cantidad': 2}],
+    })
+    assert (prestacion.total_cobrado, prestacion.saldo_pendiente) == (0, 600)
+    assert ListarPrestacionesService.listar_con_saldo_pendiente() == []  # borrador: todavía no se cobra
+
+    RegistrarAutorizacionPrestacionService.execute(prestacion.id, {
+        'importe_profesional_autorizado': 5000,
+        'importe_afiliado_autorizado': 1000,
+    })
+    assert prestacion.saldo_pendiente == 1600
+
+    RegistrarCobroPrestacionService.execute(prestacion.id, {'tipo_cobro': 'plus_afiliado', 'monto': 1000})
+    assert (prestacion.total_cobrado, prestacion.saldo_pendiente) == (1000, 600)
+    assert ListarPrestacionesService.listar_con_saldo_pendiente() == [prestacion]
+
+    RegistrarCobroPrestacionService.execute(prestacion.id, {'tipo_cobro': 'plus_practica', 'monto': 600})
+    assert prestacion.saldo_pendiente == 0
+    assert ListarPrestacionesService.listar_con_saldo_pendiente() == []
+    assert SaldoPrestacionService.verificar() == []
+
+    # Desfasaje (p. ej. cobro cargado por fuera de los services): verificar lo detecta, reconstruir lo corrige
+    db_session.execute(update(Prestacion).values(total_cobrado=0, saldo_pendiente=1600))
+    db_session.commit()
+    assert [d['id'] for d in SaldoPrestacionService.verificar()] == [prestacion.id]
+    assert SaldoPrestacionService.reconstruir() == 1
+    db_session.refresh(prestacion)
+    assert (prestacion.total_cobrado, prestacion.saldo_pendiente) == (1600, 0)
@@ -0,0 +1,118 @@
+import itertools
+import logging
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from app import instrumentation
+from app.instrumentation import LatencyHistogram, get_request_metrics, init_instrumentation
+
+
+def test_percentiles_del_histograma():
+    hist = LatencyHistogram()
+    for ms in range(1, 101):
+        hist.add(float(ms))
+
+    # Buckets de +15%: el percentil es la cota del bucket, nunca más del 15% arriba
+    assert 50 <= hist.percentile(50) <= 50 * 1.15
+    assert 95 <= hist.percentile(95) <= 95 * 1.15
+    assert hist.percentile(99) <= 100
+    assert hist.mean == 50.5
+
+
+def _app_con_metricas(monkeypatch, slow_query_ms=0, enabled=True):
+    settings = {('metrics', 'enabled'): enabled, ('metrics', 'slow_query_ms'): slow_query_ms}
+    monkeypatch.setattr(instrumentation.SettingsLoader, "get_bool", classmethod(lambda cls, s, k, fallback=False: settings.get((s, k), fallback)))
+    monkeypatch.setattr(instrumentation.SettingsLoader, "get_int", classmethod(lambda cls, s, k, fallback=0: settings.get((s, k), fallback)))
+
+    app = Flask(__name__)
+    engine = create_engine("sqlite://")
+    init_instrumentation(app, engine)
+
+    @app.route("/tres-consultas")
+    def tres_consultas():
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        return "ok"
+
+    @app.route("/con-error")
+    def con_error():
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("SELECT * FROM tabla_inexistente"))
+            except Exception:
+                pass
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 1"))
+        return "ok"
+
+    return app, engine
+
+
+def test_cuenta_consultas_y_tiempo_por_endpoint(monkeypatch):
+    app, _ = _app_con_metricas(monkeypatch)
+    client = app.test_client()
+    for _ in range(4):
+        assert client.get("/tres-consultas").status_code == 200
+
+    [row] = get_request_metrics(app).snapshot()
+    assert row["endpoint"] == "tres_consultas"
+    assert row["requests"] == 4
+    assert row["queries_promedio"] == 3 and row["queries_max"] == 3
+    assert row["p99_ms"] >= row["p50_ms"] > 0
+
+
+def test_consulta_fallida_no_altera_la_medicion(monkeypatch):
+    app, _ = _app_con_metricas(monkeypatch)
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get("/con-error").status_code == 200
+
+    [row] = get_request_metrics(app).snapshot()
+    assert row["queries_promedio"] == 2 and row["queries_max"] == 2
+
+
+def test_deshabilitado_no_registra_listeners(monkeypatch):
+    app, engine = _app_con_metricas(monkeypatch, slow_query_ms=200, enabled=False)
+
+    assert get_request_metrics(app) is None
+    assert len(engine.dispatch.before_cursor_execute) == 0
+    assert len(engine.dispatch.after_cursor_execute) == 0
+
+
+def test_loggea_consultas_lentas_sin_parametros(monkeypatch, caplog):
+    # Cada llamada a perf_counter avanza 1 s: toda consulta supera el umbral
+    monkeypatch.setattr(instrumentation.time, "perf_counter", itertools.count().__next__)
+    app, engine = _app_con_metricas(monkeypatch, slow_query_ms=500)
+
+    with caplog.at_level(logging.WARNING, logger="app.database.slow_queries"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :dni"), {"dni": "30123456"})
+
+    [registro] = [r for r in caplog.records if r.name == "app.database.slow_queries"]
+    assert "Consulta lenta" in registro.getMessage() and "SELECT ?" in registro.getMessage()
+    assert "30123456" not in registro.getMessage()
+
+
+def test_detector_n_mas_1_en_modo_warn(app, db_session, caplog):
+    from app.database import db
+    from app.instrumentation import stop_tracking_lazy_loads, track_lazy_loads
+    from app.models import Turno
+    from tests.factories.data import make_paciente, make_turno
+
+    for i in range(4):
+        make_turno(make_paciente(dni=f"5000000{i}"))
+    db.session.expunge_all()
+
+    token = track_lazy_loads("warn", threshold=2, origen="test")
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.database.nplus1"):
+            for turno in Turno.query.all():
+                turno.paciente
+    finally:
+        tracker = stop_tracking_lazy_loads(token)
+
+    assert tracker.counts["Turno.paciente"] == 4
+    avisos = [r.getMessage() for r in caplog.records if r.name == "app.database.nplus1"]
+    assert len(avisos) == 1 and "Turno.paciente" in avisos[0]
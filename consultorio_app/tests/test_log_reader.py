@@ -0,0 +1,55 @@
+from app import log_reader
+from app.log_reader import read_log_tail
+
+
+def _escribir_log(path, desde, hasta):
+    niveles = ["INFO", "DEBUG", "WARNING", "ERROR"]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(desde, hasta):
+            f.write(f"2026-01-01 10:00:00 | {niveles[i % 4]:<8} | app | evento {i}\n")
+
+
+def test_tail_devuelve_las_ultimas_lineas_mas_recientes_primero(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_reader, "BLOCK_SIZE", 256)  # fuerza varias lecturas por bloque
+    log = tmp_path / "app.log"
+    _escribir_log(log, 0, 1000)
+
+    page = read_log_tail(log, limit=5)
+
+    assert [line.rsplit(" ", 1)[-1] for line in page.lines] == ["999", "998", "997", "996", "995"]
+    assert page.next_cursor is not None
+
+
+def test_filtros_y_paginacion_por_cursor(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_reader, "BLOCK_SIZE", 256)
+    log = tmp_path / "app.log"
+    _escribir_log(log, 0, 1000)
+    esperado = [f"evento {i}" for i in range(999, -1, -1) if i % 4 == 3 and "7" in str(i)]
+
+    vistos = []
+    cursor = None
+    while True:
+        page = read_log_tail(log, limit=7, level="ERROR", search="7", cursor=cursor)
+        vistos += [line.split(" | ")[-1] for line in page.lines]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert vistos == esperado
+
+
+def test_busqueda_en_archivos_rotados(tmp_path):
+    log = tmp_path / "app.log"
+    _escribir_log(log, 20, 30)
+    _escribir_log(tmp_path / "app.log.1", 10, 20)
+    _escribir_log(tmp_path / "app.log.2", 0, 10)
+
+    solo_actual = read_log_tail(log, limit=100, search="Evento 1")
+    assert solo_actual.lines == []
+
+    primera = read_log_tail(log, limit=8, search="evento", include_rotated=True)
+    segunda = read_log_tail(log, limit=100, search="evento", include_rotated=True, cursor=primera.next_cursor)
+
+    numeros = [int(line.rsplit(" ", 1)[-1]) for line in primera.lines + segunda.lines]
+    assert numeros == list(range(29, -1, -1))
+    assert segunda.next_cursor is None
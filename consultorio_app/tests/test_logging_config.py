@@ -0,0 +1,73 @@
+import json
+import logging
+import sys
+
+from app.logging_config import JsonLinesFormatter, SanitizingFormatter, _attach
+
+
+def _record(msg, *args):
+    return logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_sanitiza_dni_telefonos_y_emails():
+    formatter = SanitizingFormatter("%(message)s")
+
+    texto = formatter.format(_record(
+        "DNI %s, tel %s, wa_id=%s, mail %s, turno_id=%s fecha=%s",
+        "30.123.456", "+54 9 387 412-3456", "5493874123456", "juan.perez@gmail.com", 42, "2026-01-01",
+    ))
+
+    assert texto == "DNI ***456, tel ***3456, wa_id=***3456, mail ***@gmail.com, turno_id=42 fecha=2026-01-01"
+
+
+def test_json_lines_con_excepcion_sanitizada():
+    try:
+        raise ValueError("DNI 30123456 inválido")
+    except ValueError:
+        record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "fallo %s", ("x",), sys.exc_info())
+
+    entry = json.loads(JsonLinesFormatter().format(record))
+
+    assert entry["level"] == "ERROR"
+    assert entry["msg"] == "fallo x"
+    assert "30123456" not in entry["exc"] and "***456" in entry["exc"]
+
+
+def test_queue_handler_escribe_en_el_hilo_listener(tmp_path):
+    logger = logging.getLogger("tests.logging.async")
+    logger.propagate = False
+    handler = logging.FileHandler(tmp_path / "async.log", encoding="utf-8")
+    handler.setFormatter(SanitizingFormatter("%(threadName)s | %(message)s"))
+    listener = _attach(logger, [handler], async_logging=True)
+    try:
+        assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+        logger.warning("tel 3874123456")
+    finally:
+        listener.stop()  # vacía la cola
+        handler.close()
+        logger.handlers.clear()
+
+    assert (tmp_path / "async.log").read_text(encoding="utf-8").strip().endswith("| tel ***3456")
+
+
+def test_json_async_conserva_el_traceback_fuera_del_mensaje(tmp_path):
+    logger = logging.getLogger("tests.logging.async_json")
+    logger.propagate = False
+    handler = logging.FileHandler(tmp_path / "async.jsonl", encoding="utf-8")
+    handler.setFormatter(JsonLinesFormatter())
+    listener = _attach(logger, [handler], async_logging=True)
+    try:
+        try:
+            raise ValueError("DNI 30123456 inválido")
+        except ValueError:
+            logger.exception("fallo %s", "x")
+    finally:
+        listener.stop()  # vacía la cola
+        handler.close()
+        logger.handlers.clear()
+
+    entry = json.loads((tmp_path / "async.jsonl").read_text(encoding="utf-8"))
+
+    assert entry["msg"] == "fallo x"
+    assert "Traceback" in entry["exc"] and "ValueError" in entry["exc"]
+    assert "30123456" not in entry["exc"] and "***456" in entry["exc"]
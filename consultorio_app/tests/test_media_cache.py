@@ -0,0 +1,34 @@
+import json
+
+from app import media_cache
+
+
+def test_media_con_hash_es_inmutable_y_revalida_por_etag(app, client):
+    with app.test_request_context():
+        url = media_cache.media_url("muela_icon.png")
+        etag = media_cache.get_entry("muela_icon.png").etag
+    assert url.endswith(f"?v={etag}")
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == f'"{etag}"'
+    assert "immutable" in resp.headers["Cache-Control"] and "max-age=31536000" in resp.headers["Cache-Control"]
+
+    # Sin ?v= (o con un hash viejo) se revalida; If-None-Match devuelve 304 sin cuerpo
+    resp = client.get("/media/muela_icon.png", headers={"If-None-Match": f'"{etag}"'})
+    assert resp.status_code == 304 and resp.data == b""
+    assert resp.headers["Cache-Control"] == "no-cache"
+
+
+def test_guardar_slots_es_atomico_e_invalida_la_cache(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, "media_dir", lambda: str(tmp_path))
+    (tmp_path / media_cache.SLOTS_FILENAME).write_text('{"teeth": []}', encoding="utf-8")
+
+    with app.test_request_context():
+        anterior = media_cache.get_entry(media_cache.SLOTS_FILENAME).etag
+        nuevo = media_cache.guardar_slots({"config": {}, "teeth": [{"fdi": "11"}]})
+
+    assert nuevo.etag != anterior
+    assert json.loads(nuevo.data) == {"config": {}, "teeth": [{"fdi": "11"}]}
+    # No quedan temporales en el directorio
+    assert [p.name for p in tmp_path.iterdir()] == [media_cache.SLOTS_FILENAME]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark de logging: handlers sincrónicos vs QueueHandler/QueueListener.
+
+Configura el logging real de la app (configure_logging) en un directorio
+temporal y simula requests concurrentes que loggean. Mide cuánto tarda
+cada llamada a logger.info() vista desde el hilo del request (lo que
+bloquea la respuesta) y el tiempo total hasta que todo quedó en disco.
+
+No toca los logs reales: PathManager apunta a un directorio temporal.
+
+Uso:
+    python tools/bench_logging.py
+    python tools/bench_logging.py --threads 16 --messages 5000 --format json
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Agregar directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from flask import Flask  # noqa: E402
+
+from app.config import PathManager, SettingsLoader  # noqa: E402
+from app.logging_config import configure_logging, stop_logging  # noqa: E402
+
+
+def run(threads: int, messages: int):
+    """Retorna (latencias por llamada en segundos, segundos hasta loggear, segundos hasta vaciar la cola)."""
+    logger = logging.getLogger('app.routes.bench')
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(n):
+        local = []
+        barrier.wait()
+        for i in range(messages):
+            start = time.perf_counter()
+            logger.info("GET /turnos 200 - turno_id=%s paciente_id=%s (%.1f ms)", i, n, 12.5)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    logged = time.perf_counter() - started
+    stop_logging()  # espera a que el listener escriba todo
+    flushed = time.perf_counter() - started
+    return latencies, logged, flushed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="hilos (requests concurrentes)")
+    parser.add_argument("--messages", type=int, default=2000, help="mensajes por hilo")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    args = parser.parse_args()
+
+    total = args.threads * args.messages
+    print(f"{'modo':>12} | {'p50 (µs)':>9} | {'p99 (µs)':>9} | {'msg/s hilos':>11} | {'msg/s disco':>11}")
+    print("-" * 66)
+    with tempfile.TemporaryDirectory() as tmp:
+        PathManager._base_dir = Path(tmp)
+        config = SettingsLoader.load()
+        config.set('logging', 'format', args.format)
+        config.set('logging', 'max_file_size_mb', '1')  # fuerza rotaciones durante la medición
+
+        for mode, async_logging in (("sincrónico", "false"), ("asíncrono", "true")):
+            config.set('logging', 'async', async_logging)
+            configure_logging(Flask(__name__))
+            latencies, logged, flushed = run(args.threads, args.messages)
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1e6
+            p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+            print(f"{mode:>12} | {p50:>9.1f} | {p99:>9.1f} | {total / logged:>11.0f} | {total / flushed:>11.0f}")
+
+        logging.getLogger().handlers.clear()
+
+
+if __name__ == "__main__":
+    main()
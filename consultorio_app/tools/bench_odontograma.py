@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark de guardado de odontogramas: 50 cambios sobre una boca completa.
+
+Levanta la app sobre una base temporal, crea un paciente con las 32 piezas
+permanentes cargadas en las 5 caras (160 caras) y guarda versiones
+sucesivas de 50 cambios cada una con CrearVersionOdontogramaService. Mide
+el tiempo por guardado y la cantidad de sentencias SQL, para cada modo de
+almacenamiento ([odontograma] storage = full | delta).
+
+No toca la base real: PathManager apunta a un directorio temporal.
+
+Uso:
+    python tools/bench_odontograma.py
+    python tools/bench_odontograma.py --versiones 60 --cambios 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+# Agregar directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault("DISABLE_SCHEDULER", "1")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.config import PathManager, SettingsLoader  # noqa: E402
+
+DIENTES = [str(cuadrante * 10 + pieza) for cuadrante in (1, 2, 3, 4) for pieza in range(1, 9)]
+CARAS = ("mesial", "distal", "oclusal", "vestibular", "lingual")
+MARCAS = ("sano", "caries", "resina", "amalgama", "corona", "sellante")
+
+
+def boca_completa():
+    return [{"diente": d, "cara": c, "marca_codigo": "sano"} for d in DIENTES for c in CARAS]
+
+
+def cambios_aleatorios(rng: random.Random, cantidad: int):
+    caras = rng.sample([(d, c) for d in DIENTES for c in CARAS], cantidad)
+    return [{"diente": d, "cara": c, "marca_codigo": rng.choice(MARCAS)} for d, c in caras]
+
+
+def run(app, storage: str, versiones: int, cambios: int):
+    """Retorna (segundos por guardado, sentencias SQL por guardado, filas de caras totales)."""
+    from app.database import db
+    from app.models import OdontogramaCara, Paciente
+    from app.services.odontograma import CrearVersionOdontogramaService, ObtenerOdontogramaService
+
+    SettingsLoader.load().set("odontograma", "storage", storage)
+    rng = random.Random(42)
+    tiempos, sentencias = [], []
+    contador = {"n": 0}
+
+    def _contar(*_):
+        contador["n"] += 1
+
+    with app.app_context():
+        paciente = Paciente(nombre="Bench", apellido=storage, dni=f"bench-{storage}", fecha_nac=date(1990, 1, 1))
+        db.session.add(paciente)
+        db.session.commit()
+        ObtenerOdontogramaService.obtener_actual(paciente.id)
+        CrearVersionOdontogramaService.execute(paciente.id, boca_completa())
+
+        event.listen(db.engine, "before_cursor_execute", _contar)
+        try:
+            for _ in range(versiones):
+                lote = cambios_aleatorios(rng, cambios)
+                contador["n"] = 0
+                inicio = time.perf_counter()
+                CrearVersionOdontogramaService.execute(paciente.id, lote)
+                tiempos.append(time.perf_counter() - inicio)
+                sentencias.append(contador["n"])
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _contar)
+
+        filas = OdontogramaCara.query.join(OdontogramaCara.odontograma).filter_by(paciente_id=paciente.id).count()
+    return tiempos, sentencias, filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versiones", type=int, default=40, help="versiones a guardar por modo")
+    parser.add_argument("--cambios", type=int, default=50, help="caras cambiadas por versión")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        PathManager._base_dir = Path(tmp)
+        import run as run_module
+
+        app = run_module.create_app()
+        with app.app_context():
+            run_module.db.create_all()
+
+        print(f"{'storage':>8} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'SQL/guardado':>12} | {'filas caras':>11}")
+        print("-" * 62)
+
+        for storage in ("full", "delta"):
+            tiempos, sentencias, filas = run(app, storage, args.versiones, args.cambios)
+            tiempos.sort()
+            p50 = tiempos[len(tiempos) // 2] * 1000
+            p95 = tiempos[int(len(tiempos) * 0.95) - 1] * 1000
+            promedio = sum(sentencias) / len(sentencias)
+            print(f"{storage:>8} | {p50:>9.1f} | {p95:>9.1f} | {promedio:>12.1f} | {filas:>11}")
+
+
+if __name__ == "__main__":
+    main()
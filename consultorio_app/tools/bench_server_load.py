@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga: servidor de desarrollo (Werkzeug) vs waitress.
+
+Levanta la app sobre una base temporal con datos por defecto, sirve el
+mismo WSGI app con cada servidor en un puerto libre y dispara requests
+concurrentes contra las páginas de agenda (/turnos) y finanzas
+(/finanzas/dashboard), autenticado como la dueña.
+
+No toca la base real: PathManager apunta a un directorio temporal.
+
+Uso:
+    python tools/bench_server_load.py
+    python tools/bench_server_load.py --clients 16 --requests 400 --threads 8
+"""
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Agregar directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault("DISABLE_SCHEDULER", "1")
+
+import requests  # noqa: E402
+
+from app.config import PathManager  # noqa: E402
+
+PAGES = ("/turnos", "/finanzas/dashboard")
+
+
+def build_app(base_dir: Path):
+    """Crea la app sobre `base_dir` con tablas, datos por defecto y usuarios."""
+    PathManager._base_dir = base_dir
+    import run
+
+    app = run.create_app()
+    with app.app_context():
+        run.db.create_all()
+        run.init_default_data()
+        run.ensure_default_users()
+    return app
+
+
+def session_cookie(app) -> str:
+    """Cookie de sesión firmada para la usuaria DUEÑA (evita pasar por el form de login)."""
+    from app.models import Usuario
+
+    with app.app_context():
+        user = Usuario.query.filter_by(username="florencia").first()
+        serializer = app.session_interface.get_signing_serializer(app)
+        return serializer.dumps({"_user_id": str(user.id), "_fresh": True})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_werkzeug(app, port: int, threads: int):
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.shutdown
+
+
+def start_waitress(app, port: int, threads: int):
+    from waitress import create_server
+
+    server = create_server(app, host="127.0.0.1", port=port, threads=threads, connection_limit=100)
+    threading.Thread(target=server.run, daemon=True).start()
+
+    # Cerrar el socket desde otro hilo rompe el loop de asyncore de waitress:
+    # solo se detienen los workers y el hilo (daemon) muere con el proceso.
+    return server.task_dispatcher.shutdown
+
+
+def run_load(base_url: str, cookie: str, path: str, clients: int, total: int):
+    """Ejecuta `total` GETs repartidos entre `clients` hilos. Retorna (req/s, p95 ms, errores)."""
+    local = threading.local()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def one_request(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.cookies.set("session", cookie)
+            local.session = session
+        start = time.perf_counter()
+        try:
+            response = session.get(base_url + path, allow_redirects=False, timeout=30)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one_request, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0
+    return total / wall, p95, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="clientes concurrentes")
+    parser.add_argument("--requests", type=int, default=200, help="requests por página y servidor")
+    parser.add_argument("--threads", type=int, default=8, help="hilos de waitress")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp))
+        cookie = session_cookie(app)
+
+        print(f"{'servidor':>10} | {'página':>20} | {'req/s':>8} | {'p95 (ms)':>8} | {'errores':>7}")
+        print("-" * 66)
+        for name, starter in (("werkzeug", start_werkzeug), ("waitress", start_waitress)):
+            port = free_port()
+            stop = starter(app, port, args.threads)
+            time.sleep(0.3)
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                for path in PAGES:
+                    run_load(base_url, cookie, path, args.clients, min(20, args.requests))  # warm-up
+                    rps, p95, errors = run_load(base_url, cookie, path, args.clients, args.requests)
+                    print(f"{name:>10} | {path:>20} | {rps:>8.1f} | {p95:>8.1f} | {errors:>7}")
+            finally:
+                stop()
+
+        with app.app_context():
+            from app.database import db
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
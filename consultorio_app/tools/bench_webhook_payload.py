@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de entrada del webhook de WhatsApp.
+
+Compara el flujo anterior (decode a str -> HMAC sobre str re-codificado ->
+json.loads en el handler -> json.loads otra vez en la ruta) contra el flujo
+actual (HMAC sobre bytes crudos -> un único parse a WhatsAppWebhookPayload).
+
+Los payloads imitan lo que envía Meta cuando agrupa varios eventos en un
+solo POST: varias entradas con mensajes, contactos y metadata.
+
+Uso:
+    python tools/bench_webhook_payload.py
+    python tools/bench_webhook_payload.py --iterations 20000
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+
+# Agregar directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.whatsapp.webhook_handler import (  # noqa: E402
+    WhatsAppPayloadParser,
+    WhatsAppWebhookValidator,
+)
+
+APP_SECRET = "bench-app-secret"
+
+
+def build_payload(entries: int) -> bytes:
+    """Arma un webhook con `entries` entradas, cada una con un mensaje de texto."""
+    entry_list = []
+    for i in range(entries):
+        phone = f"54938712{i:05d}"
+        entry_list.append({
+            "id": "102290129340398",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {
+                        "display_phone_number": "5493874000000",
+                        "phone_number_id": "106540352242922",
+                    },
+                    "contacts": [{"profile": {"name": f"Paciente {i}"}, "wa_id": phone}],
+                    "messages": [{
+                        "from": phone,
+                        "id": f"wamid.HBgNNTQ5Mzg3MTIzNDU2NxUCABIYFjNFQjBDNzc{i:06d}",
+                        "timestamp": str(1737500000 + i),
+                        "type": "text",
+                        "text": {"body": "Hola, quería pedir un turno para el martes 2026-02-10 ñandú"},
+                    }],
+                },
+            }],
+        })
+    data = {"object": "whatsapp_business_account", "entry": entry_list}
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def sign(body: bytes) -> str:
+    return "sha256=" + hmac.new(APP_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def legacy_pipeline(raw: bytes, signature: str):
+    """Reproduce el flujo previo: decode + re-encode + doble json.loads."""
+    body = raw.decode("utf-8")  # request.get_data(as_text=True)
+    _, hash_value = signature.split("=", 1)
+    expected = hmac.new(APP_SECRET.encode("utf-8"), body.encode("utf-8"), hashlib.sha256).hexdigest()
+    hmac.compare_digest(hash_value, expected)
+    payload = json.loads(body)  # handler
+    WhatsAppPayloadParser.is_status_update(payload)
+    WhatsAppPayloadParser.extract_message_info(payload)
+    payload = json.loads(body)  # ruta, para obtener channel_user_id
+    return WhatsAppPayloadParser.extract_message_info(payload)
+
+
+def current_pipeline(raw: bytes, signature: str):
+    """Flujo actual: firma sobre bytes y un único parse tipado."""
+    WhatsAppWebhookValidator.validate_signature(raw, signature, "")
+    payload = WhatsAppPayloadParser.parse(raw)
+    return payload.channel_user_id, payload.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ["META_APP_SECRET"] = APP_SECRET
+
+    print(f"{'entradas':>8} | {'bytes':>8} | {'anterior (us)':>13} | {'actual (us)':>11} | {'mejora':>6}")
+    print("-" * 60)
+    for entries in (1, 5, 20, 50):
+        raw = build_payload(entries)
+        signature = sign(raw)
+        assert legacy_pipeline(raw, signature) == current_pipeline(raw, signature)
+
+        legacy = min(timeit.repeat(lambda: legacy_pipeline(raw, signature), number=args.iterations, repeat=3))
+        current = min(timeit.repeat(lambda: current_pipeline(raw, signature), number=args.iterations, repeat=3))
+        legacy_us = legacy / args.iterations * 1e6
+        current_us = current / args.iterations * 1e6
+        print(f"{entries:>8} | {len(raw):>8} | {legacy_us:>13.1f} | {current_us:>11.1f} | {legacy_us / current_us:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Verifica o reconstruye los saldos desnormalizados de las prestaciones
+(Prestacion.total_cobrado y saldo_pendiente) desde cobros e ítems.
+
+Los services de cobro/autorización/edición los mantienen al escribir; este
+script sirve para detectar diferencias (por ejemplo, cobros cargados a
+mano en la base o restaurados de un backup viejo) y corregirlas.
+
+Uso:
+    python tools/rebuild_saldos_prestaciones.py --check   # solo informa; exit 1 si hay diferencias
+    python tools/rebuild_saldos_prestaciones.py           # recalcula todas las prestaciones
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault("DISABLE_SCHEDULER", "1")
+
+from app import create_app  # noqa: E402
+from app.services.prestacion import SaldoPrestacionService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="solo verificar, sin escribir")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        diferencias = SaldoPrestacionService.verificar()
+        for fila in diferencias:
+            print(
+                f"Prestación {fila['id']}: cobrado {fila['total_cobrado']:.2f} -> {fila['total_cobrado_real']:.2f}, "
+                f"saldo {fila['saldo_pendiente']:.2f} -> {fila['saldo_pendiente_real']:.2f}"
+            )
+        print(f"[SALDOS] {len(diferencias)} prestaciones con saldos desactualizados")
+
+        if args.check:
+            return 1 if diferencias else 0
+        if diferencias:
+            actualizadas = SaldoPrestacionService.reconstruir()
+            print(f"[OK] Saldos recalculados ({actualizadas} prestaciones)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
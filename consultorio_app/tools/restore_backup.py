@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Herramienta de restauración de backups (completos y diferenciales).
+
+Lista los backups de data/backups/ y reconstruye la base tal como estaba
+en el momento de uno de ellos. Para un diferencial se aplica la cadena
+completo + diferencial automáticamente.
+
+Uso:
+    python tools/restore_backup.py --list
+    python tools/restore_backup.py consultorio_20260101_120000.diff.gz --output copia.db
+    python tools/restore_backup.py consultorio_20260101_120000.diff.gz --live
+
+Con --output solo se escribe un archivo nuevo (la base real no se toca).
+Con --live se restaura sobre la base en uso: cerrar la app antes.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import PathManager  # noqa: E402
+from app.database.backup import backup_files, reconstruct_backup, restore_backup  # noqa: E402
+
+
+def list_backups():
+    files = backup_files()
+    if not files:
+        print("No hay backups disponibles")
+        return
+    print(f"{'archivo':>44} | {'tipo':>5} | {'tamaño (KB)':>11}")
+    print("-" * 66)
+    for f in files:
+        kind = 'diff' if f.name.endswith('.diff.gz') else 'full'
+        print(f"{f.name:>44} | {kind:>5} | {f.stat().st_size / 1024:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("backup", nargs="?", help="nombre del backup en data/backups/ (o ruta)")
+    parser.add_argument("--list", action="store_true", help="listar backups disponibles")
+    parser.add_argument("--output", help="archivo .db a generar con la base reconstruida")
+    parser.add_argument("--live", action="store_true", help="restaurar sobre la base en uso")
+    args = parser.parse_args()
+
+    if args.list or not args.backup:
+        list_backups()
+        return 0
+
+    backup_path = Path(args.backup)
+    if not backup_path.exists():
+        backup_path = PathManager.get_backups_dir() / args.backup
+    if not backup_path.exists():
+        print(f"[ERROR] No se encontró el backup: {args.backup}")
+        return 1
+
+    if args.output:
+        chain = reconstruct_backup(backup_path, Path(args.output))
+        print(f"[OK] Base reconstruida en {args.output} ({' + '.join(chain)})")
+    elif args.live:
+        chain = restore_backup(backup_path)
+        print(f"[OK] Base restaurada desde {' + '.join(chain)}")
+    else:
+        print("[ERROR] Indicar --output <archivo> o --live")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())